@@ -299,6 +299,8 @@ const FALLBACK_GEONAMES_DATASETS = [
   },
 ];
 const GEONAMES_DATASET_CACHE_KEY = "dalitrail:geonames-datasets";
+// First page of the catalog (pinned entries come first); a country's entries load when it is picked.
+const GEONAMES_DATASET_PAGE_SIZE = 100;
 const BACKUP_VERSION = 1;
 const LOCATIONS_KEY = "dalitrail:locations";
 const NOTES_KEY = "dalitrail:notes";
@@ -308,6 +310,8 @@ const TRACKS_KEY = "dalitrail:tracks";
 let geonamesDatasets = [];
 let geonamesDatasetOptionsLoaded = false;
 let geonamesDatasetsFetched = false;
+let geonamesDatasetFacets = null;
+const geonamesDatasetCountriesFetched = new Set();
 
 const loadGeonamesMeta = () => {
   try {
@@ -770,12 +774,32 @@ const handleGeonamesFileSelection = async (file) => {
   }
 };
 
+const fetchGeonamesDatasetPage = async (params) => {
+  // "no-cache" revalidates with the catalog's ETag instead of re-downloading it.
+  const response = await fetch(`/api/geonames/datasets?${new URLSearchParams(params)}`, { cache: "no-cache" });
+  if (!response.ok) throw new Error(`HTTP ${response.status} ${response.statusText}`);
+  return response.json();
+};
+
+const mergeGeonamesDatasets = (list) => {
+  const byId = new Map(geonamesDatasets.map((dataset) => [dataset.id, dataset]));
+  list.forEach((dataset) => byId.set(dataset.id, dataset));
+  geonamesDatasets = [...byId.values()];
+};
+
+const ensureGeonamesCountryDatasets = async (country) => {
+  if (!country || !geonamesDatasetFacets || geonamesDatasetCountriesFetched.has(country)) return;
+  const payload = await fetchGeonamesDatasetPage({ country });
+  mergeGeonamesDatasets(Array.isArray(payload?.datasets) ? payload.datasets : []);
+  geonamesDatasetCountriesFetched.add(country);
+  geonamesDatasetOptionsLoaded = false;
+  cacheGeonamesDatasets(geonamesDatasets);
+};
+
 const ensureGeonamesDatasetList = async () => {
   if (geonamesDatasetsFetched) return geonamesDatasets;
   try {
-    const response = await fetch("/api/geonames/datasets", { cache: "no-store" });
-    if (!response.ok) throw new Error(`HTTP ${response.status} ${response.statusText}`);
-    const payload = await response.json();
+    const payload = await fetchGeonamesDatasetPage({ facets: "true", limit: GEONAMES_DATASET_PAGE_SIZE });
     const list = Array.isArray(payload?.datasets)
       ? payload.datasets
       : Array.isArray(payload)
@@ -783,6 +807,7 @@ const ensureGeonamesDatasetList = async () => {
       : [];
     if (!list.length) throw new Error("Dataset list is empty.");
     geonamesDatasets = list;
+    geonamesDatasetFacets = Array.isArray(payload?.countries) ? payload.countries : null;
     geonamesDatasetsFetched = true;
     geonamesDatasetOptionsLoaded = false;
     cacheGeonamesDatasets(list);
@@ -848,7 +873,7 @@ const populateGeonamesDatasetOptions = (filterCountry = "", filterRegion = "") =
 const populateGeonamesFilterDropdowns = () => {
   if (!geonamesCountrySelect || !geonamesRegionSelect) return;
 
-  const countries = [...new Map(
+  const countries = geonamesDatasetFacets || [...new Map(
     geonamesDatasets
       .filter(d => d.country && d.country_name)
       .map(d => [d.country, { code: d.country, name: d.country_name }])
@@ -865,7 +890,8 @@ const populateGeonamesFilterDropdowns = () => {
     geonamesCountrySelect.appendChild(option);
   });
 
-  const regions = [...new Map(
+  const facet = geonamesDatasetFacets?.find(c => c.code === selectedCountry);
+  const regions = facet ? facet.regions : [...new Map(
       geonamesDatasets
         .filter(d => d.country === selectedCountry && d.admin1 && d.admin1_name)
         .map(d => [d.admin1, { code: d.admin1, name: d.admin1_name }])
@@ -954,10 +980,16 @@ geonamesDownloadBtn?.addEventListener("click", () => {
   logAppEvent("Opened GeoNames download panel.");
 });
 
-geonamesCountrySelect?.addEventListener("change", () => {
+geonamesCountrySelect?.addEventListener("change", async () => {
   // Reset region when country changes
   if (geonamesRegionSelect) geonamesRegionSelect.value = "";
   populateGeonamesFilterDropdowns();
+  try {
+    await ensureGeonamesCountryDatasets(geonamesCountrySelect.value);
+  } catch (error) {
+    console.error("Unable to load GeoNames datasets for country:", error);
+    setGeonamesDownloadStatus(`Unable to load datasets: ${error?.message || error}`);
+  }
   handleGeonamesFilterChange();
 });
 
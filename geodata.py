@@ -2,17 +2,52 @@
 
 from __future__ import annotations
 
+import gzip
+import hashlib
+import heapq
 import json
 import math
 import os
 import logging
-from dataclasses import dataclass
+import re
+import shutil
+import threading
+import time
+import unicodedata
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Iterable, List, Optional
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+import multiprocessing
 
 import sqlite3
 from datetime import datetime, timezone
 
+try:  # optional: vectorized in-memory nearby engine
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is not a hard dependency
+    np = None
+
+try:  # optional: KD-tree for k-nearest-neighbour search
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - scipy is not a hard dependency
+    cKDTree = None
+
+try:  # optional: zstd-precompressed lite downloads (gzip is always produced)
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is not a hard dependency
+    zstandard = None
+
+try:  # cross-process locks for shared files under GENERATED_DIR (POSIX only)
+    import fcntl
+except ImportError:  # pragma: no cover - platform dependent
+    fcntl = None
+
 # NEW: Add logger
 LOGGER = logging.getLogger(__name__)
 
@@ -37,11 +72,65 @@ DATASET_CATALOG_PATH = BASE_DIR / "configs" / "geonames-datasets.json"
 # Directory to write generated lite DBs, if you ever want to persist them
 GENERATED_DIR = BASE_DIR / "assets" / "data" / "generated"
 
+# Disk budget for content-addressed lite artifacts in GENERATED_DIR (LRU eviction)
+LITE_CACHE_MAX_BYTES = int(os.getenv("DALITRAIL_LITE_CACHE_BYTES", str(2 * 1024 ** 3)))
+
+# Precompressed download variants written next to each generated lite DB
+GZIP_LEVEL = int(os.getenv("DALITRAIL_GZIP_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("DALITRAIL_ZSTD_LEVEL", "12"))
+
+# Per-region lite snapshots kept for row-level delta updates
+LITE_SNAPSHOTS_PER_REGION = int(os.getenv("DALITRAIL_LITE_SNAPSHOTS", "4"))
+LITE_SNAPSHOT_MAX_AGE_SEC = float(os.getenv("DALITRAIL_LITE_SNAPSHOT_MAX_AGE_SEC", str(30 * 86400)))
+LITE_SNAPSHOT_MAX_BYTES = int(os.getenv("DALITRAIL_LITE_SNAPSHOT_BYTES", str(1024 ** 3)))
+
+# Asynchronous lite build jobs (process pool) and how long finished artifacts are kept
+LITE_JOB_WORKERS = int(os.getenv("DALITRAIL_LITE_JOB_WORKERS", "2"))
+LITE_JOB_TTL_SEC = float(os.getenv("DALITRAIL_LITE_JOB_TTL_SEC", "3600"))
+
+# Read-only connection pool tuning (per dataset path)
+POOL_MAX_SIZE = int(os.getenv("DALITRAIL_SQLITE_POOL_SIZE", "8"))
+POOL_MMAP_BYTES = int(os.getenv("DALITRAIL_SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+POOL_CACHED_STATEMENTS = int(os.getenv("DALITRAIL_SQLITE_CACHED_STATEMENTS", "128"))
+POOL_IMMUTABLE = os.getenv("DALITRAIL_SQLITE_IMMUTABLE", "").lower() in {"1", "true", "yes"}
+
+# How often the dataset registry re-stats a dataset file to notice swaps
+DATASET_RECHECK_SEC = float(os.getenv("DALITRAIL_DATASET_RECHECK_SEC", "2.0"))
+
+# Nearby engine: "sqlite" (bbox query), "grid" (grid-cell rings) or "numpy" (columnar, in-memory)
+NEARBY_ENGINE = os.getenv("DALITRAIL_NEARBY_ENGINE", "sqlite").strip().lower()
+
+# Quantized nearby result cache (0 entries disables it)
+NEARBY_CACHE_SIZE = int(os.getenv("DALITRAIL_NEARBY_CACHE_SIZE", "2048"))
+NEARBY_CACHE_TTL_SEC = float(os.getenv("DALITRAIL_NEARBY_CACHE_TTL", "300"))
+NEARBY_CACHE_PRECISION = int(os.getenv("DALITRAIL_NEARBY_CACHE_PRECISION", "3"))  # decimals (~110 m)
+NEARBY_CACHE_REUSE_LARGER = os.getenv("DALITRAIL_NEARBY_CACHE_REUSE_LARGER", "true").lower() in {"1", "true", "yes"}
+
+# Name search ranking: a text term (alternate-name-only matches and extra name words cost
+# more) minus a bonus per population digit plus a distance penalty that saturates at
+# SEARCH_DISTANCE_WEIGHT.
+SEARCH_POPULATION_WEIGHT = float(os.getenv("DALITRAIL_SEARCH_POPULATION_WEIGHT", "1.0"))
+SEARCH_DISTANCE_WEIGHT = float(os.getenv("DALITRAIL_SEARCH_DISTANCE_WEIGHT", "6.0"))
+SEARCH_DISTANCE_SCALE_KM = float(os.getenv("DALITRAIL_SEARCH_DISTANCE_SCALE_KM", "50.0"))  # half penalty here
+SEARCH_ALT_NAME_PENALTY = float(os.getenv("DALITRAIL_SEARCH_ALT_NAME_PENALTY", "2.0"))
+SEARCH_NAME_WORD_WEIGHT = float(os.getenv("DALITRAIL_SEARCH_NAME_WORD_WEIGHT", "0.3"))  # per word beyond the query's
+# Matches read per query, most important first (name index rowid order), and re-ranked
+SEARCH_MAX_CANDIDATES = int(os.getenv("DALITRAIL_SEARCH_MAX_CANDIDATES", "500"))
+# Fuzzy (trigram) search: postings read per query, candidates re-ranked by edit distance,
+# and the score cost of one edit (in population-digit units)
+SEARCH_FUZZY_MAX_POSTINGS = int(os.getenv("DALITRAIL_SEARCH_FUZZY_MAX_POSTINGS", "50000"))
+SEARCH_FUZZY_CANDIDATES = int(os.getenv("DALITRAIL_SEARCH_FUZZY_CANDIDATES", "300"))
+SEARCH_FUZZY_EDIT_WEIGHT = float(os.getenv("DALITRAIL_SEARCH_FUZZY_EDIT_WEIGHT", "3.0"))
+
 
 class GeoNamesDatasetNotFound(RuntimeError):
     """Raised when the configured GeoNames dataset cannot be located on disk."""
 
 
+class LiteSnapshotUnavailable(RuntimeError):
+    """Raised when a delta cannot be computed (client version no longer retained, schema changed)."""
+
+
 # ---------------------------------------------------------------------------
 # Existing lite dataset resolver (used by /datasets/geonames-lite-us-wa.db etc)
 # ---------------------------------------------------------------------------
@@ -96,6 +185,605 @@ def _connect(db_path: Path) -> sqlite3.Connection:
     return conn
 
 
+# ---------------------------------------------------------------------------
+# Pooled read-only connections (hot query paths: nearby, metadata)
+# ---------------------------------------------------------------------------
+class _ConnectionPool:
+    """
+    Thread-safe pool of read-only connections to a single SQLite file.
+
+    Connections are opened lazily (up to ``max_size``) with ``mode=ro`` (or
+    ``immutable=1`` when DALITRAIL_SQLITE_IMMUTABLE is set), mmap enabled and a
+    per-connection prepared-statement cache. Checkout blocks when every
+    connection is busy; the time spent waiting is recorded in ``stats()``.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        max_size: int = POOL_MAX_SIZE,
+        mmap_bytes: int = POOL_MMAP_BYTES,
+        cached_statements: int = POOL_CACHED_STATEMENTS,
+        immutable: bool = POOL_IMMUTABLE,
+    ) -> None:
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self._mmap_bytes = mmap_bytes
+        self._cached_statements = cached_statements
+        self._immutable = immutable
+        self._idle: list[sqlite3.Connection] = []
+        self._schema: dict[str, bool] = {}
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        # stats
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _open(self) -> sqlite3.Connection:
+        uri = self.db_path.as_uri() + ("?immutable=1" if self._immutable else "?mode=ro")
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self._cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA mmap_size={int(self._mmap_bytes)}")
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        started = time.perf_counter()
+        waited = False
+        conn: sqlite3.Connection | None = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"Connection pool for {self.db_path} is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._created < self.max_size:
+                    self._created += 1
+                    break
+                waited = True
+                self._cond.wait()
+            wait = time.perf_counter() - started
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+        if conn is None:
+            try:
+                conn = self._open()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+
+        try:
+            yield conn
+        finally:
+            with self._cond:
+                if self._closed:
+                    conn.close()
+                    self._created -= 1
+                else:
+                    self._idle.append(conn)
+                self._cond.notify()
+
+    def has_table(self, conn: sqlite3.Connection, name: str) -> bool:
+        """Return whether ``name`` exists in the pooled database (cached per pool)."""
+        cached = self._schema.get(name)
+        if cached is None:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)
+            ).fetchone()
+            cached = self._schema[name] = row is not None
+        return cached
+
+    def has_column(self, conn: sqlite3.Connection, table: str, column: str) -> bool:
+        """Return whether ``table.column`` exists (cached per pool)."""
+        key = f"{table}.{column}"
+        cached = self._schema.get(key)
+        if cached is None:
+            # table_xinfo also lists generated columns (e.g. fcode on optimized datasets)
+            columns = {row["name"] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+            cached = self._schema[key] = column in columns
+        return cached
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._created -= len(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "path": str(self.db_path),
+                "max_size": self.max_size,
+                "size": self._created,
+                "idle": len(self._idle),
+                "in_use": self._created - len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_total_ms": round(self._wait_total * 1000.0, 3),
+                "wait_max_ms": round(self._wait_max * 1000.0, 3),
+            }
+
+
+_POOLS: dict[Path, _ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _get_pool(db_path: Path) -> _ConnectionPool:
+    key = Path(db_path).resolve()
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = _ConnectionPool(key)
+        return pool
+
+
+@contextmanager
+def _pooled_connection(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """Check out a pooled read-only connection for ``db_path``."""
+    with _get_pool(db_path).connection() as conn:
+        yield conn
+
+
+def close_connection_pool(db_path: Path | None = None) -> None:
+    """Close the pool for ``db_path`` (or every pool when omitted)."""
+    with _POOLS_LOCK:
+        if db_path is None:
+            pools = list(_POOLS.values())
+            _POOLS.clear()
+        else:
+            pool = _POOLS.pop(Path(db_path).resolve(), None)
+            pools = [pool] if pool else []
+    for pool in pools:
+        pool.close()
+
+
+def _has_table(db_path: Path, conn: sqlite3.Connection, name: str) -> bool:
+    return _get_pool(db_path).has_table(conn, name)
+
+
+def _has_column(db_path: Path, conn: sqlite3.Connection, table: str, column: str) -> bool:
+    return _get_pool(db_path).has_column(conn, table, column)
+
+
+def connection_pool_stats() -> list[dict[str, Any]]:
+    """Return size and wait-time statistics for every open connection pool."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    return [pool.stats() for pool in pools]
+
+
+# ---------------------------------------------------------------------------
+# Dataset registry: active path, file signatures and metadata (cached)
+# ---------------------------------------------------------------------------
+def _file_signature(path: Path) -> tuple[int, int, int]:
+    """
+    (inode, mtime_ns, size) — changes whenever the dataset file is replaced or
+    rewritten, including writes still sitting in a WAL-mode ``-wal`` sidecar.
+    """
+    st = path.stat()
+    mtime_ns, size = st.st_mtime_ns, st.st_size
+    try:
+        wal = path.with_name(path.name + "-wal").stat()
+    except OSError:
+        pass
+    else:
+        if wal.st_size:  # an empty WAL is recreated on every read-write open; ignore it
+            mtime_ns, size = max(mtime_ns, wal.st_mtime_ns), size + wal.st_size
+    return (st.st_ino, mtime_ns, size)
+
+
+class _DatasetRegistry:
+    """
+    Caches the resolved active dataset path, per-file signatures and metadata.
+
+    A file is re-stat'ed at most every ``recheck_sec`` seconds; metadata is
+    re-read only when the (inode, mtime, size) signature changes, at which point
+    the file's connection pool is closed so new checkouts see the new file.
+    """
+
+    def __init__(self, recheck_sec: float) -> None:
+        self.recheck_sec = recheck_sec
+        self._lock = threading.Lock()
+        self._active: tuple[str, Path] | None = None
+        self._signatures: dict[Path, tuple[float, tuple[int, int, int]]] = {}
+        self._metadata: dict[Path, tuple[tuple[int, int, int], dict[str, str]]] = {}
+        self.resolves = 0
+        self.stats_calls = 0
+        self.metadata_loads = 0
+        self.changes = 0
+
+    def active_path(self) -> Path:
+        env_value = os.getenv("DALITRAIL_GEONAMES_DB", "")
+        active = self._active
+        if active is not None and active[0] == env_value:
+            try:
+                self.signature(active[1])
+                return active[1]
+            except FileNotFoundError:
+                pass
+        path = resolve_dataset_path().resolve()
+        with self._lock:
+            self.resolves += 1
+            self._active = (env_value, path)
+        return path
+
+    def signature(self, path: Path) -> tuple[int, int, int]:
+        key = Path(path).resolve()
+        now = time.monotonic()
+        cached = self._signatures.get(key)
+        if cached is not None and now - cached[0] < self.recheck_sec:
+            return cached[1]
+        try:
+            signature = _file_signature(key)
+        except FileNotFoundError:
+            with self._lock:
+                self._signatures.pop(key, None)
+                self._metadata.pop(key, None)
+            raise
+        with self._lock:
+            self.stats_calls += 1
+            self._signatures[key] = (now, signature)
+            changed = cached is not None and cached[1] != signature
+            if changed:
+                self.changes += 1
+                self._metadata.pop(key, None)
+        if changed:
+            LOGGER.info("dataset changed on disk, reopening: %s", key)
+            close_connection_pool(key)
+        return signature
+
+    def metadata(self, path: Path) -> dict[str, str]:
+        key = Path(path).resolve()
+        signature = self.signature(key)
+        cached = self._metadata.get(key)
+        if cached is not None and cached[0] == signature:
+            return dict(cached[1])
+        with _pooled_connection(key) as conn:
+            try:
+                rows = conn.execute("SELECT key, value FROM metadata").fetchall()
+            except sqlite3.OperationalError:
+                rows = []
+        metadata = {row["key"]: row["value"] for row in rows}
+        with self._lock:
+            self.metadata_loads += 1
+            self._metadata[key] = (signature, metadata)
+        return dict(metadata)
+
+    def stats(self) -> dict[str, Any]:
+        active = self._active
+        return {
+            "active": str(active[1]) if active else None,
+            "recheck_sec": self.recheck_sec,
+            "resolves": self.resolves,
+            "stat_calls": self.stats_calls,
+            "metadata_loads": self.metadata_loads,
+            "changes": self.changes,
+        }
+
+
+DATASET_REGISTRY = _DatasetRegistry(DATASET_RECHECK_SEC)
+
+
+def active_dataset_path() -> Path:
+    """Resolved path of the active lite dataset (cached; re-resolved when it disappears)."""
+    return DATASET_REGISTRY.active_path()
+
+
+def dataset_signature(path: Path) -> tuple[int, int, int]:
+    """Cached (inode, mtime_ns, size) of ``path``, re-checked every DATASET_RECHECK_SEC."""
+    return DATASET_REGISTRY.signature(path)
+
+
+def dataset_registry_stats() -> dict[str, Any]:
+    return DATASET_REGISTRY.stats()
+
+
+# ---------------------------------------------------------------------------
+# R*Tree spatial index (features_rtree keyed by geoname_id)
+# ---------------------------------------------------------------------------
+RTREE_TABLE = "features_rtree"
+
+# Templates: format with schema="main" (or the name of an ATTACHed database)
+RTREE_SCHEMA_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {{schema}}.{RTREE_TABLE} USING rtree(
+      geoname_id,
+      min_lat, max_lat,
+      min_lng, max_lng
+    );
+"""
+
+RTREE_POPULATE_SQL = f"""
+    INSERT OR REPLACE INTO {{schema}}.{RTREE_TABLE} (geoname_id, min_lat, max_lat, min_lng, max_lng)
+    SELECT geoname_id, latitude, latitude, longitude, longitude
+    FROM {{schema}}.features
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+"""
+
+
+def create_spatial_index(conn: sqlite3.Connection, schema: str = "main") -> None:
+    """Create and fill the R*Tree index from the ``features`` table of ``schema``."""
+    conn.executescript(RTREE_SCHEMA_SQL.format(schema=schema))
+    conn.execute(RTREE_POPULATE_SQL.format(schema=schema))
+
+
+def ensure_spatial_index(db_path: Path) -> bool:
+    """
+    Add the R*Tree index to an existing (writable) dataset if it is missing.
+    Returns True when the index was created.
+    """
+    with sqlite3.connect(str(db_path)) as conn:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (RTREE_TABLE,)
+        ).fetchone()
+        if exists:
+            return False
+        create_spatial_index(conn)
+    close_connection_pool(db_path)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# FTS5 name index (name + alternate names) for /api/places/search
+# ---------------------------------------------------------------------------
+NAME_FTS_TABLE = "features_fts"
+
+# rowid = (importance band << 32) | geoname_id. Populated places come first, by population
+# (about ten bands per decade), then other features by their number of alternate names, so a
+# plain MATCH ... LIMIT walks the most important matches of a common prefix first and never
+# reads the rest. geoname_id = rowid & NAME_FTS_ID_MASK.
+NAME_FTS_ID_MASK = (1 << 32) - 1
+_NAME_FTS_ROWID_SQL = (
+    "((255 - CASE WHEN f.population > 0"
+    " THEN 10 + 10 * length(f.population) + CAST(substr(f.population, 1, 1) AS INTEGER)"
+    " ELSE min(9, {alt_count}) END) << 32 | f.geoname_id)"
+)
+
+# Diacritics folded so "Cote" finds "Côte"; 2 to 4-char prefix indexes, so autocomplete
+# keystrokes iterate one doclist lazily instead of merging every term with that prefix
+NAME_FTS_SCHEMA_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {{schema}}.{NAME_FTS_TABLE} USING fts5(
+      name, alt_names,
+      tokenize = 'unicode61 remove_diacritics 2',
+      prefix = '2 3 4'
+    );
+"""
+
+NAME_FTS_POPULATE_SQL = f"""
+    INSERT INTO {{schema}}.{NAME_FTS_TABLE} (rowid, name, alt_names)
+    SELECT {{rowid}}, f.name, {{alt_names}}
+    FROM {{schema}}.features f
+    {{where}}
+"""
+
+_NAME_FTS_ALT_SQL = (
+    "(SELECT group_concat(a.name, ' ') FROM {schema}.alternate_names a WHERE a.geoname_id = f.geoname_id)"
+)
+_NAME_FTS_ALT_COUNT_SQL = "(SELECT count(*) FROM {schema}.alternate_names a WHERE a.geoname_id = f.geoname_id)"
+
+
+def create_name_index(conn: sqlite3.Connection, schema: str = "main", alternates_schema: str | None = None) -> None:
+    """
+    Create and fill the FTS5 name index from ``schema``.features. Alternate names
+    are read from ``alternates_schema``.alternate_names (default: ``schema``) when
+    that table exists, e.g. from the ATTACHed master for a lite build.
+    """
+    conn.executescript(NAME_FTS_SCHEMA_SQL.format(schema=schema))  # commits: never inside a caller's transaction
+    populate_name_index(conn, schema, alternates_schema)
+
+
+def populate_name_index(
+    conn: sqlite3.Connection,
+    schema: str = "main",
+    alternates_schema: str | None = None,
+    where: str = "",
+    params: Sequence[Any] = (),
+) -> None:
+    """
+    Index the ``schema``.features rows matched by ``where`` (all by default) in the
+    existing FTS5 name index; a plain statement, so it joins the caller's transaction.
+    """
+    alt_names, rowid = _name_index_sources(conn, alternates_schema or schema)
+    conn.execute(NAME_FTS_POPULATE_SQL.format(schema=schema, alt_names=alt_names, rowid=rowid, where=where), params)
+
+
+def delete_from_name_index(conn: sqlite3.Connection, where: str, params: Sequence[Any] = ()) -> None:
+    """
+    Remove the features rows matched by ``where`` from the FTS5 name index. Their rowids
+    derive from population and alternate names, so call this before changing either.
+    """
+    _, rowid = _name_index_sources(conn, "main")
+    conn.execute(
+        f"DELETE FROM {NAME_FTS_TABLE} WHERE rowid IN (SELECT {rowid} FROM features f {where})", params
+    )
+
+
+def _name_index_sources(conn: sqlite3.Connection, alt_schema: str) -> tuple[str, str]:
+    """(alternate names, rowid) SQL expressions over ``features f`` for the name index."""
+    has_alternates = conn.execute(
+        f"SELECT 1 FROM {alt_schema}.sqlite_master WHERE type='table' AND name='alternate_names'"
+    ).fetchone()
+    if not has_alternates:
+        return "NULL", _NAME_FTS_ROWID_SQL.format(alt_count="0")
+    return (
+        _NAME_FTS_ALT_SQL.format(schema=alt_schema),
+        _NAME_FTS_ROWID_SQL.format(alt_count=_NAME_FTS_ALT_COUNT_SQL.format(schema=alt_schema)),
+    )
+
+
+def ensure_name_index(db_path: Path) -> bool:
+    """
+    Add the FTS5 name index to an existing (writable) dataset if it is missing, or
+    rebuild one from before importance-ordered rowids (rowid = geoname_id).
+    Returns True when the index was (re)built.
+    """
+    with sqlite3.connect(str(db_path)) as conn:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (NAME_FTS_TABLE,)
+        ).fetchone()
+        if exists:
+            last = conn.execute(f"SELECT max(rowid) FROM {NAME_FTS_TABLE}").fetchone()[0]
+            if last is None or last > NAME_FTS_ID_MASK:
+                return False
+            conn.execute(f"DROP TABLE {NAME_FTS_TABLE}")
+        create_name_index(conn)
+    close_connection_pool(db_path)
+    return True
+
+
+TRIGRAM_TABLE = "features_trigram"
+
+# Folded (ASCII, lower-case) primary names; the vocab table gives each trigram's document count
+TRIGRAM_SCHEMA_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {{schema}}.{TRIGRAM_TABLE} USING fts5(
+      name, tokenize = 'trigram', detail = 'none'
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS {{schema}}.{TRIGRAM_TABLE}_vocab USING fts5vocab({TRIGRAM_TABLE}, 'row');
+"""
+
+TRIGRAM_POPULATE_SQL = f"""
+    INSERT INTO {{schema}}.{TRIGRAM_TABLE} (rowid, name)
+    SELECT f.geoname_id, dalitrail_fold(f.name)
+    FROM {{schema}}.features f
+    {{where}}
+"""
+
+
+def fold_name(value: str | None) -> str:
+    """ASCII, lower-case, single-spaced form of a name (what the trigram index stores)."""
+    ascii_value = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode("ascii")
+    return " ".join(ascii_value.lower().split())
+
+
+def create_trigram_index(conn: sqlite3.Connection, schema: str = "main") -> None:
+    """Create the trigram index (fuzzy name search) and fill it from ``schema``.features."""
+    conn.executescript(TRIGRAM_SCHEMA_SQL.format(schema=schema))  # commits: never inside a caller's transaction
+    populate_trigram_index(conn, schema)
+
+
+def populate_trigram_index(
+    conn: sqlite3.Connection, schema: str = "main", where: str = "", params: Sequence[Any] = ()
+) -> None:
+    """
+    Index the ``schema``.features rows matched by ``where`` (all by default, e.g. the
+    upserted ids of an incremental update) in the existing trigram index; a plain
+    statement, so it joins the caller's transaction.
+    """
+    conn.create_function("dalitrail_fold", 1, fold_name, deterministic=True)
+    conn.execute(TRIGRAM_POPULATE_SQL.format(schema=schema, where=where), params)
+
+
+def ensure_trigram_index(db_path: Path) -> bool:
+    """
+    Add the trigram index to an existing (writable) dataset if it is missing.
+    Returns True when the index was created.
+    """
+    with sqlite3.connect(str(db_path)) as conn:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (TRIGRAM_TABLE,)
+        ).fetchone()
+        if exists:
+            return False
+        create_trigram_index(conn)
+    close_connection_pool(db_path)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Optimized schema (tools/optimize_master.py): sargable feature-code filters
+# ---------------------------------------------------------------------------
+FCODE_COLUMN = "fcode"
+SCHEMA_VERSION = 2  # metadata "schema_version"; datasets without the key are version 1
+
+# Virtual: ALTER TABLE cannot add STORED columns, and the index below stores the values anyway
+OPTIMIZE_SCHEMA_SQL = (
+    f"ALTER TABLE features ADD COLUMN {FCODE_COLUMN} TEXT "
+    "GENERATED ALWAYS AS (feature_class || '.' || feature_code) VIRTUAL"
+)
+
+OPTIMIZE_INDEX_SQL = (
+    f"CREATE INDEX IF NOT EXISTS idx_features_fcode ON features({FCODE_COLUMN})",
+    # Lite-build filters (country [+ admin1 [+ admin2]] [+ codes]) resolved inside the index
+    f"CREATE INDEX IF NOT EXISTS idx_features_region ON features(country, admin1, admin2, {FCODE_COLUMN})",
+    f"CREATE INDEX IF NOT EXISTS idx_features_country_fcode ON features(country, {FCODE_COLUMN})",
+)
+
+
+def feature_code_predicate(codes: Sequence[str], *, prefix: str = "", sargable: bool = False) -> str:
+    """
+    ``CLASS.CODE IN (?, ...)`` for ``codes`` (bind the codes as-is). With ``sargable``
+    the dataset has the indexed ``fcode`` column, so the filter can seek instead of
+    evaluating the concatenation for every row.
+    """
+    placeholders = ",".join("?" for _ in codes)
+    if sargable:
+        return f"{prefix}{FCODE_COLUMN} IN ({placeholders})"
+    return f"({prefix}feature_class || '.' || {prefix}feature_code) IN ({placeholders})"
+
+
+def has_optimized_schema(conn: sqlite3.Connection, schema: str = "main") -> bool:
+    """Whether ``schema``.features has the ``fcode`` column added by optimize_dataset()."""
+    return any(row[1] == FCODE_COLUMN for row in conn.execute(f"PRAGMA {schema}.table_xinfo(features)"))
+
+
+def optimize_dataset(db_path: Path) -> dict[str, Any]:
+    """
+    Upgrade a (writable) GeoNames database in place to SCHEMA_VERSION:
+      - ``fcode`` = feature_class || '.' || feature_code as an indexed generated column
+      - idx_features_region on (country, admin1, admin2, fcode) for lite builds
+      - ANALYZE + PRAGMA optimize so the planner picks them
+    Safe to re-run; returns what was added and the new schema version.
+    """
+    added: list[str] = []
+    with closing(sqlite3.connect(str(db_path), isolation_level=None)) as conn:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='features'").fetchone():
+            raise ValueError(f"{db_path} has no features table")
+        indexes_before = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not has_optimized_schema(conn):
+                conn.execute(OPTIMIZE_SCHEMA_SQL)
+                added.append(f"column {FCODE_COLUMN}")
+            for statement in OPTIMIZE_INDEX_SQL:
+                conn.execute(statement)
+            conn.execute("CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute(
+                "INSERT OR REPLACE INTO metadata(key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        added += sorted(
+            f"index {row[0]}"
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+            if row[0] not in indexes_before
+        )
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+    close_connection_pool(db_path)
+    return {"path": str(db_path), "schema_version": SCHEMA_VERSION, "added": added}
+
+
 @dataclass
 class NearbyFeature:
     geoname_id: int
@@ -140,6 +828,50 @@ def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     return radius_earth_km * c
 
 
+NEARBY_COLUMNS = (
+    "geoname_id, name, latitude, longitude, feature_class, feature_code, "
+    "country, admin1, admin2, population, elevation, timezone"
+)
+
+
+def _nearby_candidates_sql(
+    bbox: tuple[float, float, float, float],
+    feature_codes: Iterable[str] | None,
+    *,
+    use_rtree: bool,
+    sargable: bool = False,
+) -> tuple[str, list[object]]:
+    """
+    Build the candidate query for a bounding box. With ``use_rtree`` the box is
+    resolved through the R*Tree index; otherwise it falls back to BETWEEN filters.
+    ``sargable`` filters codes on the optimized ``fcode`` column.
+    """
+    lat_min, lat_max, lng_min, lng_max = bbox
+    params: list[object]
+    if use_rtree:
+        # Overlap test (not containment): the R*Tree stores float32 boxes rounded outward.
+        columns = ", ".join(f"f.{col.strip()}" for col in NEARBY_COLUMNS.split(","))
+        filters = ["r.max_lat >= ?", "r.min_lat <= ?", "r.max_lng >= ?", "r.min_lng <= ?"]
+        params = [lat_min, lat_max, lng_min, lng_max]
+        from_sql = f"FROM {RTREE_TABLE} r JOIN features f ON f.geoname_id = r.geoname_id"
+        prefix = "f."
+    else:
+        columns = NEARBY_COLUMNS
+        filters = ["latitude BETWEEN ? AND ?", "longitude BETWEEN ? AND ?"]
+        params = [lat_min, lat_max, lng_min, lng_max]
+        from_sql = "FROM features"
+        prefix = ""
+
+    if feature_codes:
+        codes = list(feature_codes)
+        if codes:
+            filters.append(feature_code_predicate(codes, prefix=prefix, sargable=sargable))
+            params.extend(codes)
+
+    query = f"SELECT {columns} {from_sql} WHERE " + " AND ".join(filters)
+    return query, params
+
+
 def fetch_nearby_features(
     lat: float,
     lng: float,
@@ -148,42 +880,909 @@ def fetch_nearby_features(
     limit: int,
     feature_codes: Iterable[str] | None = None,
     db_path: Path | None = None,
+    engine: str | None = None,
 ) -> List[NearbyFeature]:
-    """Return the closest features within the requested radius (from a lite DB)."""
+    """
+    Return the closest features within the requested radius (from a lite DB).
+
+    ``engine`` overrides DALITRAIL_NEARBY_ENGINE: "sqlite" queries the file per
+    call, "grid" walks grid_lat/grid_lng cells in rings with a bounded top-k heap,
+    "numpy" answers from a columnar in-memory copy of the dataset.
+    """
 
     if radius_km <= 0:
         raise ValueError("radius_km must be positive")
     if not (1 <= limit <= 200):
         raise ValueError("limit must be within [1, 200]")
 
-    dataset_path = db_path or resolve_dataset_path()
-    lat_min, lat_max, lng_min, lng_max = _bounding_box(lat, lng, radius_km)
+    dataset_path = db_path or active_dataset_path()
+
+    engine = engine or NEARBY_ENGINE
+    if engine == "numpy":
+        if np is not None:
+            columnar = _ColumnarDataset.load(dataset_path)
+            return columnar.nearby(lat, lng, radius_km=radius_km, limit=limit, feature_codes=feature_codes)
+        _warn_numpy_missing()
+    elif engine == "grid":
+        features = _fetch_grid_rings(
+            dataset_path, lat, lng, k=limit, radius_km=radius_km, feature_codes=feature_codes
+        )
+        if features is not None:
+            return features
 
-    filters = ["latitude BETWEEN ? AND ?", "longitude BETWEEN ? AND ?"]
-    params: list[object] = [lat_min, lat_max, lng_min, lng_max]
-    if feature_codes:
-        codes = list(feature_codes)
+    features = _fetch_within_radius(
+        dataset_path, lat, lng, radius_km=radius_km, feature_codes=feature_codes
+    )
+    return features[:limit]
+
+
+def _fetch_within_radius(
+    dataset_path: Path,
+    lat: float,
+    lng: float,
+    *,
+    radius_km: float,
+    feature_codes: Iterable[str] | None = None,
+) -> List[NearbyFeature]:
+    """All features within ``radius_km`` of (lat, lng), sorted by distance (SQLite engine)."""
+    bbox = _bounding_box(lat, lng, radius_km)
+
+    with _pooled_connection(dataset_path) as conn:
+        use_rtree = _has_table(dataset_path, conn, RTREE_TABLE)
+        sargable = _has_column(dataset_path, conn, "features", FCODE_COLUMN)
+        query, params = _nearby_candidates_sql(bbox, feature_codes, use_rtree=use_rtree, sargable=sargable)
+        rows = conn.execute(query, params).fetchall()
+
+    features: list[NearbyFeature] = []
+    for row in rows:
+        distance = _haversine_km(lat, lng, row["latitude"], row["longitude"])
+        if distance <= radius_km:
+            features.append(
+                NearbyFeature(
+                    geoname_id=row["geoname_id"],
+                    name=row["name"],
+                    latitude=row["latitude"],
+                    longitude=row["longitude"],
+                    feature_class=row["feature_class"],
+                    feature_code=row["feature_code"],
+                    country=row["country"],
+                    admin1=row["admin1"],
+                    admin2=row["admin2"],
+                    population=row["population"],
+                    elevation=row["elevation"],
+                    timezone=row["timezone"],
+                    distance_km=distance,
+                )
+            )
+
+    features.sort(key=lambda feature: feature.distance_km)
+    return features
+
+
+# ---------------------------------------------------------------------------
+# Grid-cell ring expansion (grid_lat/grid_lng = floor of lat/lng, 1° cells)
+# ---------------------------------------------------------------------------
+GRID_MAX_RING = 180
+
+
+def _ring_cells(gy: int, gx: int, ring: int) -> dict[int, list[int]]:
+    """Cells at Chebyshev distance ``ring`` from (gy, gx), grouped by grid_lat."""
+    rows: dict[int, list[int]] = {}
+    for dy in range(-ring, ring + 1):
+        cell_lat = gy + dy
+        if not -90 <= cell_lat <= 89:
+            continue
+        if abs(dy) == ring:
+            dxs = range(-ring, ring + 1)
+        else:
+            dxs = (-ring, ring)
+        # Wrap longitude cells across the antimeridian (grid_lng in [-180, 179]).
+        lngs = sorted({(gx + dx + 180) % 360 - 180 for dx in dxs})
+        rows[cell_lat] = lngs
+    return rows
+
+
+def _ring_min_distance_km(lat: float, lng: float, gy: int, gx: int, ring: int) -> float:
+    """
+    Lower bound on the distance from (lat, lng) to any point in ``ring`` or beyond,
+    i.e. outside the square of cells covered by rings 0..ring-1.
+    """
+    if ring == 0:
+        return 0.0
+    to_north = (gy + ring) - lat
+    to_south = lat - (gy - ring + 1)
+    bound = min(to_north, to_south) * math.pi / 180.0 * EARTH_RADIUS_KM
+    to_meridian = min((gx + ring) - lng, lng - (gx - ring + 1))
+    if to_meridian < 90.0:
+        # Closest point on a meridian Δλ away: sin(d/R) = cos(φ)·sin(Δλ).
+        x = math.cos(math.radians(lat)) * math.sin(math.radians(to_meridian))
+        bound = min(bound, EARTH_RADIUS_KM * math.asin(min(1.0, x)))
+    return max(bound, 0.0)
+
+
+def _fetch_grid_rings(
+    dataset_path: Path,
+    lat: float,
+    lng: float,
+    *,
+    k: int,
+    radius_km: float | None = None,
+    feature_codes: Iterable[str] | None = None,
+) -> List[NearbyFeature] | None:
+    """
+    k closest features found by visiting grid cells in rings around the query cell.
+
+    Keeps a bounded top-k heap and stops once the next ring cannot beat the
+    current k-th distance (or lies beyond ``radius_km``), so rows read and
+    memory stay bounded regardless of density. Returns None when the dataset
+    has no grid columns.
+    """
+    codes = list(feature_codes) if feature_codes else []
+    gy, gx = math.floor(lat), math.floor(lng)
+    heap: list[tuple[float, int, NearbyFeature]] = []  # max-heap via negated distance
+    seq = 0
+
+    with _pooled_connection(dataset_path) as conn:
+        if not _has_column(dataset_path, conn, "features", "grid_lat"):
+            return None
+        code_filter = ""
         if codes:
-            placeholders = ",".join("?" for _ in codes)
-            filters.append("(feature_class || '.' || feature_code) IN (" + placeholders + ")")
-            params.extend(codes)
+            sargable = _has_column(dataset_path, conn, "features", FCODE_COLUMN)
+            code_filter = " AND " + feature_code_predicate(codes, sargable=sargable)
+
+        for ring in range(GRID_MAX_RING + 1):
+            bound = _ring_min_distance_km(lat, lng, gy, gx, ring)
+            if radius_km is not None and bound > radius_km:
+                break
+            if len(heap) >= k and bound > -heap[0][0]:
+                break
+
+            parts: list[str] = []
+            params: list[object] = []
+            for cell_lat, cell_lngs in _ring_cells(gy, gx, ring).items():
+                part = (
+                    f"SELECT {NEARBY_COLUMNS} FROM features WHERE grid_lat = ? AND grid_lng IN ("
+                    + ",".join("?" for _ in cell_lngs)
+                    + ")"
+                )
+                params.append(cell_lat)
+                params.extend(cell_lngs)
+                if codes:
+                    part += code_filter
+                    params.extend(codes)
+                parts.append(part)
+            if not parts:
+                continue
+
+            for row in conn.execute(" UNION ALL ".join(parts), params):
+                distance = _haversine_km(lat, lng, row["latitude"], row["longitude"])
+                if radius_km is not None and distance > radius_km:
+                    continue
+                if len(heap) >= k and distance >= -heap[0][0]:
+                    continue
+                feature = NearbyFeature(
+                    geoname_id=row["geoname_id"],
+                    name=row["name"],
+                    latitude=row["latitude"],
+                    longitude=row["longitude"],
+                    feature_class=row["feature_class"],
+                    feature_code=row["feature_code"],
+                    country=row["country"],
+                    admin1=row["admin1"],
+                    admin2=row["admin2"],
+                    population=row["population"],
+                    elevation=row["elevation"],
+                    timezone=row["timezone"],
+                    distance_km=distance,
+                )
+                seq += 1
+                if len(heap) < k:
+                    heapq.heappush(heap, (-distance, seq, feature))
+                else:
+                    heapq.heapreplace(heap, (-distance, seq, feature))
+
+    return [item[2] for item in sorted(heap, key=lambda item: (-item[0], item[1]))]
+
+
+# ---------------------------------------------------------------------------
+# Quantized LRU/TTL cache of nearby results
+# ---------------------------------------------------------------------------
+class _NearbyResultCache:
+    """
+    LRU + TTL cache of ``fetch_nearby_features`` results.
+
+    Keys are the query point rounded to ``precision`` decimals, radius, limit,
+    sorted feature codes and the dataset signature (path, inode, mtime, size),
+    so rewriting the dataset file invalidates every entry for that path. A
+    cached larger-radius result answers a smaller query when it provably holds
+    every feature the smaller query needs. Distances are recomputed for the
+    exact query point, so only features near the radius edge can differ
+    (by at most the quantization step).
+    """
+
+    def __init__(self, max_entries: int, ttl_sec: float, precision: int, reuse_larger: bool) -> None:
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.precision = precision
+        self.reuse_larger = reuse_larger
+        self._entries: OrderedDict[tuple, tuple[float, int, List[NearbyFeature]]] = OrderedDict()
+        self._by_point: dict[tuple, set[tuple]] = {}
+        self._signatures: dict[Path, tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.reuse_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _point_key(self, path: Path, lat: float, lng: float, codes: tuple[str, ...], signature: tuple) -> tuple:
+        return (str(path), signature, round(lat, self.precision), round(lng, self.precision), codes)
+
+    def _drop(self, key: tuple) -> None:
+        self._entries.pop(key, None)
+        point_key = key[0]
+        siblings = self._by_point.get(point_key)
+        if siblings is not None:
+            siblings.discard(key)
+            if not siblings:
+                del self._by_point[point_key]
+
+    def _invalidate_path(self, path: Path, signature: tuple) -> None:
+        previous = self._signatures.get(path)
+        self._signatures[path] = signature
+        if previous is None or previous == signature:
+            return
+        stale = [key for key in self._entries if key[0][0] == str(path) and key[0][1] != signature]
+        for key in stale:
+            self._drop(key)
+        self.invalidations += len(stale)
+
+    @staticmethod
+    def _answers(results: List[NearbyFeature], cached_limit: int, radius_km: float, limit: int) -> bool:
+        """Whether a (larger-radius) cached result contains the answer for (radius_km, limit)."""
+        if len(results) < cached_limit:
+            return True  # not truncated: every feature within the larger radius is present
+        if results[-1].distance_km >= radius_km:
+            return True  # truncated beyond the smaller radius
+        return len(results) >= limit and results[limit - 1].distance_km <= radius_km
+
+    def get(
+        self, path: Path, signature: tuple, lat: float, lng: float,
+        radius_km: float, limit: int, codes: tuple[str, ...],
+    ) -> tuple[List[NearbyFeature], float] | None:
+        """Return (cached features, cached radius) for the query, or None on a miss."""
+        point_key = self._point_key(path, lat, lng, codes, signature)
+        key = (point_key, radius_km, limit)
+        now = time.monotonic()
+        with self._lock:
+            self._invalidate_path(path, signature)
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl_sec:
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2], radius_km
+            if self.reuse_larger:
+                for other in list(self._by_point.get(point_key, ())):
+                    _, other_radius, other_limit = other
+                    cached_at, _, results = self._entries[other]
+                    if now - cached_at > self.ttl_sec:
+                        self._drop(other)
+                        self.expirations += 1
+                        continue
+                    if other_radius >= radius_km and self._answers(results, other_limit, radius_km, limit):
+                        self._entries.move_to_end(other)
+                        self.reuse_hits += 1
+                        return results, other_radius
+            self.misses += 1
+            return None
+
+    def put(
+        self, path: Path, signature: tuple, lat: float, lng: float,
+        radius_km: float, limit: int, codes: tuple[str, ...], results: List[NearbyFeature],
+    ) -> None:
+        point_key = self._point_key(path, lat, lng, codes, signature)
+        key = (point_key, radius_km, limit)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), limit, results)
+            self._entries.move_to_end(key)
+            self._by_point.setdefault(point_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_point.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.reuse_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_sec": self.ttl_sec,
+                "precision": self.precision,
+                "hits": self.hits,
+                "reuse_hits": self.reuse_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_ratio": round((self.hits + self.reuse_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+NEARBY_CACHE = _NearbyResultCache(
+    NEARBY_CACHE_SIZE, NEARBY_CACHE_TTL_SEC, NEARBY_CACHE_PRECISION, NEARBY_CACHE_REUSE_LARGER
+)
+
+
+def fetch_nearby_features_cached(
+    lat: float,
+    lng: float,
+    *,
+    radius_km: float,
+    limit: int,
+    feature_codes: Iterable[str] | None = None,
+    db_path: Path | None = None,
+    engine: str | None = None,
+) -> List[NearbyFeature]:
+    """
+    ``fetch_nearby_features`` behind the quantized result cache (NEARBY_CACHE).
+
+    Misses are computed for the quantized point; every answer is re-measured
+    from the exact (lat, lng) and re-sorted before the radius/limit cut.
+    """
+    if NEARBY_CACHE.max_entries <= 0:
+        return fetch_nearby_features(
+            lat, lng, radius_km=radius_km, limit=limit,
+            feature_codes=feature_codes, db_path=db_path, engine=engine,
+        )
+
+    dataset_path = Path(db_path or active_dataset_path()).resolve()
+    signature = dataset_signature(dataset_path)
+    codes = tuple(sorted(set(feature_codes))) if feature_codes else ()
+
+    cached = NEARBY_CACHE.get(dataset_path, signature, lat, lng, radius_km, limit, codes)
+    if cached is None:
+        precision = NEARBY_CACHE.precision
+        results = fetch_nearby_features(
+            round(lat, precision), round(lng, precision), radius_km=radius_km, limit=limit,
+            feature_codes=list(codes) or None, db_path=dataset_path, engine=engine,
+        )
+        NEARBY_CACHE.put(dataset_path, signature, lat, lng, radius_km, limit, codes, results)
+    else:
+        results = cached[0]
+
+    remeasured = []
+    for feature in results:
+        distance = _haversine_km(lat, lng, feature.latitude, feature.longitude)
+        if distance <= radius_km:
+            remeasured.append(replace(feature, distance_km=distance))
+    remeasured.sort(key=lambda feature: feature.distance_km)
+    return remeasured[:limit]
+
+
+def nearby_cache_stats() -> dict[str, Any]:
+    """Hit/miss/eviction counters of the nearby result cache."""
+    return NEARBY_CACHE.stats()
+
+
+def dataset_metadata(db_path: Path | None = None) -> dict[str, str]:
+    """Return metadata key/value pairs stored in the dataset (cached until the file changes)."""
+    dataset_path = db_path or active_dataset_path()
+    return DATASET_REGISTRY.metadata(dataset_path)
+
+
+# ---------------------------------------------------------------------------
+# Vectorized in-memory nearby engine (optional NumPy)
+# ---------------------------------------------------------------------------
+EARTH_RADIUS_KM = 6371.0
+
+_NUMPY_WARNED = False
+
+
+def _warn_numpy_missing() -> None:
+    global _NUMPY_WARNED
+    if not _NUMPY_WARNED:
+        LOGGER.warning("DALITRAIL_NEARBY_ENGINE=numpy but numpy is not installed; using SQLite engine.")
+        _NUMPY_WARNED = True
+
+
+def _unit_vectors(lat_rad: Any, lng_rad: Any) -> Any:
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack((cos_lat * np.cos(lng_rad), cos_lat * np.sin(lng_rad), np.sin(lat_rad)))
+
+
+def _km_to_chord(distance_km: float) -> float:
+    """Great-circle distance on Earth -> chord length on the unit sphere."""
+    return 2.0 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2.0)
+
+
+def _dictionary_encode(values: list[Any]) -> tuple[list[Any], Any]:
+    vocab: dict[Any, int] = {}
+    codes = np.fromiter((vocab.setdefault(v, len(vocab)) for v in values), dtype=np.int32, count=len(values))
+    return list(vocab), codes
+
+
+class _ColumnarDataset:
+    """
+    Columnar, in-memory copy of a lite dataset for vectorized nearby queries.
+
+    Rows are sorted by latitude so the bounding-box band is a ``searchsorted``
+    slice; coordinates are kept in radians (distance) and degrees (bbox),
+    ``feature_class.feature_code`` and other repetitive text columns are
+    dictionary-encoded. Only the winning rows become ``NearbyFeature`` objects.
+    """
+
+    _cache: dict[Path, "_ColumnarDataset"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, path: Path, signature: tuple[int, int, int], rows: list[sqlite3.Row]) -> None:
+        self.path = path
+        self.signature = signature
+        rows.sort(key=lambda r: r["latitude"])
+        n = len(rows)
+        self.size = n
+
+        self.ids = np.fromiter((r["geoname_id"] for r in rows), dtype=np.int64, count=n)
+        self.lat_deg = np.fromiter((r["latitude"] for r in rows), dtype=np.float64, count=n)
+        self.lng_deg = np.fromiter((r["longitude"] for r in rows), dtype=np.float64, count=n)
+        self.lat_rad = np.radians(self.lat_deg)
+        self.lng_rad = np.radians(self.lng_deg)
+        self.cos_lat = np.cos(self.lat_rad)
+
+        self.code_vocab, self.code_idx = _dictionary_encode(
+            [f"{r['feature_class']}.{r['feature_code']}" for r in rows]
+        )
+        self.class_vocab, self.class_idx = _dictionary_encode([r["feature_class"] for r in rows])
+        self.fcode_vocab, self.fcode_idx = _dictionary_encode([r["feature_code"] for r in rows])
+        self.country_vocab, self.country_idx = _dictionary_encode([r["country"] for r in rows])
+        self.admin1_vocab, self.admin1_idx = _dictionary_encode([r["admin1"] for r in rows])
+        self.tz_vocab, self.tz_idx = _dictionary_encode([r["timezone"] for r in rows])
+
+        self._tree: Any = None
+        self._xyz: Any = None
+
+        # Only read back for the winning rows.
+        self.names = [r["name"] for r in rows]
+        self.admin2 = [r["admin2"] for r in rows]
+        self.population = [r["population"] for r in rows]
+        self.elevation = [r["elevation"] for r in rows]
+
+    @classmethod
+    def load(cls, path: Path) -> "_ColumnarDataset":
+        """Return the cached columnar copy of ``path``, (re)loading it when the file changed."""
+        key = Path(path).resolve()
+        signature = dataset_signature(key)
+        cached = cls._cache.get(key)
+        if cached is not None and cached.signature == signature:
+            return cached
+        with cls._lock:
+            cached = cls._cache.get(key)
+            if cached is not None and cached.signature == signature:
+                return cached
+            started = time.perf_counter()
+            with _pooled_connection(key) as conn:
+                rows = conn.execute(
+                    f"SELECT {NEARBY_COLUMNS} FROM features "
+                    "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+                ).fetchall()
+            dataset = cls(key, signature, rows)
+            cls._cache[key] = dataset
+            LOGGER.info(
+                "numpy nearby engine: loaded %d features from %s in %.2fs",
+                dataset.size, key.name, time.perf_counter() - started,
+            )
+            return dataset
+
+    def _code_mask(self, feature_codes: Iterable[str] | None) -> Any:
+        if not feature_codes:
+            return None
+        wanted = set(feature_codes)
+        if not wanted:
+            return None
+        allowed = np.zeros(len(self.code_vocab), dtype=bool)
+        for index, code in enumerate(self.code_vocab):
+            if code in wanted:
+                allowed[index] = True
+        return allowed
+
+    def haversine_km(self, lat: float, lng: float, index: Any) -> Any:
+        """Vectorized haversine distance from (lat, lng) to the rows in ``index``."""
+        lat1 = math.radians(lat)
+        dlat = self.lat_rad[index] - lat1
+        dlng = self.lng_rad[index] - math.radians(lng)
+        a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * self.cos_lat[index] * np.sin(dlng / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def candidates(
+        self,
+        bbox: tuple[float, float, float, float],
+        feature_codes: Iterable[str] | None = None,
+    ) -> Any:
+        """Row indexes inside ``bbox`` (and matching ``feature_codes``)."""
+        lat_min, lat_max, lng_min, lng_max = bbox
+        lo = int(np.searchsorted(self.lat_deg, lat_min, side="left"))
+        hi = int(np.searchsorted(self.lat_deg, lat_max, side="right"))
+        lng_band = self.lng_deg[lo:hi]
+        mask = (lng_band >= lng_min) & (lng_band <= lng_max)
+        allowed = self._code_mask(feature_codes)
+        if allowed is not None:
+            mask &= allowed[self.code_idx[lo:hi]]
+        return np.flatnonzero(mask) + lo
+
+    def top_k(self, index: Any, distances: Any, limit: int) -> tuple[Any, Any]:
+        """Select the ``limit`` closest rows (sorted) with argpartition."""
+        if distances.size > limit:
+            part = np.argpartition(distances, limit - 1)[:limit]
+            index, distances = index[part], distances[part]
+        order = np.argsort(distances, kind="stable")
+        return index[order], distances[order]
+
+    def feature(self, i: int, distance_km: float) -> NearbyFeature:
+        return NearbyFeature(
+            geoname_id=int(self.ids[i]),
+            name=self.names[i],
+            latitude=float(self.lat_deg[i]),
+            longitude=float(self.lng_deg[i]),
+            feature_class=self.class_vocab[self.class_idx[i]],
+            feature_code=self.fcode_vocab[self.fcode_idx[i]],
+            country=self.country_vocab[self.country_idx[i]],
+            admin1=self.admin1_vocab[self.admin1_idx[i]],
+            admin2=self.admin2[i],
+            population=self.population[i],
+            elevation=self.elevation[i],
+            timezone=self.tz_vocab[self.tz_idx[i]],
+            distance_km=float(distance_km),
+        )
+
+    @property
+    def xyz(self) -> Any:
+        """Unit-sphere (x, y, z) coordinates; chord length is monotonic in great-circle distance."""
+        if self._xyz is None:
+            self._xyz = _unit_vectors(self.lat_rad, self.lng_rad)
+        return self._xyz
+
+    @property
+    def tree(self) -> Any:
+        """KD-tree over ``xyz`` (built once per loaded dataset); None without scipy."""
+        if self._tree is None and cKDTree is not None and self.size:
+            with self._lock:
+                if self._tree is None:
+                    started = time.perf_counter()
+                    self._tree = cKDTree(self.xyz)
+                    LOGGER.info(
+                        "knn: built KD-tree over %d features from %s in %.2fs",
+                        self.size, self.path.name, time.perf_counter() - started,
+                    )
+        return self._tree
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        *,
+        k: int,
+        max_distance_km: float | None = None,
+        feature_codes: Iterable[str] | None = None,
+    ) -> List[NearbyFeature]:
+        """Exactly the ``k`` closest features (optionally within ``max_distance_km``)."""
+        if not self.size:
+            return []
+        allowed = self._code_mask(feature_codes)
+        query = _unit_vectors(np.radians([lat]), np.radians([lng]))[0]
+        bound = _km_to_chord(max_distance_km) if max_distance_km is not None else np.inf
+
+        tree = self.tree
+        if tree is None:
+            # Brute force over the whole dataset (still one vectorized pass).
+            index = np.arange(self.size) if allowed is None else np.flatnonzero(allowed[self.code_idx])
+            distances = self.haversine_km(lat, lng, index)
+            if max_distance_km is not None:
+                keep = distances <= max_distance_km
+                index, distances = index[keep], distances[keep]
+            index, distances = self.top_k(index, distances, k)
+            return [self.feature(int(i), d) for i, d in zip(index, distances)]
+
+        # With a code filter, widen the tree query until k matches survive it.
+        fetch = k
+        while True:
+            fetch = min(fetch, self.size)
+            chords, index = tree.query(query, k=fetch, distance_upper_bound=bound)
+            chords, index = np.atleast_1d(chords), np.atleast_1d(index)
+            found = index < self.size  # misses beyond the bound are reported as n
+            index = index[found]
+            if allowed is not None:
+                index = index[allowed[self.code_idx[index]]]
+            if index.size >= k or fetch >= self.size or not found.all():
+                break
+            fetch *= 4
+
+        index = index[:k]
+        distances = self.haversine_km(lat, lng, index)
+        order = np.argsort(distances, kind="stable")
+        return [self.feature(int(index[i]), distances[i]) for i in order]
+
+    def nearby(
+        self,
+        lat: float,
+        lng: float,
+        *,
+        radius_km: float,
+        limit: int,
+        feature_codes: Iterable[str] | None = None,
+    ) -> List[NearbyFeature]:
+        index = self.candidates(_bounding_box(lat, lng, radius_km), feature_codes)
+        if index.size == 0:
+            return []
+        distances = self.haversine_km(lat, lng, index)
+        keep = distances <= radius_km
+        index, distances = self.top_k(index[keep], distances[keep], limit)
+        return [self.feature(int(i), d) for i, d in zip(index, distances)]
+
+    def nearby_batch(self, queries: list[NearbyQuery]) -> list[List[NearbyFeature]]:
+        """
+        Answer many radius queries with one ball query on the dataset's cached
+        KD-tree (so far-apart points cost no more than close ones), then apply each
+        query's code filter and limit (per-query vectorized passes without scipy).
+        """
+        if not queries:
+            return []
+        tree = self.tree
+        if tree is None:
+            return [
+                self.nearby(q.lat, q.lng, radius_km=q.radius_km, limit=q.limit, feature_codes=q.feature_codes)
+                for q in queries
+            ]
+
+        points = _unit_vectors(
+            np.radians([q.lat for q in queries]), np.radians([q.lng for q in queries])
+        )
+        radii = np.array([_km_to_chord(q.radius_km) for q in queries])
+        matches = tree.query_ball_point(points, radii, workers=-1)
+
+        masks: dict[tuple[str, ...], Any] = {}
+        results: list[List[NearbyFeature]] = []
+        for q, found in zip(queries, matches):
+            index = np.asarray(found, dtype=np.int64)
+            if q.feature_codes:
+                key = tuple(sorted(q.feature_codes))
+                if key not in masks:
+                    masks[key] = self._code_mask(key)
+                index = index[masks[key][self.code_idx[index]]]
+            if index.size == 0:
+                results.append([])
+                continue
+            distances = self.haversine_km(q.lat, q.lng, index)
+            keep = distances <= q.radius_km
+            index, distances = self.top_k(index[keep], distances[keep], q.limit)
+            results.append([self.feature(int(i), d) for i, d in zip(index, distances)])
+        return results
+
+
+@dataclass
+class NearbyQuery:
+    lat: float
+    lng: float
+    radius_km: float
+    limit: int
+    feature_codes: list[str] | None = None
+
+
+def fetch_nearby_features_batch(
+    queries: list[NearbyQuery],
+    *,
+    db_path: Path | None = None,
+) -> list[List[NearbyFeature]]:
+    """
+    Answer many nearby queries in one call; results keep the input order.
+
+    With numpy + scipy every query is answered from the dataset's cached KD-tree
+    in one ball query; with numpy alone each query is a vectorized pass, and
+    otherwise each query runs against the pooled SQLite connection.
+    """
+    for q in queries:
+        if q.radius_km <= 0:
+            raise ValueError("radius_km must be positive")
+        if not (1 <= q.limit <= 200):
+            raise ValueError("limit must be within [1, 200]")
+
+    dataset_path = db_path or active_dataset_path()
+    if np is not None:
+        return _ColumnarDataset.load(dataset_path).nearby_batch(queries)
+
+    return [
+        fetch_nearby_features(
+            q.lat, q.lng, radius_km=q.radius_km, limit=q.limit,
+            feature_codes=q.feature_codes, db_path=dataset_path,
+        )
+        for q in queries
+    ]
+
+
+def fetch_nearest_features(
+    lat: float,
+    lng: float,
+    *,
+    k: int,
+    max_distance_km: float | None = None,
+    feature_codes: Iterable[str] | None = None,
+    db_path: Path | None = None,
+) -> List[NearbyFeature]:
+    """
+    Return exactly the ``k`` closest features (k-NN), with no radius required.
 
-    query = (
-        "SELECT geoname_id, name, latitude, longitude, feature_class, feature_code, "
-        "country, admin1, admin2, population, elevation, timezone "
-        "FROM features WHERE "
-        + " AND ".join(filters)
+    Uses a cached KD-tree on unit-sphere coordinates when numpy + scipy are
+    installed; otherwise walks grid cells in rings (or widens a radius query on
+    datasets without grid columns) until ``k`` features are found.
+    """
+    if not (1 <= k <= 200):
+        raise ValueError("k must be within [1, 200]")
+    if max_distance_km is not None and max_distance_km <= 0:
+        raise ValueError("max_distance_km must be positive")
+
+    dataset_path = db_path or active_dataset_path()
+    if np is not None:
+        columnar = _ColumnarDataset.load(dataset_path)
+        return columnar.nearest(
+            lat, lng, k=k, max_distance_km=max_distance_km, feature_codes=feature_codes
+        )
+
+    # Pure SQLite fallback: grid rings when the dataset has grid columns,
+    # otherwise an expanding radius (each step is an indexed bbox query).
+    codes = list(feature_codes) if feature_codes else None
+    features = _fetch_grid_rings(
+        dataset_path, lat, lng, k=k, radius_km=max_distance_km, feature_codes=codes
     )
+    if features is not None:
+        return features
+    ceiling = max_distance_km if max_distance_km is not None else math.pi * EARTH_RADIUS_KM
+    radius = min(10.0, ceiling)
+    while True:
+        features = _fetch_within_radius(dataset_path, lat, lng, radius_km=radius, feature_codes=codes)
+        if len(features) >= k or radius >= ceiling:
+            return features[:k]
+        radius = min(radius * 4, ceiling)
 
-    with _connect(dataset_path) as conn:
-        rows = conn.execute(query, params).fetchall()
 
-    features: list[NearbyFeature] = []
-    for row in rows:
-        distance = _haversine_km(lat, lng, row["latitude"], row["longitude"])
-        if distance <= radius_km:
-            features.append(
-                NearbyFeature(
+# ---------------------------------------------------------------------------
+# Corridor search along a polyline (features near a trail or track)
+# ---------------------------------------------------------------------------
+@dataclass
+class CorridorFeature(NearbyFeature):
+    along_km: float = 0.0
+
+
+def _local_xy_km(lat: float, lng: float, lat0: float, lng0: float) -> tuple[float, float]:
+    """Equirectangular projection around (lat0, lng0); accurate for short spans."""
+    k = math.pi / 180.0 * EARTH_RADIUS_KM
+    return (lng - lng0) * k * math.cos(math.radians(lat0)), (lat - lat0) * k
+
+
+def _point_segment_km(
+    lat: float, lng: float, a: tuple[float, float], b: tuple[float, float]
+) -> tuple[float, float]:
+    """(distance_km, t) from a point to segment a-b, t in [0, 1] along the segment."""
+    ax, ay = _local_xy_km(a[0], a[1], lat, lng)
+    bx, by = _local_xy_km(b[0], b[1], lat, lng)
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, -(ax * dx + ay * dy) / length_sq))
+    return math.hypot(ax + t * dx, ay + t * dy), t
+
+
+def _simplify_indices(points: list[tuple[float, float]], tolerance_km: float) -> list[int]:
+    """Douglas-Peucker; returns the indexes of the vertices to keep."""
+    if len(points) < 3 or tolerance_km <= 0:
+        return list(range(len(points)))
+    keep = {0, len(points) - 1}
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        worst, worst_index = 0.0, -1
+        for i in range(first + 1, last):
+            d, _ = _point_segment_km(points[i][0], points[i][1], points[first], points[last])
+            if d > worst:
+                worst, worst_index = d, i
+        if worst > tolerance_km:
+            keep.add(worst_index)
+            stack.append((first, worst_index))
+            stack.append((worst_index, last))
+    return sorted(keep)
+
+
+def _corridor_spans(
+    points: list[tuple[float, float]],
+    cumulative: list[float],
+    tolerance_km: float,
+    max_span_km: float,
+) -> list[tuple[int, int]]:
+    """Simplified segments as (first, last) vertex spans, split to at most ``max_span_km``."""
+    kept = _simplify_indices(points, tolerance_km)
+    spans: list[tuple[int, int]] = []
+    for first, last in zip(kept, kept[1:]):
+        start = first
+        for i in range(first + 1, last):
+            if cumulative[i] - cumulative[start] >= max_span_km:
+                spans.append((start, i))
+                start = i
+        spans.append((start, last))
+    return spans
+
+
+def iter_corridor_features(
+    points: list[tuple[float, float]],
+    *,
+    buffer_km: float,
+    feature_codes: Iterable[str] | None = None,
+    simplify_km: float | None = None,
+    limit: int | None = None,
+    db_path: Path | None = None,
+) -> Iterator[CorridorFeature]:
+    """
+    Yield every feature within ``buffer_km`` of the polyline, ordered by
+    distance along the route (``along_km``), as the line is processed.
+
+    The line is simplified (Douglas-Peucker, ``simplify_km``) into spans; each
+    span is searched with the union of ``_bounding_box`` around its original
+    vertices, and candidates are measured against the original sub-polyline.
+    Features seen by an earlier span are not repeated.
+    """
+    if buffer_km <= 0:
+        raise ValueError("buffer_km must be positive")
+    if not points:
+        return
+
+    dataset_path = db_path or active_dataset_path()
+    codes = list(feature_codes) if feature_codes else None
+    if len(points) == 1:
+        points = [points[0], points[0]]
+
+    cumulative = [0.0]
+    for a, b in zip(points, points[1:]):
+        cumulative.append(cumulative[-1] + _haversine_km(a[0], a[1], b[0], b[1]))
+
+    tolerance = buffer_km if simplify_km is None else simplify_km
+    spans = _corridor_spans(points, cumulative, tolerance, max_span_km=max(4 * buffer_km, 1.0))
+
+    seen: set[int] = set()
+    emitted = 0
+    for first, last in spans:
+        boxes = [_bounding_box(lat, lng, buffer_km) for lat, lng in points[first : last + 1]]
+        bbox = (
+            min(b[0] for b in boxes),
+            max(b[1] for b in boxes),
+            min(b[2] for b in boxes),
+            max(b[3] for b in boxes),
+        )
+        with _pooled_connection(dataset_path) as conn:
+            use_rtree = _has_table(dataset_path, conn, RTREE_TABLE)
+            sargable = _has_column(dataset_path, conn, "features", FCODE_COLUMN)
+            query, params = _nearby_candidates_sql(bbox, codes, use_rtree=use_rtree, sargable=sargable)
+            rows = conn.execute(query, params).fetchall()
+
+        matches: list[CorridorFeature] = []
+        for row in rows:
+            if row["geoname_id"] in seen:
+                continue
+            best: tuple[float, float] | None = None
+            for i in range(first, last):
+                d, t = _point_segment_km(row["latitude"], row["longitude"], points[i], points[i + 1])
+                if best is None or d < best[0]:
+                    best = (d, cumulative[i] + t * (cumulative[i + 1] - cumulative[i]))
+            if best is None or best[0] > buffer_km:
+                continue
+            seen.add(row["geoname_id"])
+            matches.append(
+                CorridorFeature(
                     geoname_id=row["geoname_id"],
                     name=row["name"],
                     latitude=row["latitude"],
@@ -196,23 +1795,323 @@ def fetch_nearby_features(
                     population=row["population"],
                     elevation=row["elevation"],
                     timezone=row["timezone"],
-                    distance_km=distance,
+                    distance_km=best[0],
+                    along_km=best[1],
                 )
             )
 
-    features.sort(key=lambda feature: feature.distance_km)
-    return features[:limit]
+        matches.sort(key=lambda feature: (feature.along_km, feature.distance_km))
+        for feature in matches:
+            yield feature
+            emitted += 1
+            if limit is not None and emitted >= limit:
+                return
 
 
-def dataset_metadata(db_path: Path | None = None) -> dict[str, str]:
-    """Return metadata key/value pairs stored in the dataset."""
-    dataset_path = db_path or resolve_dataset_path()
-    with _connect(dataset_path) as conn:
-        try:
-            rows = conn.execute("SELECT key, value FROM metadata").fetchall()
-        except sqlite3.OperationalError:
-            return {}
-    return {row["key"]: row["value"] for row in rows}
+# ---------------------------------------------------------------------------
+# Name search (FTS5 prefix matching, importance-ordered candidates, text + population + distance ranking)
+# ---------------------------------------------------------------------------
+@dataclass
+class PlaceMatch(NearbyFeature):
+    score: float = 0.0  # lower is better; distance_km is None without an anchor point
+
+
+_SEARCH_TOKEN_RE = re.compile(r"\w+")
+
+
+def _fts_prefix_query(q: str) -> str:
+    """
+    FTS5 MATCH expression for ``q``: every word must match, as a prefix when it has
+    two or more characters (one-letter prefixes would match most of the master).
+    A lone two-letter query only matches the first word of the primary name, which
+    keeps the first keystrokes from ranking a large share of the master.
+    """
+    tokens = _SEARCH_TOKEN_RE.findall(q)
+    if len(tokens) == 1 and len(tokens[0]) == 2:
+        return f'name : ^ "{tokens[0]}"*'
+    return " ".join(f'"{token}"*' if len(token) > 1 else f'"{token}"' for token in tokens)
+
+
+def search_places(
+    q: str,
+    *,
+    lat: float | None = None,
+    lng: float | None = None,
+    limit: int = 10,
+    feature_codes: Iterable[str] | None = None,
+    db_path: Path | None = None,
+) -> List[PlaceMatch]:
+    """
+    Autocomplete-style name search over the FTS5 name index (names and alternate
+    names, prefix matching, diacritics folded).
+
+    Index rowids put populous places first, then features with many alternate
+    names, so the first SEARCH_MAX_CANDIDATES matches in rowid order (after the
+    feature_codes filter) are the most important ones and FTS5 never reads the
+    rest of a common prefix. Those are ordered by ``SEARCH_ALT_NAME_PENALTY`` when
+    only an alternate name matched, plus ``SEARCH_NAME_WORD_WEIGHT`` per name word
+    beyond the query's, ``- SEARCH_POPULATION_WEIGHT * digits(population) +
+    SEARCH_DISTANCE_WEIGHT * d² / (d² + SEARCH_DISTANCE_SCALE_KM²)``, d being the
+    distance to (lat, lng) when given. A minor feature is therefore missed when
+    more than SEARCH_MAX_CANDIDATES more important features match the same words.
+    Datasets without the index fall back to a name prefix scan.
+    """
+    if not (1 <= limit <= 100):
+        raise ValueError("limit must be within [1, 100]")
+    if (lat is None) != (lng is None):
+        raise ValueError("lat and lng must be given together")
+    match = _fts_prefix_query(q)
+    if not match:
+        return []
+
+    dataset_path = db_path or active_dataset_path()
+    codes = list(feature_codes) if feature_codes else []
+    population_sql = f"{SEARCH_POPULATION_WEIGHT} * length(COALESCE(NULLIF(f.population, 0), ''))"
+    params: list[Any] = []
+    distance_sql = "0"
+    if lat is not None:
+        kx = 111.0 * max(math.cos(math.radians(lat)), 1e-6)
+        d2 = f"(((f.latitude - ?) * 111.0) * ((f.latitude - ?) * 111.0) + ((f.longitude - ?) * {kx}) * ((f.longitude - ?) * {kx}))"
+        distance_sql = f"{SEARCH_DISTANCE_WEIGHT} * {d2} / ({d2} + {SEARCH_DISTANCE_SCALE_KM ** 2})"
+        params = [lat, lat, lng, lng] * 2
+
+    candidates: list[sqlite3.Row] | None = None
+    with _pooled_connection(dataset_path) as conn:
+        sargable = _has_column(dataset_path, conn, "features", FCODE_COLUMN)
+        code_sql = f" AND {feature_code_predicate(codes, prefix='f.', sargable=sargable)}" if codes else ""
+        if _has_table(dataset_path, conn, NAME_FTS_TABLE):
+            # First matches in rowid (importance) order, code filter included: FTS5 stops
+            # after SEARCH_MAX_CANDIDATES rows, and no bm25() (it counts every match)
+            sql = (
+                f"SELECT {', '.join(f'f.{col.strip()}' for col in NEARBY_COLUMNS.split(','))} "
+                f"FROM {NAME_FTS_TABLE} JOIN features f ON f.geoname_id = {NAME_FTS_TABLE}.rowid & {NAME_FTS_ID_MASK} "
+                f"WHERE {NAME_FTS_TABLE} MATCH ?{code_sql} ORDER BY {NAME_FTS_TABLE}.rowid LIMIT ?"
+            )
+            candidates = conn.execute(sql, [match, *codes, SEARCH_MAX_CANDIDATES]).fetchall()
+        else:
+            # Unindexed datasets (tools/add_name_index.py adds the index): leading-word prefix only
+            sql = (
+                f"SELECT {', '.join(f'f.{col.strip()}' for col in NEARBY_COLUMNS.split(','))}, "
+                f"-{population_sql} + {distance_sql} AS score FROM features f "
+                f"WHERE f.name LIKE ? ESCAPE '\\'{code_sql} ORDER BY score LIMIT ?"
+            )
+            pattern = q.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = conn.execute(sql, [*params, pattern, *codes, limit]).fetchall()
+    if candidates is not None:
+        return _rank_name_matches(q, candidates, lat, lng, limit)
+
+    return [
+        PlaceMatch(
+            geoname_id=row["geoname_id"],
+            name=row["name"],
+            latitude=row["latitude"],
+            longitude=row["longitude"],
+            feature_class=row["feature_class"],
+            feature_code=row["feature_code"],
+            country=row["country"],
+            admin1=row["admin1"],
+            admin2=row["admin2"],
+            population=row["population"],
+            elevation=row["elevation"],
+            timezone=row["timezone"],
+            distance_km=_haversine_km(lat, lng, row["latitude"], row["longitude"]) if lat is not None else None,
+            score=row["score"],
+        )
+        for row in rows
+    ]
+
+
+def _name_words(value: str) -> list[str]:
+    """Words of ``value`` as the name index tokenizes them: diacritics dropped, case folded."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return _SEARCH_TOKEN_RE.findall("".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold())
+
+
+def _rank_name_matches(
+    q: str, candidates: list[sqlite3.Row], lat: float | None, lng: float | None, limit: int
+) -> List[PlaceMatch]:
+    """The ``limit`` best search_places() candidates by text, population and distance."""
+    query = _name_words(q)
+    scored = []
+    for row in candidates:
+        words = _name_words(row["name"])
+        in_name = all(any(word.startswith(token) for word in words) for token in query)
+        score = (0.0 if in_name else SEARCH_ALT_NAME_PENALTY) + SEARCH_NAME_WORD_WEIGHT * max(0, len(words) - len(query))
+        score -= SEARCH_POPULATION_WEIGHT * len(str(row["population"] or ""))
+        distance = _haversine_km(lat, lng, row["latitude"], row["longitude"]) if lat is not None else None
+        if distance is not None:
+            score += SEARCH_DISTANCE_WEIGHT * distance ** 2 / (distance ** 2 + SEARCH_DISTANCE_SCALE_KM ** 2)
+        scored.append((score, row["geoname_id"], row, distance))
+
+    return [
+        PlaceMatch(
+            geoname_id=row["geoname_id"],
+            name=row["name"],
+            latitude=row["latitude"],
+            longitude=row["longitude"],
+            feature_class=row["feature_class"],
+            feature_code=row["feature_code"],
+            country=row["country"],
+            admin1=row["admin1"],
+            admin2=row["admin2"],
+            population=row["population"],
+            elevation=row["elevation"],
+            timezone=row["timezone"],
+            distance_km=distance,
+            score=score,
+        )
+        for score, _, row, distance in heapq.nsmallest(limit, scored, key=lambda item: item[:2])
+    ]
+
+
+def _bounded_edit_distance(a: str, b: str, bound: int) -> int:
+    """
+    Edit distance of ``a`` and ``b`` (Levenshtein plus adjacent transpositions, the
+    commonest typo), or ``bound + 1`` once it must exceed ``bound``; only the
+    diagonal band of width 2 * bound + 1 is computed.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    over = bound + 1
+    before: list[int] = []
+    previous = [j if j <= bound else over for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        lo, hi = max(1, i - bound), min(len(b), i + bound)
+        current = [over] * (len(b) + 1)
+        if i <= bound:
+            current[0] = i
+        row_min = current[0]
+        for j in range(lo, hi + 1):
+            cb = b[j - 1]
+            cost = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb and before[j - 2] + 1 < cost:
+                cost = before[j - 2] + 1
+            current[j] = cost if cost < over else over
+            if cost < row_min:
+                row_min = cost
+        if row_min > bound:
+            return over
+        before, previous = previous, current
+    return previous[-1]
+
+
+def _name_edit_distance(query: str, name: str, bound: int, memo: dict[str, int]) -> int:
+    """Best distance of ``query`` to the whole folded ``name`` or to any run of as many words."""
+    width = len(query.split())
+    words = name.split()
+    best = bound + 1
+    for candidate in {name, *(" ".join(words[i : i + width]) for i in range(len(words) - width + 1))}:
+        distance = memo.get(candidate)
+        if distance is None:
+            distance = memo[candidate] = _bounded_edit_distance(query, candidate, bound)
+        if distance < best:
+            best = distance
+    return best
+
+
+def fuzzy_search_places(
+    q: str,
+    *,
+    lat: float | None = None,
+    lng: float | None = None,
+    limit: int = 10,
+    feature_codes: Iterable[str] | None = None,
+    max_edits: int | None = None,
+    db_path: Path | None = None,
+) -> List[PlaceMatch]:
+    """
+    Typo-tolerant name search ("Snoqualmy" -> Snoqualmie) over the trigram index.
+
+    The query's rarest trigrams (document counts from the vocab table, at most
+    SEARCH_FUZZY_MAX_POSTINGS postings in total; a trigram over the budget on its
+    own is skipped) select candidates. FTS5 ranks all of them by BM25 and the best
+    SEARCH_FUZZY_CANDIDATES are re-ranked by bounded edit distance to the name or a
+    run of its words. Matches within ``max_edits`` (default: 1 per 4 characters,
+    1..3) are ordered by ``edits * SEARCH_FUZZY_EDIT_WEIGHT`` plus the
+    population/distance terms of search_places(). Without the index, or when every
+    trigram of the query is too common, this falls back to search_places().
+    """
+    if not (1 <= limit <= 100):
+        raise ValueError("limit must be within [1, 100]")
+    if (lat is None) != (lng is None):
+        raise ValueError("lat and lng must be given together")
+    query = fold_name(q)
+    grams = {query[i : i + 3] for i in range(len(query) - 2)}
+    if not grams:
+        return []
+    bound = max_edits if max_edits is not None else max(1, min(3, len(query) // 4))
+
+    dataset_path = db_path or active_dataset_path()
+    codes = list(feature_codes) if feature_codes else []
+    with _pooled_connection(dataset_path) as conn:
+        if not _has_table(dataset_path, conn, TRIGRAM_TABLE):
+            use_prefix = True
+        else:
+            placeholders = ",".join("?" for _ in grams)
+            counts = conn.execute(
+                f"SELECT term, doc FROM {TRIGRAM_TABLE}_vocab WHERE term IN ({placeholders})", list(grams)
+            ).fetchall()
+            chosen: list[str] = []
+            postings = 0
+            for term, docs in sorted(counts, key=lambda item: item[1]):
+                if postings + docs > SEARCH_FUZZY_MAX_POSTINGS:
+                    break  # ascending counts: no later trigram fits either
+                chosen.append(term)
+                postings += docs
+            use_prefix = not chosen
+            if chosen:
+                sargable = _has_column(dataset_path, conn, "features", FCODE_COLUMN)
+                code_sql = f" AND {feature_code_predicate(codes, prefix='f.', sargable=sargable)}" if codes else ""
+                match = " OR ".join('"' + term.replace('"', '""') + '"' for term in chosen)
+                # All postings are ranked (the budget bounds them); with a code filter every
+                # ranked row goes through the join so filtered-out names do not use up the cap
+                sql = (
+                    f"SELECT {', '.join(f'f.{col.strip()}' for col in NEARBY_COLUMNS.split(','))}, t.name AS folded "
+                    f"FROM (SELECT rowid, name, rank AS text_score FROM {TRIGRAM_TABLE} "
+                    f"      WHERE {TRIGRAM_TABLE} MATCH ? ORDER BY rank LIMIT ?) t "
+                    f"JOIN features f ON f.geoname_id = t.rowid "
+                    f"WHERE 1=1{code_sql} ORDER BY t.text_score LIMIT ?"
+                )
+                ranked = SEARCH_FUZZY_MAX_POSTINGS if codes else SEARCH_FUZZY_CANDIDATES
+                rows = conn.execute(sql, [match, ranked, *codes, SEARCH_FUZZY_CANDIDATES]).fetchall()
+    if use_prefix:
+        return search_places(q, lat=lat, lng=lng, limit=limit, feature_codes=codes or None, db_path=dataset_path)
+
+    scored = []
+    memo: dict[str, int] = {}  # names and word runs repeat across candidates
+    for row in rows:
+        edits = _name_edit_distance(query, row["folded"], bound, memo)
+        if edits > bound:
+            continue
+        distance = _haversine_km(lat, lng, row["latitude"], row["longitude"]) if lat is not None else None
+        score = edits * SEARCH_FUZZY_EDIT_WEIGHT - SEARCH_POPULATION_WEIGHT * len(str(row["population"] or ""))
+        if distance is not None:
+            score += SEARCH_DISTANCE_WEIGHT * distance ** 2 / (distance ** 2 + SEARCH_DISTANCE_SCALE_KM ** 2)
+        scored.append((score, row["geoname_id"], row, distance))
+
+    return [
+        PlaceMatch(
+            geoname_id=row["geoname_id"],
+            name=row["name"],
+            latitude=row["latitude"],
+            longitude=row["longitude"],
+            feature_class=row["feature_class"],
+            feature_code=row["feature_code"],
+            country=row["country"],
+            admin1=row["admin1"],
+            admin2=row["admin2"],
+            population=row["population"],
+            elevation=row["elevation"],
+            timezone=row["timezone"],
+            distance_km=distance,
+            score=score,
+        )
+        for score, _, row, distance in heapq.nsmallest(limit, scored, key=lambda item: item[:2])
+    ]
 
 
 # ----------------------- Catalog (existing) -----------------------------------
@@ -289,7 +2188,7 @@ def _resolve_catalog_entry(entry: dict[str, Any]) -> dict[str, Any]:
 
     if source == "active":
         try:
-            file_path = resolve_dataset_path()
+            file_path = active_dataset_path()
         except GeoNamesDatasetNotFound as exc:
             available = False
             error_message = str(exc)
@@ -331,6 +2230,41 @@ def _resolve_catalog_entry(entry: dict[str, Any]) -> dict[str, Any]:
     return dataset
 
 
+_CATALOG_FILES: tuple[Any, list[Path]] | None = None  # (catalog signature, static dataset paths)
+
+
+def _optional_signature(path: Path) -> tuple[int, int, int] | None:
+    try:
+        return dataset_signature(path)
+    except FileNotFoundError:
+        return None
+
+
+def dataset_catalog_signature() -> tuple[Any, ...]:
+    """
+    Change token for load_geonames_dataset_catalog(): signatures of the catalog
+    file, the static dataset files it references and the active dataset. Files
+    are re-stat'ed through the dataset registry (at most every
+    DATASET_RECHECK_SEC), so checking it per request costs no I/O.
+    """
+    global _CATALOG_FILES
+    catalog_sig = _optional_signature(DATASET_CATALOG_PATH)
+    cached = _CATALOG_FILES
+    if cached is None or cached[0] != catalog_sig:
+        paths = []
+        for entry in _load_dataset_config():
+            if entry.get("source", "static") != "active" and entry.get("path"):
+                candidate = Path(entry["path"])
+                paths.append(candidate if candidate.is_absolute() else BASE_DIR / candidate)
+        cached = _CATALOG_FILES = (catalog_sig, paths)
+    try:
+        active: tuple[Any, ...] = (str(active_dataset_path()),)
+    except GeoNamesDatasetNotFound:
+        active = (None,)
+    active += (_optional_signature(Path(active[0])) if active[0] else None,)
+    return (catalog_sig, active, tuple(_optional_signature(p) for p in cached[1]))
+
+
 def load_geonames_dataset_catalog() -> list[dict[str, Any]]:
     """Return the list of GeoNames datasets available for download."""
     resolved: list[dict[str, Any]] = []
@@ -351,6 +2285,102 @@ def load_geonames_dataset_catalog() -> list[dict[str, Any]]:
     return resolved
 
 
+# ---------------------------------------------------------------------------
+# Materialized region statistics (region_stats, maintained after ingest)
+# ---------------------------------------------------------------------------
+REGION_STATS_TABLE = "region_stats"
+
+REGION_STATS_SCHEMA_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {REGION_STATS_TABLE} (
+      level TEXT NOT NULL,            -- 'admin1' | 'admin2'
+      country TEXT,
+      admin1 TEXT,
+      admin2 TEXT,                    -- NULL on admin1 rows
+      n INTEGER NOT NULL,
+      min_lat REAL, max_lat REAL,
+      min_lng REAL, max_lng REAL,
+      class_counts TEXT NOT NULL,     -- JSON object: feature_class -> count
+      refreshed_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_region_stats_level ON {REGION_STATS_TABLE}(level, country);
+"""
+
+# One pass over features at (country, admin1, admin2, feature_class) granularity;
+# both levels are rolled up from this much smaller table.
+_REGION_CLASS_SQL = """
+    CREATE TEMP TABLE region_class AS
+    SELECT country, admin1, admin2, feature_class,
+           COUNT(*) AS n,
+           MIN(latitude) AS min_lat, MAX(latitude) AS max_lat,
+           MIN(longitude) AS min_lng, MAX(longitude) AS max_lng
+    FROM main.features
+    {where}
+    GROUP BY country, admin1, admin2, feature_class
+"""
+
+_REGION_ROLLUP_SQL = f"""
+    INSERT INTO main.{REGION_STATS_TABLE}
+      (level, country, admin1, admin2, n, min_lat, max_lat, min_lng, max_lng, class_counts, refreshed_at)
+    SELECT ?, country, admin1, {{admin2}}, SUM(n),
+           MIN(min_lat), MAX(max_lat), MIN(min_lng), MAX(max_lng),
+           json_group_object(COALESCE(feature_class, ''), n), ?
+    FROM (
+      SELECT country, admin1, {{admin2}} AS admin2, feature_class, SUM(n) AS n,
+             MIN(min_lat) AS min_lat, MAX(max_lat) AS max_lat,
+             MIN(min_lng) AS min_lng, MAX(max_lng) AS max_lng
+      FROM temp.region_class
+      GROUP BY country, admin1, {{admin2}}, feature_class
+    )
+    GROUP BY country, admin1, {{admin2}}
+"""
+
+
+def refresh_region_stats(master_db: Optional[Path] = None, countries: Optional[Iterable[str]] = None) -> dict[str, Any]:
+    """
+    Recompute region_stats in the (writable) master: feature counts, bounding boxes
+    and per-feature-class counts per admin1 and admin2 region. With ``countries``
+    only those countries' rows are replaced (incremental refresh after an update
+    that touched them); countries that no longer have features drop out.
+    Returns {"countries", "rows", "seconds"}.
+    """
+    db_path = Path(master_db or resolve_master_dataset_path())
+    codes = sorted({c.upper() for c in countries or [] if c})
+    where, params = "", []
+    if codes:
+        where = f"WHERE country IN ({','.join('?' for _ in codes)})"
+        params = list(codes)
+
+    started = time.perf_counter()
+    refreshed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with closing(sqlite3.connect(str(db_path), isolation_level=None)) as conn:
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.executescript(REGION_STATS_SCHEMA_SQL)  # executescript commits, so before BEGIN
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(_REGION_CLASS_SQL.format(where=where), params)
+            conn.execute(f"DELETE FROM main.{REGION_STATS_TABLE} {where}", params)
+            conn.execute(_REGION_ROLLUP_SQL.format(admin2="NULL"), ("admin1", refreshed_at))
+            conn.execute(_REGION_ROLLUP_SQL.format(admin2="admin2"), ("admin2", refreshed_at))
+            rows = conn.execute(f"SELECT COUNT(*) FROM main.{REGION_STATS_TABLE} {where}", params).fetchone()[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO main.metadata(key, value) VALUES ('region_stats_refreshed_at', ?)",
+                (refreshed_at,),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.execute("DROP TABLE IF EXISTS temp.region_class")
+    return {"countries": codes or "all", "rows": rows, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def _has_region_stats(con: sqlite3.Connection) -> bool:
+    return con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (REGION_STATS_TABLE,)
+    ).fetchone() is not None
+
+
 # ---------------------------------------------------------------------------
 # NEW: dynamic scanning + lite dataset building
 # ---------------------------------------------------------------------------
@@ -364,12 +2394,21 @@ def scan_regions(
 ) -> list[dict]:
     """
     Scan the master GeoNames DB for regions and return entries with counts and bboxes.
+
+    Reads the materialized region_stats table (which also provides
+    ``class_counts``) when the master has one; otherwise falls back to a
+    GROUP BY over every feature.
     """
     if level not in {"admin1", "admin2"}:
         raise ValueError("level must be 'admin1' or 'admin2'")
 
     db_path = master_db or resolve_master_dataset_path()
 
+    with _connect(db_path) as con:
+        use_stats = _has_region_stats(con)
+    if use_stats:
+        return _scan_region_stats(db_path, level=level, country=country, min_count=min_count, limit=limit)
+
     group_cols = ["country", "admin1"]
     if level == "admin2":
         group_cols.append("admin2")
@@ -412,6 +2451,37 @@ def scan_regions(
     return out
 
 
+def _scan_region_stats(
+    db_path: Path, *, level: str, country: Optional[str], min_count: int, limit: int
+) -> list[dict]:
+    """scan_regions() answered from region_stats (same keys, plus class_counts)."""
+    where = ["level = ?"]
+    params: list[Any] = [level]
+    if country:
+        where.append("country = ?")
+        params.append(country)
+    sql = f"""
+      SELECT country, admin1, {'admin2, ' if level == 'admin2' else ''}n,
+             min_lat, max_lat, min_lng, max_lng, class_counts
+      FROM {REGION_STATS_TABLE}
+      WHERE {' AND '.join(where)} AND n >= ?
+      ORDER BY n DESC
+      LIMIT ?
+    """
+    params.extend([min_count, limit])
+
+    out: list[dict] = []
+    with _connect(db_path) as con:
+        for row in con.execute(sql, params):
+            item = dict(row)
+            item["class_counts"] = json.loads(item["class_counts"])
+            item["level"] = level
+            parts = [p for p in [item.get("country"), item.get("admin1"), item.get("admin2")] if p]
+            item["label"] = " • ".join(parts) + f" ({item['n']})"
+            out.append(item)
+    return out
+
+
 def _fetch_region_names(db_path: Path, regions: list[dict[str, Any]]) -> None:
     """
     Enrich a list of region dicts with 'country_name' and 'admin1_name'
@@ -488,6 +2558,16 @@ def _fetch_region_names(db_path: Path, regions: list[dict[str, Any]]) -> None:
 # def build_filter_label(...) -> str: ...
 # --------------------------------------------------------------------------
 
+LITE_PROGRESS_OPS = 100_000  # VM instructions between progress callbacks
+LITE_COPY_BATCH = 50_000  # rows per INSERT ... SELECT (granularity of rows_copied)
+
+LITE_FEATURE_COLUMNS = (
+    "geoname_id", "name", "latitude", "longitude", "feature_class", "feature_code",
+    "country", "admin1", "admin2", "population", "elevation", "timezone",
+    "grid_lat", "grid_lng",
+)
+
+
 def build_lite_dataset(
     out_path: Path,
     *,
@@ -497,18 +2577,33 @@ def build_lite_dataset(
     feature_codes: Optional[Iterable[str]] = None,
     label: str = "",
     master_db: Optional[Path] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    master_conn: Optional[sqlite3.Connection] = None,
+    search_indexes: bool = False,
 ) -> int:
     """
     Create a subset (lite) SQLite db with the schema expected by the client:
       - features (columns used by /assets/js/search.js)
       - metadata (lite_filter, lite_generated_at)
+
+    Rows are copied inside SQLite: the master is ATTACHed read-only and rows
+    move with keyset-paginated ``INSERT ... SELECT`` batches, so they never pass
+    through Python. Indexes and the R*Tree are created after the load.
       
     FIXED: Resolves 'cannot VACUUM from within a transaction' error by using 
            isolation_level=None (autocommit mode) for the 'lite' connection.
+
+    ``progress(rows_copied, bytes_written)`` is called from SQLite's progress
+    handler every LITE_PROGRESS_OPS VM instructions while the build runs
+    (rows_copied advances per LITE_COPY_BATCH).
+    ``master_conn`` reuses an open (read-only) master connection, e.g. one held
+    per worker by tools/prewarm_lite.py; the output file is ATTACHed to it instead.
+    ``search_indexes`` also builds the FTS5 name and trigram indexes (for serving
+    name search from the file); client downloads leave them out.
            
     Returns the file size in bytes.
     """
-    src_path = master_db or resolve_master_dataset_path()
+    src_path = Path(master_db or resolve_master_dataset_path()).resolve()
     print(f"Master DB Path (src_path): {src_path}")
     out_path.parent.mkdir(parents=True, exist_ok=True)
     if out_path.exists():
@@ -528,28 +2623,48 @@ def build_lite_dataset(
         filters.append("admin2 = ?")
         params.append(admin2)
         
-    if feature_codes:
-        codes = list(feature_codes)
-        if codes:
-            # Safely create a list of placeholders (?, ?, ?)
-            placeholders = ",".join("?" for _ in codes)
-            filters.append(f"(feature_class || '.' || feature_code) IN ({placeholders})")
-            params.extend(codes)
+    codes = list(feature_codes or [])
+    params.extend(codes)
+
+    # --- 2. Open the copy connection (autocommit, which VACUUM requires) ---
+    out_uri = out_path.resolve().as_uri() + "?mode=rwc"
+    if master_conn is None:
+        conn = sqlite3.connect(out_uri, uri=True, isolation_level=None)
+        conn.execute("ATTACH DATABASE ? AS master", (src_path.as_uri() + "?mode=ro",))
+        dst, src = "main", "master"
+    else:
+        conn = master_conn
+        saved_isolation = conn.isolation_level
+        conn.isolation_level = None
+        conn.execute("ATTACH DATABASE ? AS lite", (out_uri,))
+        dst, src = "lite", "main"
+
+    rows_copied = 0
+    if progress is not None:
+        def _report() -> int:
+            try:
+                progress(rows_copied, out_path.stat().st_size)
+            except Exception:  # never abort the build over progress reporting
+                LOGGER.debug("build-lite: progress callback failed", exc_info=True)
+            return 0
 
-    where_sql = " WHERE " + " AND ".join(filters) if filters else ""
+        conn.set_progress_handler(_report, LITE_PROGRESS_OPS)
+
+    try:
+        # fcode IN (...) when the master was upgraded by tools/optimize_master.py
+        optimized = has_optimized_schema(conn, src)
+        if codes:
+            filters.append(feature_code_predicate(codes, sargable=optimized))
+        where_sql = " AND ".join(filters) or "1=1"
 
-    # --- 2. Create and populate the 'lite' database (using autocommit for VACUUM) ---
-    # Setting isolation_level=None enables autocommit mode, which is required for VACUUM.
-    with sqlite3.connect(str(out_path), isolation_level=None) as lite, _connect(src_path) as src:
-        
         # Performance PRAGMAs (already in autocommit, so these are executed immediately)
-        lite.execute("PRAGMA journal_mode=OFF;")
-        lite.execute("PRAGMA synchronous=OFF;")
-        lite.execute("PRAGMA temp_store=MEMORY;")
+        conn.execute(f"PRAGMA {dst}.journal_mode=OFF;")
+        conn.execute(f"PRAGMA {dst}.synchronous=OFF;")
+        conn.execute("PRAGMA temp_store=MEMORY;")
 
         # Create tables
-        lite.executescript("""
-            CREATE TABLE features (
+        conn.executescript(f"""
+            CREATE TABLE {dst}.features (
               geoname_id INTEGER PRIMARY KEY,
               name TEXT,
               latitude REAL,
@@ -561,50 +2676,74 @@ def build_lite_dataset(
               admin2 TEXT,
               population INTEGER,
               elevation REAL,
-              timezone TEXT
+              timezone TEXT,
+              grid_lat INTEGER,
+              grid_lng INTEGER
             );
-            CREATE TABLE metadata (
+            CREATE TABLE {dst}.metadata (
               key TEXT PRIMARY KEY,
               value TEXT
             );
         """)
 
-        # Stream rows from master DB into the lite DB
-        src.row_factory = sqlite3.Row
-        cur = src.execute(f"""
-             SELECT geoname_id, name, latitude, longitude, feature_class, feature_code,
-                    country, admin1, admin2, population, elevation, timezone
-             FROM features
-             {where_sql}
-        """, params)
-
-        lite.executemany("""
-            INSERT INTO features
-              (geoname_id, name, latitude, longitude, feature_class, feature_code,
-               country, admin1, admin2, population, elevation, timezone)
-            VALUES
-              (:geoname_id, :name, :latitude, :longitude, :feature_class, :feature_code,
-               :country, :admin1, :admin2, :population, :elevation, :timezone)
-        """, cur)
-
-        # Helpful indexes for local sql.js queries
-        lite.executescript("""
-            CREATE INDEX IF NOT EXISTS idx_features_lat_lng ON features(latitude, longitude);
-            CREATE INDEX IF NOT EXISTS idx_features_class_code ON features(feature_class, feature_code);
+        columns = ", ".join(LITE_FEATURE_COLUMNS)
+        copy_sql = f"INSERT INTO {dst}.features ({columns}) SELECT {columns} FROM {src}.features WHERE {where_sql}"
+        # Optimized masters count the selection from their indexes first; a result that fits
+        # one batch is copied without ORDER BY ... LIMIT, which would otherwise pin the
+        # planner to idx_features_country instead of idx_features_region/_country_fcode.
+        single = optimized and filters and conn.execute(
+            f"SELECT COUNT(*) FROM {src}.features WHERE {where_sql}", params
+        ).fetchone()[0] <= LITE_COPY_BATCH
+        if single:
+            rows_copied = conn.execute(copy_sql, params).rowcount
+        else:
+            # Copy in geoname_id order; each batch resumes after the last copied id
+            batch_sql = f"{copy_sql} AND geoname_id > ? ORDER BY geoname_id LIMIT {LITE_COPY_BATCH}"
+            last_id = -(2 ** 63)
+            while True:
+                copied = conn.execute(batch_sql, [*params, last_id]).rowcount
+                rows_copied += copied
+                if copied < LITE_COPY_BATCH:
+                    break
+                last_id = conn.execute(f"SELECT MAX(geoname_id) FROM {dst}.features").fetchone()[0]
+
+        # Helpful indexes for local sql.js queries (built once, after the load)
+        conn.executescript(f"""
+            CREATE INDEX IF NOT EXISTS {dst}.idx_features_lat_lng ON features(latitude, longitude);
+            CREATE INDEX IF NOT EXISTS {dst}.idx_features_class_code ON features(feature_class, feature_code);
+            CREATE INDEX IF NOT EXISTS {dst}.idx_features_grid ON features(grid_lat, grid_lng);
         """)
 
+        # R*Tree index for server-side nearby queries
+        create_spatial_index(conn, dst)
+
+        if search_indexes:
+            # FTS5 name index (alternate names come from the master) and trigram index for name search
+            create_name_index(conn, dst, alternates_schema=src)
+            create_trigram_index(conn, dst)
+
         # Insert metadata
         meta = {
             "lite_filter": label or build_filter_label(country, admin1, admin2, feature_codes),
             "lite_generated_at": datetime.now(timezone.utc).isoformat(),
         }
-        lite.executemany("INSERT OR REPLACE INTO metadata(key,value) VALUES(?,?)", meta.items())
+        conn.executemany(f"INSERT OR REPLACE INTO {dst}.metadata(key,value) VALUES(?,?)", meta.items())
         
         # This will now succeed because isolation_level=None (autocommit) is set.
-        lite.execute("VACUUM;") 
+        conn.execute(f"VACUUM {dst};")
+    finally:
+        conn.set_progress_handler(None, 0)
+        if master_conn is None:
+            conn.close()
+        else:
+            conn.execute("DETACH DATABASE lite")
+            conn.isolation_level = saved_isolation
 
     # --- 3. Return size ---
-    return out_path.stat().st_size
+    size = out_path.stat().st_size
+    if progress is not None:
+        progress(rows_copied, size)
+    return size
 
 # def build_lite_dataset(
 #     out_path: Path,
@@ -723,6 +2862,878 @@ def build_filter_label(
     return ";".join(bits) or "all"
 
 
+# ---------------------------------------------------------------------------
+# Precompressed variants (served with Content-Encoding, never compressed per request)
+# ---------------------------------------------------------------------------
+COMPRESSED_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+PRECOMPRESSED_DIR = GENERATED_DIR / "precompressed"
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodings the builder can produce, in server preference order."""
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def _variant_path(path: Path, encoding: str) -> Path:
+    return path.with_name(path.name + COMPRESSED_SUFFIXES[encoding])
+
+
+def compressed_variants(path: Path) -> dict[str, Path]:
+    """Existing precompressed siblings of ``path`` keyed by Content-Encoding."""
+    return {enc: _variant_path(path, enc) for enc in available_encodings() if _variant_path(path, enc).exists()}
+
+
+def write_compressed_variants(path: Path, dest: Optional[Path] = None) -> dict[str, Path]:
+    """
+    Write gzip (and zstd when ``zstandard`` is installed) copies of ``path`` as
+    ``<dest>.gz`` / ``<dest>.zst``. Output is deterministic (gzip mtime=0), so
+    identical inputs give identical bytes for the per-encoding ETags.
+    """
+    dest = dest or path
+    variants: dict[str, Path] = {}
+    for encoding in available_encodings():
+        target = _variant_path(dest, encoding)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(path, "rb") as src, open(tmp, "wb") as raw:
+                if encoding == "zstd":
+                    zstandard.ZstdCompressor(level=ZSTD_LEVEL).copy_stream(src, raw, size=path.stat().st_size)
+                else:
+                    with gzip.GzipFile(filename="", mode="wb", compresslevel=GZIP_LEVEL, fileobj=raw, mtime=0) as gz:
+                        shutil.copyfileobj(src, gz, 1024 * 1024)
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+        variants[encoding] = target
+    return variants
+
+
+def compress_bytes(data: bytes, encodings: Optional[Iterable[str]] = None) -> dict[str, bytes]:
+    """In-memory counterpart of write_compressed_variants() for small responses (all encodings by default)."""
+    wanted = set(available_encodings() if encodings is None else encodings) & set(available_encodings())
+    variants = {}
+    if "gzip" in wanted:
+        variants["gzip"] = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if "zstd" in wanted:
+        variants["zstd"] = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return variants
+
+
+# ---------------------------------------------------------------------------
+# Content-addressed cache of generated lite datasets (GENERATED_DIR)
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class LiteFilter:
+    """Normalized lite build filter (the cache key inputs, minus the master version)."""
+
+    country: Optional[str] = None
+    admin1: Optional[str] = None
+    admin2: Optional[str] = None
+    feature_codes: tuple[str, ...] = ()
+    label: str = ""
+
+    @classmethod
+    def normalize(
+        cls,
+        country: Optional[str] = None,
+        admin1: Optional[str] = None,
+        admin2: Optional[str] = None,
+        feature_codes: Optional[Iterable[str]] = None,
+        label: str = "",
+    ) -> "LiteFilter":
+        codes = sorted({c.strip() for c in feature_codes or () if c and c.strip()})
+        return cls(
+            country=country.strip().upper() if country and country.strip() else None,
+            admin1=admin1.strip().upper() if admin1 and admin1.strip() else None,
+            admin2=admin2.strip() if admin2 and admin2.strip() else None,
+            feature_codes=tuple(codes),
+            label=(label or "").strip(),
+        )
+
+
+    @classmethod
+    def from_catalog_entry(cls, entry: dict[str, Any]) -> "LiteFilter":
+        """Filter of a ``generated`` catalog entry (its /api/geonames/lite URL, else its fields)."""
+        query = {k: v[-1] for k, v in parse_qs(urlsplit(entry.get("url", "")).query).items()}
+        codes = query.get("feature_codes")
+        return cls.normalize(
+            query.get("country", entry.get("country")),
+            query.get("admin1", entry.get("admin1")),
+            query.get("admin2", entry.get("admin2")),
+            codes.split(",") if codes else None,
+            query.get("label", ""),
+        )
+
+
+def master_dataset_version(master_db: Optional[Path] = None) -> str:
+    """Version string of the master DB: build_created_at metadata plus size/mtime."""
+    path = Path(master_db or resolve_master_dataset_path()).resolve()
+    _, mtime_ns, size = dataset_signature(path)
+    try:
+        built = DATASET_REGISTRY.metadata(path).get("build_created_at", "")
+    except sqlite3.Error:
+        built = ""
+    return f"{built}:{size}:{mtime_ns}"
+
+
+class _LiteArtifactCache:
+    """
+    Lite datasets stored in GENERATED_DIR under a hash of the normalized filter
+    and the master DB version. The hash doubles as a strong ETag. Access time is
+    tracked through the file mtime; least-recently-used artifacts (together with
+    their precompressed variants) are evicted once the directory exceeds
+    ``max_bytes``.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(lite_filter: LiteFilter, master_version: str, search_indexes: bool = False) -> str:
+        fields = {
+            "country": lite_filter.country,
+            "admin1": lite_filter.admin1,
+            "admin2": lite_filter.admin2,
+            "feature_codes": list(lite_filter.feature_codes),
+            "label": lite_filter.label,
+            "master": master_version,
+        }
+        if search_indexes:  # only when set, so plain artifacts keep their keys
+            fields["search_indexes"] = True
+        payload = json.dumps(fields, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"lite-{key}.db"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        if not path.exists():
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)  # LRU bookkeeping
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def store(self, key: str, build: Any) -> Path:
+        """Run ``build(tmp_path)`` and atomically move the result into the cache."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        final = self.path_for(key)
+        tmp = self.directory / f".lite-{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            build(tmp)
+            # Variants first, so a visible .db always has its compressed siblings.
+            write_compressed_variants(tmp, dest=final)
+            os.replace(tmp, final)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.evict(keep={final})
+        return final
+
+    def _artifacts(self) -> list[tuple[float, int, list[Path]]]:
+        """(last use, total bytes, files) per artifact, variants grouped with their .db."""
+        groups: dict[str, list[Any]] = {}
+        for path in self.directory.glob("lite-*.db*"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            group = groups.setdefault(path.name.split(".db", 1)[0], [0.0, 0, []])
+            group[0] = max(group[0], st.st_mtime)
+            group[1] += st.st_size
+            group[2].append(path)
+        return [tuple(g) for g in groups.values()]
+
+    def evict(self, keep: Iterable[Path] = ()) -> int:
+        """Delete least-recently-used artifacts until the disk budget is met."""
+        keep_names = {Path(p).name.split(".db", 1)[0] for p in keep}
+        with self._lock:
+            items = sorted(self._artifacts(), key=lambda item: item[0])
+            total = sum(size for _, size, _ in items)
+            removed = 0
+            for _, size, paths in items:
+                if total <= self.max_bytes:
+                    break
+                if paths[0].name.split(".db", 1)[0] in keep_names:
+                    continue
+                for path in paths:
+                    path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            self.evictions += removed
+        if removed:
+            LOGGER.info("lite cache: evicted %d artifact(s), %s in use", removed, _format_size_bytes(total))
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        items = self._artifacts() if self.directory.exists() else []
+        with self._lock:
+            return {
+                "directory": str(self.directory),
+                "entries": len(items),
+                "bytes": sum(size for _, size, _ in items),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+LITE_CACHE = _LiteArtifactCache(GENERATED_DIR, LITE_CACHE_MAX_BYTES)
+
+
+@dataclass
+class LiteArtifact:
+    path: Path
+    key: str
+    cached: bool
+    variants: dict[str, Path] = field(default_factory=dict)  # Content-Encoding -> file
+    content_hash: Optional[str] = None  # sha256 of the .db file (delta base version)
+    generated_at: Optional[str] = None  # lite_generated_at metadata
+
+    @property
+    def etag(self) -> str:
+        return self.etag_for(None)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong ETag of one representation (each encoding gets its own)."""
+        return f'"{self.key}-{encoding}"' if encoding else f'"{self.key}"'
+
+
+def lite_artifact_key(
+    lite_filter: LiteFilter, master_db: Optional[Path] = None, search_indexes: bool = False
+) -> str:
+    """Cache key (and ETag) of the lite artifact for ``lite_filter``, known without building it."""
+    master_path = Path(master_db or resolve_master_dataset_path()).resolve()
+    return LITE_CACHE.key_for(lite_filter, master_dataset_version(master_path), search_indexes)
+
+
+def get_or_build_lite_dataset(
+    lite_filter: LiteFilter,
+    *,
+    master_db: Optional[Path] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    master_conn: Optional[sqlite3.Connection] = None,
+    search_indexes: bool = False,
+) -> LiteArtifact:
+    """Return the cached lite artifact for ``lite_filter``, building it on a miss."""
+    master_path = Path(master_db or resolve_master_dataset_path()).resolve()
+    key = lite_artifact_key(lite_filter, master_path, search_indexes)
+    path = LITE_CACHE.lookup(key)
+    if path is not None:
+        variants = compressed_variants(path)
+        if len(variants) < len(available_encodings()):  # built before variants existed
+            variants = write_compressed_variants(path)
+        return LITE_SNAPSHOTS.register(lite_filter, LiteArtifact(path=path, key=key, cached=True, variants=variants))
+
+    def _build(out_path: Path) -> None:
+        build_lite_dataset(
+            out_path,
+            country=lite_filter.country,
+            admin1=lite_filter.admin1,
+            admin2=lite_filter.admin2,
+            feature_codes=list(lite_filter.feature_codes) or None,
+            label=lite_filter.label,
+            master_db=master_path,
+            progress=progress,
+            master_conn=master_conn,
+            search_indexes=search_indexes,
+        )
+
+    path = LITE_CACHE.store(key, _build)
+    artifact = LiteArtifact(path=path, key=key, cached=False, variants=compressed_variants(path))
+    return LITE_SNAPSHOTS.register(lite_filter, artifact)
+
+
+def lite_cache_stats() -> dict[str, Any]:
+    return LITE_CACHE.stats()
+
+
+def precompressed_dataset(path: Path) -> LiteArtifact:
+    """
+    Download artifact for an existing dataset file (e.g. the bundled lite DB).
+    Variants live in PRECOMPRESSED_DIR under the file's signature, so they are
+    written once per dataset version and stale ones are dropped on change.
+    """
+    path = Path(path).resolve()
+    key = hashlib.sha256(f"{path}:{dataset_signature(path)}".encode("utf-8")).hexdigest()[:32]
+    dest = PRECOMPRESSED_DIR / f"{path.stem}-{key}.db"
+    variants = compressed_variants(dest)
+    if len(variants) < len(available_encodings()):
+        PRECOMPRESSED_DIR.mkdir(parents=True, exist_ok=True)
+        for stale in PRECOMPRESSED_DIR.glob(f"{path.stem}-*.db.*"):
+            if not stale.name.startswith(dest.name):
+                stale.unlink(missing_ok=True)
+        variants = write_compressed_variants(path, dest=dest)
+    return LiteArtifact(path=path, key=key, cached=True, variants=variants)
+
+
+# ---------------------------------------------------------------------------
+# Per-region snapshots and row-level deltas between lite versions
+# ---------------------------------------------------------------------------
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _lite_generated_at(path: Path) -> str:
+    with closing(sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)) as conn:
+        row = conn.execute("SELECT value FROM metadata WHERE key = 'lite_generated_at'").fetchone()
+    return row[0] if row else ""
+
+
+def compute_lite_delta(old_path: Path, new_path: Path) -> dict[str, Any]:
+    """
+    Row-level changeset turning ``old_path`` into ``new_path`` (``features`` keyed
+    by geoname_id): inserted/updated rows as arrays in ``columns`` order, deleted
+    ids, and the new ``metadata`` table. Rows are compared with EXCEPT inside
+    SQLite, so unchanged rows never reach Python.
+    """
+    with closing(sqlite3.connect(Path(new_path).resolve().as_uri() + "?mode=ro", uri=True)) as conn:
+        conn.execute("ATTACH DATABASE ? AS old", (Path(old_path).resolve().as_uri() + "?mode=ro",))
+        columns = [row[1] for row in conn.execute("PRAGMA main.table_info(features)")]
+        old_columns = [row[1] for row in conn.execute("PRAGMA old.table_info(features)")]
+        if columns != old_columns:
+            raise LiteSnapshotUnavailable("features schema changed; download the full dataset")
+        cols = ", ".join(columns)
+        changed = f"SELECT {cols} FROM main.features EXCEPT SELECT {cols} FROM old.features"
+        exists_old = "EXISTS (SELECT 1 FROM old.features o WHERE o.geoname_id = c.geoname_id)"
+        inserted = [list(r) for r in conn.execute(f"SELECT * FROM ({changed}) c WHERE NOT {exists_old} ORDER BY geoname_id")]
+        updated = [list(r) for r in conn.execute(f"SELECT * FROM ({changed}) c WHERE {exists_old} ORDER BY geoname_id")]
+        deleted = [
+            r[0]
+            for r in conn.execute(
+                "SELECT geoname_id FROM old.features o WHERE NOT EXISTS "
+                "(SELECT 1 FROM main.features n WHERE n.geoname_id = o.geoname_id) ORDER BY geoname_id"
+            )
+        ]
+        metadata = dict(conn.execute("SELECT key, value FROM main.metadata"))
+    return {
+        "table": "features",
+        "key": "geoname_id",
+        "columns": columns,
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": deleted,
+        "metadata": metadata,
+    }
+
+
+@contextmanager
+def _directory_lock(directory: Path) -> Iterator[None]:
+    """
+    Exclusive flock on ``directory``/.lock, held against other threads and worker
+    processes (prewarm, lite jobs) alike. A no-op where fcntl is unavailable.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / ".lock", "a") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)  # released when the file is closed
+        yield
+
+
+class _LiteSnapshotStore:
+    """
+    Recent lite versions per region (normalized filter without the master
+    version), hard-linked from the artifact cache so LRU eviction does not drop
+    delta bases. Each region keeps ``keep`` snapshots in ``index.json``;
+    computed changesets are cached next to them (JSON plus compressed variants).
+
+    Snapshots and changesets of all regions share a ``max_bytes`` budget of
+    their own, oldest snapshots going first; a hard-linked file counts in full
+    even while the artifact cache still holds it. ``index.json`` is only
+    rewritten under the region's directory lock.
+    """
+
+    def __init__(self, directory: Path, keep: int, max_age_sec: float, max_bytes: int) -> None:
+        self.directory = directory
+        self.keep = max(1, keep)
+        self.max_age_sec = max_age_sec
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.deltas_computed = 0
+        self.deltas_cached = 0
+        self.evictions = 0
+
+    @staticmethod
+    def region_key(lite_filter: LiteFilter) -> str:
+        payload = json.dumps(
+            [lite_filter.country, lite_filter.admin1, lite_filter.admin2, list(lite_filter.feature_codes), lite_filter.label]
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _region_dir(self, lite_filter: LiteFilter) -> Path:
+        return self.directory / self.region_key(lite_filter)
+
+    def _region_dirs(self) -> list[Path]:
+        return [d for d in self.directory.iterdir() if d.is_dir()] if self.directory.exists() else []
+
+    @staticmethod
+    def _read_index(region_dir: Path) -> list[dict[str, Any]]:
+        try:
+            return json.loads((region_dir / "index.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return []
+
+    @staticmethod
+    def _registered(region_dir: Path, entries: list[dict[str, Any]], artifact_key: str) -> Optional[dict[str, Any]]:
+        for entry in entries:
+            if entry["artifact_key"] == artifact_key and (region_dir / f"{entry['content_hash']}.db").exists():
+                return entry
+        return None
+
+    def register(self, lite_filter: LiteFilter, artifact: LiteArtifact) -> LiteArtifact:
+        """Record ``artifact`` as the newest snapshot of its region; fills in its content hash."""
+        region_dir = self._region_dir(lite_filter)
+        entry = self._registered(region_dir, self._read_index(region_dir), artifact.key)  # index.json is replaced atomically
+        if entry is None:
+            with self._lock, _directory_lock(region_dir):
+                entries = self._read_index(region_dir)  # another process may have registered it meanwhile
+                entry = self._registered(region_dir, entries, artifact.key)
+                if entry is None:
+                    entry = self._add(region_dir, entries, artifact)
+            self._enforce_budget(keep=region_dir / f"{entry['content_hash']}.db")
+        return replace(artifact, content_hash=entry["content_hash"], generated_at=entry["lite_generated_at"])
+
+    def _add(self, region_dir: Path, entries: list[dict[str, Any]], artifact: LiteArtifact) -> dict[str, Any]:
+        """Link ``artifact`` into ``region_dir`` and prune by count and age; the caller holds the region lock."""
+        entry = {
+            "content_hash": _sha256_file(artifact.path),
+            "lite_generated_at": _lite_generated_at(artifact.path),
+            "artifact_key": artifact.key,
+            "created_at": time.time(),
+        }
+        target = region_dir / f"{entry['content_hash']}.db"
+        if not target.exists():
+            try:
+                os.link(artifact.path, target)
+            except OSError:
+                shutil.copyfile(artifact.path, target)
+        entries = [e for e in entries if e["content_hash"] != entry["content_hash"]] + [entry]
+        cutoff = time.time() - self.max_age_sec
+        kept = [e for e in entries[-self.keep:] if e["created_at"] >= cutoff or e is entry]
+        for dropped in entries:
+            if dropped not in kept:
+                self._drop(region_dir, dropped["content_hash"])
+        _write_json_atomic(region_dir / "index.json", kept)
+        return entry
+
+    @staticmethod
+    def _drop(region_dir: Path, content_hash: str) -> int:
+        """Delete a snapshot and the changesets from/to it; returns the bytes freed."""
+        paths = [region_dir / f"{content_hash}.db"]
+        paths += [diff for diff in region_dir.glob("delta-*") if content_hash[:16] in diff.name]
+        freed = 0
+        for path in paths:
+            try:
+                freed += path.stat().st_size
+                path.unlink()
+            except OSError:
+                pass
+        return freed
+
+    @staticmethod
+    def _region_bytes(region_dir: Path) -> int:
+        total = 0
+        for path in region_dir.iterdir():
+            if path.name.endswith(".db") or path.name.startswith("delta-"):
+                try:
+                    total += path.stat().st_size
+                except OSError:
+                    pass
+        return total
+
+    def _enforce_budget(self, keep: Path) -> int:
+        """Drop the oldest snapshots of any region until the store fits in ``max_bytes``."""
+        regions = self._region_dirs()
+        total = sum(self._region_bytes(d) for d in regions)
+        if total <= self.max_bytes:
+            return 0
+        oldest_first = sorted(
+            (entry["created_at"], region_dir, entry["content_hash"])
+            for region_dir in regions
+            for entry in self._read_index(region_dir)
+        )
+        removed = 0
+        for _, region_dir, content_hash in oldest_first:
+            if total <= self.max_bytes:
+                break
+            if region_dir / f"{content_hash}.db" == keep:
+                continue
+            with self._lock, _directory_lock(region_dir):
+                entries = self._read_index(region_dir)
+                remaining = [e for e in entries if e["content_hash"] != content_hash]
+                if len(remaining) == len(entries):  # already dropped by another process
+                    continue
+                total -= self._drop(region_dir, content_hash)
+                _write_json_atomic(region_dir / "index.json", remaining)
+                self.evictions += 1
+                removed += 1
+        if removed:
+            LOGGER.info("lite snapshots: evicted %d snapshot(s), %s in use", removed, _format_size_bytes(total))
+        return removed
+
+    def find(self, lite_filter: LiteFilter, content_hash: str) -> Optional[dict[str, Any]]:
+        region_dir = self._region_dir(lite_filter)
+        for entry in self._read_index(region_dir):
+            if entry["content_hash"] == content_hash and (region_dir / f"{content_hash}.db").exists():
+                return entry
+        return None
+
+    def delta(self, lite_filter: LiteFilter, base: dict[str, Any], current: LiteArtifact) -> LiteArtifact:
+        """Cached changeset from snapshot ``base`` to ``current`` (computed on first request)."""
+        region_dir = self._region_dir(lite_filter)
+        key = f"{base['content_hash'][:16]}-{current.content_hash[:16]}"
+        path = region_dir / f"delta-{key}.json"
+        if path.exists():
+            with self._lock:
+                self.deltas_cached += 1
+        else:
+            base_path = region_dir / f"{base['content_hash']}.db"
+            try:
+                changeset = compute_lite_delta(base_path, current.path)
+            except sqlite3.OperationalError:
+                if not base_path.exists():  # evicted since find()
+                    raise LiteSnapshotUnavailable("client version is not retained; download the full dataset")
+                raise
+            changeset["from"] = {"lite_generated_at": base["lite_generated_at"], "content_hash": base["content_hash"]}
+            changeset["to"] = {"lite_generated_at": current.generated_at, "content_hash": current.content_hash}
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                tmp.write_text(json.dumps(changeset, separators=(",", ":")), encoding="utf-8")
+                write_compressed_variants(tmp, dest=path)
+                os.replace(tmp, path)
+            finally:
+                tmp.unlink(missing_ok=True)
+            with self._lock:
+                self.deltas_computed += 1
+        return LiteArtifact(path=path, key=f"delta-{key}", cached=True, variants=compressed_variants(path))
+
+    def stats(self) -> dict[str, Any]:
+        regions = self._region_dirs()
+        snapshots = sum(len(self._read_index(d)) for d in regions)
+        in_use = sum(self._region_bytes(d) for d in regions)
+        with self._lock:
+            return {
+                "regions": len(regions),
+                "snapshots": snapshots,
+                "keep_per_region": self.keep,
+                "bytes": in_use,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "deltas_computed": self.deltas_computed,
+                "deltas_cached": self.deltas_cached,
+            }
+
+
+LITE_SNAPSHOTS = _LiteSnapshotStore(
+    GENERATED_DIR / "snapshots", LITE_SNAPSHOTS_PER_REGION, LITE_SNAPSHOT_MAX_AGE_SEC, LITE_SNAPSHOT_MAX_BYTES
+)
+
+
+def get_lite_delta(
+    lite_filter: LiteFilter,
+    content_hash: str,
+    lite_generated_at: Optional[str] = None,
+    *,
+    master_db: Optional[Path] = None,
+) -> tuple[LiteArtifact, Optional[LiteArtifact]]:
+    """
+    Return ``(current, delta)`` for a client holding version ``content_hash``
+    (sha256 of its lite file, as sent in X-Lite-Content-Hash). ``delta`` is None
+    when the client is already current. Raises LiteSnapshotUnavailable when the
+    client's version is no longer retained and a full download is needed.
+    """
+    current = get_or_build_lite_dataset(lite_filter, master_db=master_db)
+    if current.content_hash == content_hash:
+        return current, None
+    base = LITE_SNAPSHOTS.find(lite_filter, content_hash)
+    if base is None or (lite_generated_at and base["lite_generated_at"] != lite_generated_at):
+        raise LiteSnapshotUnavailable("client version is not retained; download the full dataset")
+    return current, LITE_SNAPSHOTS.delta(lite_filter, base, current)
+
+
+def lite_snapshot_stats() -> dict[str, Any]:
+    return LITE_SNAPSHOTS.stats()
+
+
+# ---------------------------------------------------------------------------
+# Asynchronous lite build jobs (process pool, progress files, TTL)
+# ---------------------------------------------------------------------------
+LITE_JOB_PROGRESS_INTERVAL_SEC = 0.5
+
+
+def _write_json_atomic(path: Path, payload: dict[str, Any]) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _run_lite_job(
+    job_dir: str, job_id: str, lite_filter: LiteFilter, master_db: str, search_indexes: bool = False
+) -> dict[str, Any]:
+    """
+    Process-pool entry point. Builds (or reuses) the cached artifact, reporting
+    progress to ``<job_id>.progress.json``, then hard-links the result into the
+    job directory so cache eviction cannot remove it before the job expires.
+    """
+    directory = Path(job_dir)
+    progress_path = directory / f"{job_id}.progress.json"
+    started_at = time.time()
+    last_write = 0.0
+
+    def _progress(rows: int, written: int) -> None:
+        nonlocal last_write
+        now = time.monotonic()
+        if now - last_write < LITE_JOB_PROGRESS_INTERVAL_SEC:
+            return
+        last_write = now
+        _write_json_atomic(
+            progress_path,
+            {"state": "running", "started_at": started_at, "rows_copied": rows, "bytes_written": written},
+        )
+
+    _write_json_atomic(progress_path, {"state": "running", "started_at": started_at, "rows_copied": 0, "bytes_written": 0})
+    artifact = get_or_build_lite_dataset(
+        lite_filter, master_db=Path(master_db), progress=_progress, search_indexes=search_indexes
+    )
+
+    target = directory / f"{job_id}.db"
+    sources = {target: artifact.path}
+    sources.update({_variant_path(target, enc): variant for enc, variant in artifact.variants.items()})
+    for dest, source in sources.items():
+        dest.unlink(missing_ok=True)
+        try:
+            os.link(source, dest)
+        except OSError:
+            shutil.copyfile(source, dest)
+
+    with closing(sqlite3.connect(target.resolve().as_uri() + "?mode=ro", uri=True)) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+    size = target.stat().st_size
+    _write_json_atomic(
+        progress_path,
+        {"state": "running", "started_at": started_at, "rows_copied": rows, "bytes_written": size},
+    )
+    return {"key": artifact.key, "cached": artifact.cached, "rows": rows, "size": size, "started_at": started_at}
+
+
+@dataclass
+class LiteJob:
+    id: str
+    lite_filter: LiteFilter
+    created_at: float
+    search_indexes: bool = False
+    state: str = "queued"  # queued | running | done | failed
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    rows_copied: int = 0
+    bytes_written: int = 0
+    key: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+    path: Optional[Path] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def artifact(self) -> Optional[LiteArtifact]:
+        if self.path is None or self.key is None:
+            return None
+        artifact = LiteArtifact(path=self.path, key=self.key, cached=True, variants=compressed_variants(self.path))
+        return LITE_SNAPSHOTS.register(self.lite_filter, artifact)
+
+    def etag_for(self, encoding: Optional[str]) -> Optional[str]:
+        """ETag the download sends in ``encoding`` (None: the raw DB); None until the build is done."""
+        if self.path is None or self.key is None:
+            return None
+        return LiteArtifact(path=self.path, key=self.key, cached=True).etag_for(encoding)
+
+    def expires_at(self, ttl_sec: float) -> Optional[float]:
+        return self.finished_at + ttl_sec if self.finished_at is not None else None
+
+    def as_dict(self, ttl_sec: float, encoding: Optional[str] = None) -> dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "filter": {
+                "country": self.lite_filter.country,
+                "admin1": self.lite_filter.admin1,
+                "admin2": self.lite_filter.admin2,
+                "feature_codes": list(self.lite_filter.feature_codes),
+                "label": self.lite_filter.label,
+            },
+            "search_indexes": self.search_indexes,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "expires_at": self.expires_at(ttl_sec),
+            "rows_copied": self.rows_copied,
+            "bytes_written": self.bytes_written,
+            "cached": self.cached,
+            "etag": self.etag_for(encoding),
+            "error": self.error,
+        }
+
+
+class _LiteJobManager:
+    """
+    Runs lite builds in a ProcessPoolExecutor (``max_workers`` concurrent builds).
+    Workers report progress through small JSON files next to the artifact;
+    finished jobs and their files are swept once ``ttl_sec`` has passed.
+    Submitting a filter that is already queued or running returns that job.
+    """
+
+    def __init__(self, directory: Path, max_workers: int, ttl_sec: float) -> None:
+        self.directory = directory
+        self.max_workers = max(1, max_workers)
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._jobs: dict[str, LiteJob] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.expired = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the server process is multi-threaded, forking it is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(
+        self, lite_filter: LiteFilter, *, master_db: Optional[Path] = None, search_indexes: bool = False
+    ) -> LiteJob:
+        master_path = Path(master_db or resolve_master_dataset_path()).resolve()
+        self.sweep()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            for job in self._jobs.values():
+                if (
+                    job.lite_filter == lite_filter
+                    and job.search_indexes == search_indexes
+                    and job.state in {"queued", "running"}
+                ):
+                    return job
+            job = LiteJob(
+                id=uuid.uuid4().hex, lite_filter=lite_filter, created_at=time.time(), search_indexes=search_indexes
+            )
+            self._jobs[job.id] = job
+            self.submitted += 1
+            job.future = self._pool().submit(
+                _run_lite_job, str(self.directory), job.id, lite_filter, str(master_path), search_indexes
+            )
+        job.future.add_done_callback(lambda fut, job=job: self._finish(job, fut))
+        return job
+
+    def _progress_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.progress.json"
+
+    def _finish(self, job: LiteJob, future: Future) -> None:
+        with self._lock:
+            job.finished_at = time.time()
+            try:
+                result = future.result()
+            except Exception as exc:  # includes BrokenProcessPool / cancellation
+                job.state = "failed"
+                job.error = f"{type(exc).__name__}: {exc}"
+                self.failed += 1
+                LOGGER.error("lite job %s failed: %s", job.id, job.error)
+            else:
+                job.state = "done"
+                job.key = result["key"]
+                job.cached = result["cached"]
+                job.rows_copied = result["rows"]
+                job.bytes_written = result["size"]
+                job.started_at = job.started_at or result["started_at"]
+                job.path = self.directory / f"{job.id}.db"
+                self.completed += 1
+        self._progress_path(job.id).unlink(missing_ok=True)
+
+    def get(self, job_id: str) -> Optional[LiteJob]:
+        self.sweep()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.state not in {"queued", "running"}:
+            return job
+        try:
+            data = json.loads(self._progress_path(job_id).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return job
+        with self._lock:
+            if job.state in {"queued", "running"}:
+                job.state = "running"
+                job.started_at = data.get("started_at", job.started_at)
+                job.rows_copied = int(data.get("rows_copied", 0))
+                job.bytes_written = int(data.get("bytes_written", 0))
+        return job
+
+    def sweep(self) -> int:
+        """Forget expired jobs and delete their files (including orphans from earlier runs)."""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for job_id, job in list(self._jobs.items()):
+                expires = job.expires_at(self.ttl_sec)
+                if expires is not None and expires <= now:
+                    del self._jobs[job_id]
+                    for path in self.directory.glob(f"{job_id}.db*"):
+                        path.unlink(missing_ok=True)
+                    removed += 1
+            live = set(self._jobs)
+        if self.directory.exists():
+            for path in self.directory.iterdir():
+                job_id = path.name.lstrip(".").split(".", 1)[0]
+                if job_id in live:
+                    continue
+                try:
+                    if path.stat().st_mtime + self.ttl_sec <= now:
+                        path.unlink(missing_ok=True)
+                except OSError:
+                    continue
+        if removed:
+            with self._lock:
+                self.expired += removed
+        return removed
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            states: dict[str, int] = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            return {
+                "workers": self.max_workers,
+                "ttl_sec": self.ttl_sec,
+                "jobs": states,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "expired": self.expired,
+            }
+
+
+LITE_JOBS = _LiteJobManager(GENERATED_DIR / "jobs", LITE_JOB_WORKERS, LITE_JOB_TTL_SEC)
+
+
 # ---------------------------------------------------------------------------
 # NEW: one-shot catalog generator (scan & write geonames-datasets.json)
 # ---------------------------------------------------------------------------
@@ -820,6 +3831,8 @@ def generate_dynamic_catalog(
             "country_name": r.get("country_name"),
             "admin1_name": r.get("admin1_name"),
         }
+        if r.get("class_counts"):
+            entry["class_counts"] = r["class_counts"]
         if r.get("admin2"):
             entry["admin2"] = r.get("admin2")
 
@@ -1,25 +1,59 @@
 # /assets/js/main.py  (server main)
 # MAIN FastAPI app with dynamic GeoNames lite builder + nearby API.
 
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
 import os
-import tempfile
+import threading
+import time
 import logging
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Awaitable, Callable, Hashable
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
 from geodata import (
+    LITE_JOBS,
     GeoNamesDatasetNotFound,
+    LiteArtifact,
+    LiteFilter,
+    LiteJob,
+    LiteSnapshotUnavailable,
+    NearbyFeature,
+    NearbyQuery,
+    PlaceMatch,
+    active_dataset_path,
+    available_encodings,
+    compress_bytes,
+    compressed_variants,
+    fuzzy_search_places,
+    connection_pool_stats,
+    dataset_catalog_signature,
     dataset_metadata,
-    fetch_nearby_features,
+    dataset_registry_stats,
+    fetch_nearby_features_batch,
+    fetch_nearby_features_cached,
+    fetch_nearest_features,
+    get_lite_delta,
+    get_or_build_lite_dataset,
+    iter_corridor_features,
+    lite_artifact_key,
+    lite_cache_stats,
+    lite_snapshot_stats,
     load_geonames_dataset_catalog,
-    resolve_dataset_path,
-    build_lite_dataset,   # must exist in geodata.py
+    nearby_cache_stats,
+    precompressed_dataset,
+    search_places,
 )
 
 # ---------- Logging ----------
@@ -29,7 +63,128 @@ if not LOGGER.handlers:
 
 BASE_DIR = Path(__file__).parent.resolve()
 
-app = FastAPI(title="DaliTrail Static Server")
+
+# ---------- Executors (keep blocking SQLite work off the event loop) ----------
+class _BoundedExecutor:
+    """
+    Thread pool wrapper that records queue depth and queue wait time, so a slow
+    lite build cannot stall nearby queries sharing the event loop.
+    """
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"dalitrail-{name}")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def _call() -> Any:
+            wait = time.perf_counter() - submitted
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    if not ok:
+                        self._failed += 1
+
+        return await asyncio.get_running_loop().run_in_executor(self._pool, _call)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "wait_avg_ms": round(self._wait_total / started * 1000.0, 3) if started else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000.0, 3),
+            }
+
+
+class _SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight task; every
+    caller receives the same result (or exception). The shared task is shielded
+    so a disconnecting client does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._waiters: dict[Hashable, int] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            self._waiters[key] += 1
+            self.max_waiters = max(self.max_waiters, self._waiters[key])
+        else:
+            future = asyncio.ensure_future(factory())
+            self.leaders += 1
+            self._inflight[key] = future
+            self._waiters[key] = 0
+
+            def _done(fut: asyncio.Future, key: Hashable = key) -> None:
+                self._inflight.pop(key, None)
+                self._waiters.pop(key, None)
+                if not fut.cancelled():
+                    fut.exception()  # mark retrieved; callers re-raise it
+
+            future.add_done_callback(_done)
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "waiting": sum(self._waiters.values()),
+            "leaders": self.leaders,
+            "coalesced_waiters": self.coalesced,
+            "max_waiters": self.max_waiters,
+        }
+
+
+QUERY_EXECUTOR = _BoundedExecutor("query", int(os.getenv("DALITRAIL_QUERY_WORKERS", "8")))
+BUILD_EXECUTOR = _BoundedExecutor("build", int(os.getenv("DALITRAIL_BUILD_WORKERS", "2")))
+LITE_BUILDS = _SingleFlight()
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    yield
+    QUERY_EXECUTOR.shutdown()
+    BUILD_EXECUTOR.shutdown()
+    LITE_JOBS.shutdown()
+
+
+app = FastAPI(title="DaliTrail Static Server", lifespan=_lifespan)
 
 app.mount(
     "/assets",
@@ -123,6 +278,88 @@ class NearbyResponse(BaseModel):
     features: list[FeatureModel]
 
 
+class PlaceMatchModel(FeatureModel):
+    distance_km: float | None = Field(None, description="Distance from lat/lng in kilometers, when given.")
+    score: float = Field(..., description="Blended rank (lower is better).")
+
+
+class PlaceSearchResponse(BaseModel):
+    dataset: str
+    query: str
+    features: list[PlaceMatchModel]
+
+
+class NearbyBatchQuery(BaseModel):
+    lat: float = Field(..., ge=-90.0, le=90.0)
+    lng: float = Field(..., ge=-180.0, le=180.0)
+    radius_km: float = Field(10.0, gt=0.0, le=100.0)
+    limit: int = Field(25, ge=1, le=100)
+    codes: list[str] | None = Field(None, description="Optional feature codes (e.g., H.LK, T.TRL).")
+
+
+class NearbyBatchRequest(BaseModel):
+    queries: list[NearbyBatchQuery] = Field(..., min_length=1, max_length=5000)
+
+
+class NearbyBatchResult(BaseModel):
+    features: list[FeatureModel]
+
+
+class NearbyBatchResponse(BaseModel):
+    dataset: str
+    metadata: dict[str, str]
+    results: list[NearbyBatchResult]
+
+
+class CorridorRequest(BaseModel):
+    points: list[tuple[float, float]] = Field(
+        ..., min_length=1, max_length=50000, description="Polyline as [[lat, lng], ...] (e.g., from a GPX track)."
+    )
+    buffer_km: float = Field(1.0, gt=0.0, le=25.0, description="Corridor half-width in kilometers.")
+    codes: list[str] | None = Field(None, description="Optional feature codes (e.g., H.LK, T.TRL).")
+    simplify_km: float | None = Field(
+        None, ge=0.0, le=25.0, description="Douglas-Peucker tolerance (defaults to buffer_km)."
+    )
+    limit: int | None = Field(None, ge=1, le=10000, description="Optional cap on streamed features.")
+
+
+class LiteJobRequest(BaseModel):
+    country: str = Field(..., min_length=2, max_length=3, description="ISO country code, e.g. US")
+    admin1: str | None = Field(None, min_length=1, max_length=32, description="Admin1 code, e.g. WA")
+    admin2: str | None = Field(None, min_length=1, max_length=64, description="Admin2 name/code")
+    feature_codes: list[str] | None = Field(None, description="Optional feature codes (e.g., H.LK, T.TRL).")
+    label: str | None = Field(None, max_length=120, description="Optional metadata label")
+    search_indexes: bool = Field(
+        False, description="Also build the FTS5 name and trigram indexes (for serving name search from the file)"
+    )
+
+
+class LiteJobFilterModel(BaseModel):
+    country: str | None = None
+    admin1: str | None = None
+    admin2: str | None = None
+    feature_codes: list[str] = []
+    label: str = ""
+
+
+class LiteJobStatus(BaseModel):
+    job_id: str
+    state: str
+    filter: LiteJobFilterModel
+    search_indexes: bool = False
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    expires_at: float | None = None
+    rows_copied: int = 0
+    bytes_written: int = 0
+    cached: bool = False
+    etag: str | None = None
+    error: str | None = None
+    status_url: str
+    download_url: str | None = None
+
+
 class GeoNamesDatasetModel(BaseModel):
     id: str
     label: str
@@ -131,21 +368,182 @@ class GeoNamesDatasetModel(BaseModel):
     file_name: str | None = None
     source: str | None = None
     approx_size: str | None = None
+    country: str | None = None
     country_name: str | None = None
+    admin1: str | None = None
     admin1_name: str | None = None
+    admin2: str | None = None
     size_bytes: int | None = None
     available: bool | None = None
     error: str | None = None
 
 
+class GeoNamesRegionFacet(BaseModel):
+    code: str
+    name: str
+    count: int
+
+
+class GeoNamesCountryFacet(GeoNamesRegionFacet):
+    regions: list[GeoNamesRegionFacet]
+
+
 class GeoNamesDatasetList(BaseModel):
     datasets: list[GeoNamesDatasetModel]
+    total: int | None = None
+    next_cursor: str | None = None
+    countries: list[GeoNamesCountryFacet] | None = None
+
+
+# ---------- Dataset catalog (resolved and serialized once per change) ----------
+CATALOG_PAGE_MAX = int(os.getenv("DALITRAIL_CATALOG_PAGE_MAX", "500"))
+CATALOG_SEARCH_FIELDS = ("id", "label", "description", "country", "country_name", "admin1", "admin1_name", "admin2")
+
+
+class _CatalogSnapshot:
+    """One resolved catalog version: validated entries, the full pre-serialized body and its compressed variants."""
+
+    def __init__(self, datasets: list[dict[str, Any]]) -> None:
+        self.datasets = datasets
+        self.body = json.dumps(
+            {"datasets": datasets, "total": len(datasets), "next_cursor": None}, separators=(",", ":")
+        ).encode("utf-8")
+        self.version = hashlib.sha256(self.body).hexdigest()[:20]
+        self.variants = compress_bytes(self.body)
+        self.countries = self._country_facets(datasets)
+        self._haystacks = [
+            " ".join(str(d.get(key) or "") for key in CATALOG_SEARCH_FIELDS).casefold() for d in datasets
+        ]
+        self._selections: OrderedDict[tuple[str, str], list[int]] = OrderedDict()
+        self._pages: OrderedDict[str, dict[Optional[str], bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _country_facets(datasets: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        countries: dict[str, dict[str, Any]] = {}
+        for d in datasets:
+            if not d.get("country"):
+                continue
+            country = countries.setdefault(
+                d["country"], {"code": d["country"], "name": d.get("country_name") or d["country"], "count": 0, "regions": {}}
+            )
+            country["count"] += 1
+            if d.get("admin1"):
+                region = country["regions"].setdefault(
+                    d["admin1"], {"code": d["admin1"], "name": d.get("admin1_name") or d["admin1"], "count": 0}
+                )
+                region["count"] += 1
+        facets = sorted(countries.values(), key=lambda c: c["name"].casefold())
+        for country in facets:
+            country["regions"] = sorted(country["regions"].values(), key=lambda r: r["name"].casefold())
+        return facets
+
+    def select(self, country: Optional[str], q: Optional[str]) -> list[int]:
+        """Indexes of the entries matching ``country`` and every word of ``q`` (small LRU per version)."""
+        key = ((country or "").upper(), " ".join((q or "").casefold().split()))
+        with self._lock:
+            cached = self._selections.get(key)
+            if cached is not None:
+                self._selections.move_to_end(key)
+                return cached
+        words = key[1].split()
+        selected = [
+            i
+            for i, d in enumerate(self.datasets)
+            if (not key[0] or (d.get("country") or "").upper() == key[0])
+            and all(word in self._haystacks[i] for word in words)
+        ]
+        with self._lock:
+            self._selections[key] = selected
+            while len(self._selections) > 64:
+                self._selections.popitem(last=False)
+        return selected
+
+    def page(self, key: str, encoding: Optional[str], render: Callable[[], bytes]) -> bytes:
+        """
+        Filtered page ``key`` in ``encoding`` (None: identity). The body is rendered
+        once and each encoding compressed on first request (small LRU per version).
+        """
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None:
+                self._pages.move_to_end(key)
+                if encoding in cached:
+                    return cached[encoding]
+        representations = dict(cached) if cached is not None else {None: render()}
+        if encoding is not None:
+            representations[encoding] = compress_bytes(representations[None], (encoding,))[encoding]
+        with self._lock:
+            self._pages[key] = representations
+            while len(self._pages) > 64:
+                self._pages.popitem(last=False)
+        return representations[encoding]
+
+
+class _DatasetCatalogCache:
+    """
+    Serves the resolved catalog from memory. dataset_catalog_signature() (catalog
+    file, referenced dataset files and active dataset, re-stat'ed through the
+    dataset registry) decides when to re-read and re-validate it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._token: Any = None
+        self._snapshot: Optional[_CatalogSnapshot] = None
+        self.hits = 0
+        self.loads = 0
+
+    def get(self) -> _CatalogSnapshot:
+        token = dataset_catalog_signature()
+        snapshot = self._snapshot
+        if snapshot is not None and token == self._token:
+            self.hits += 1
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or token != self._token:
+                datasets = [
+                    GeoNamesDatasetModel(**item).model_dump(mode="json") for item in load_geonames_dataset_catalog()
+                ]
+                self._snapshot, self._token = _CatalogSnapshot(datasets), token
+                self.loads += 1
+            return self._snapshot
+
+    def stats(self) -> dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "entries": len(snapshot.datasets) if snapshot else 0,
+            "body_bytes": len(snapshot.body) if snapshot else 0,
+            "compressed_bytes": {enc: len(data) for enc, data in snapshot.variants.items()} if snapshot else {},
+            "hits": self.hits,
+            "loads": self.loads,
+        }
+
+
+DATASET_CATALOG = _DatasetCatalogCache()
+
+
+def _encode_catalog_cursor(version: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode()).decode().rstrip("=")
+
+
+def _decode_catalog_cursor(cursor: str, version: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_version, _, offset = raw.partition(":")
+        value = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.") from None
+    if cursor_version != version:
+        raise HTTPException(status_code=410, detail="The dataset catalog changed; restart without a cursor.")
+    return max(value, 0)
 
 
 # ---------- Helpers ----------
 def _get_dataset_path() -> Path:
     try:
-        return resolve_dataset_path()
+        return active_dataset_path()
     except GeoNamesDatasetNotFound as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
 
@@ -158,10 +556,145 @@ def _split_codes(raw: Optional[str]) -> Optional[List[str]]:
     return codes or None
 
 
-def _tempfile_path(suffix: str = ".db") -> Path:
-    fd, name = tempfile.mkstemp(suffix=suffix)
-    os.close(fd)
-    return Path(name)
+def _feature_model(feature: NearbyFeature) -> FeatureModel:
+    return FeatureModel(
+        geoname_id=feature.geoname_id,
+        name=feature.name,
+        latitude=feature.latitude,
+        longitude=feature.longitude,
+        feature_class=feature.feature_class,
+        feature_code=feature.feature_code,
+        country=feature.country,
+        admin1=feature.admin1,
+        admin2=feature.admin2,
+        population=feature.population,
+        elevation=feature.elevation,
+        timezone=feature.timezone,
+        distance_km=round(feature.distance_km, 3),
+    )
+
+
+def _place_match_model(match: PlaceMatch) -> PlaceMatchModel:
+    return PlaceMatchModel(
+        geoname_id=match.geoname_id,
+        name=match.name,
+        latitude=match.latitude,
+        longitude=match.longitude,
+        feature_class=match.feature_class,
+        feature_code=match.feature_code,
+        country=match.country,
+        admin1=match.admin1,
+        admin2=match.admin2,
+        population=match.population,
+        elevation=match.elevation,
+        timezone=match.timezone,
+        distance_km=round(match.distance_km, 3) if match.distance_km is not None else None,
+        score=round(match.score, 4),
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [item.strip() for item in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def _negotiate_encoding(accept_encoding: Optional[str], available: dict[str, Any]) -> Optional[str]:
+    """Pick a precompressed variant allowed by Accept-Encoding (zstd over gzip on ties)."""
+    if not accept_encoding or not available:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in ("zstd", "gzip"):
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _artifact_response(
+    artifact: LiteArtifact,
+    filename: Optional[str],
+    accept_encoding: Optional[str],
+    if_none_match: Optional[str],
+    media_type: str = "application/octet-stream",
+) -> Response:
+    """Serve the precompressed variant the client accepts (or the raw DB), with per-encoding ETags."""
+    encoding = _negotiate_encoding(accept_encoding, artifact.variants)
+    etag = artifact.etag_for(encoding)
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache", "Vary": "Accept-Encoding"}
+    if artifact.content_hash:
+        # Version identity for /api/geonames/lite/delta
+        headers["X-Lite-Content-Hash"] = artifact.content_hash
+        headers["X-Lite-Generated-At"] = artifact.generated_at or ""
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(
+        artifact.variants[encoding] if encoding else artifact.path,
+        media_type=media_type,
+        filename=filename,
+        headers=headers,
+    )
+
+
+def _bytes_response(
+    body: bytes,
+    variants: dict[str, bytes],
+    tag: str,
+    accept_encoding: Optional[str],
+    if_none_match: Optional[str],
+    media_type: str = "application/json",
+) -> Response:
+    """In-memory counterpart of _artifact_response(): negotiated encoding, per-encoding ETag, 304."""
+    encoding = _negotiate_encoding(accept_encoding, variants)
+    headers = _tagged_headers(tag, encoding)
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=variants[encoding] if encoding else body, media_type=media_type, headers=headers)
+
+
+def _tagged_headers(tag: str, encoding: Optional[str]) -> dict[str, str]:
+    """ETag (one per encoding) and caching headers of an in-memory response."""
+    return {"ETag": f'"{tag}-{encoding}"' if encoding else f'"{tag}"', "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+
+def _lite_filename(lite_filter: LiteFilter) -> str:
+    parts = [lite_filter.country or ""]
+    if lite_filter.admin1:
+        parts.append(lite_filter.admin1)
+    if lite_filter.admin2:
+        parts.append(lite_filter.admin2.replace(" ", "_"))
+    region = "-".join(p for p in parts if p) or "custom"
+    return f"geonames-lite-{region}.db"
+
+
+def _lite_job_status(job: LiteJob, accept_encoding: Optional[str] = None) -> LiteJobStatus:
+    status_url = f"/api/geonames/lite/jobs/{job.id}"
+    # The etag field is the one the download will send for this client's Accept-Encoding
+    variants = compressed_variants(job.path) if job.state == "done" and job.path is not None else {}
+    return LiteJobStatus(
+        **job.as_dict(LITE_JOBS.ttl_sec, _negotiate_encoding(accept_encoding, variants)),
+        status_url=status_url,
+        download_url=f"{status_url}/download" if job.state == "done" else None,
+    )
 
 
 def _fmt_bytes(n: int) -> str:
@@ -178,21 +711,27 @@ def _fmt_bytes(n: int) -> str:
 
 # ---- Keep old static route for compatibility ----
 @app.get("/datasets/geonames-lite-us-wa.db", response_class=FileResponse)
-async def download_default_dataset():
+async def download_default_dataset(
+    accept_encoding: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+):
     dataset_path = _get_dataset_path()
     if not dataset_path.exists():
         raise HTTPException(status_code=404, detail="Dataset not found on disk.")
-    return FileResponse(
-        dataset_path,
-        media_type="application/octet-stream",
-        filename=dataset_path.name,
-    )
+    try:
+        # Variants are written once per dataset version; concurrent first requests share it.
+        artifact = await LITE_BUILDS.run(
+            ("precompressed", dataset_path), lambda: BUILD_EXECUTOR.run(precompressed_dataset, dataset_path)
+        )
+    except OSError as exc:
+        LOGGER.warning("precompress %s failed, serving raw file: %s", dataset_path.name, exc)
+        return FileResponse(dataset_path, media_type="application/octet-stream", filename=dataset_path.name)
+    return _artifact_response(artifact, dataset_path.name, accept_encoding, if_none_match)
 
 
 # ---- New: build & stream a lite dataset for a region / feature set ----
 @app.get("/api/geonames/lite", response_class=FileResponse)
 async def build_geonames_lite(
-    background_tasks: BackgroundTasks,
     country: str = Query(..., min_length=2, max_length=3, description="ISO country code, e.g. US"),
     admin1: str | None = Query(None, min_length=1, max_length=32, description="Admin1 code, e.g. WA"),
     admin2: str | None = Query(None, min_length=1, max_length=64, description="Admin2 name/code"),
@@ -201,68 +740,58 @@ async def build_geonames_lite(
         description="Comma-separated feature codes (e.g., H.LK,T.TRL). If omitted, include all.",
     ),
     label: str | None = Query(None, max_length=120, description="Optional metadata label"),
+    accept_encoding: str | None = Header(None),
+    if_none_match: str | None = Header(None),
 ):
     """
-    Build and stream a lite GeoNames SQLite DB filtered by country/admin codes.
+    Build (or reuse) and stream a lite GeoNames SQLite DB filtered by country/admin codes.
+
+    Built artifacts are cached in GENERATED_DIR keyed by the normalized filter and
+    the master DB version; the key is served as a strong ETag (304 on If-None-Match).
+    Precompressed gzip/zstd variants are served according to Accept-Encoding.
 
     Examples:
       /api/geonames/lite?country=US&admin1=WA
       /api/geonames/lite?country=US&admin1=WA&admin2=King
       /api/geonames/lite?country=US&feature_codes=H.LK,T.TRL
     """
-    ctry = country.strip().upper()
-    a1 = admin1.strip().upper() if admin1 else None
-    a2 = admin2.strip() if admin2 else None
-    codes = _split_codes(feature_codes)
-
-    # Build a friendly filename
-    parts = [ctry]
-    if a1:
-        parts.append(a1)
-    if a2:
-        parts.append(a2.replace(" ", "_"))
-    region = "-".join(parts) or "custom"
-    filename = f"geonames-lite-{region}.db"
+    lite_filter = LiteFilter.normalize(country, admin1, admin2, _split_codes(feature_codes), label or "")
+    ctry, a1, a2, codes = lite_filter.country, lite_filter.admin1, lite_filter.admin2, lite_filter.feature_codes
+    filename = _lite_filename(lite_filter)
 
     # For debug: which master DB will builder use? (geodata.py should look at DALITRAIL_GEONAMES_DB)
     env_db = os.getenv("DALITRAIL_GEONAMES_DB", "").strip()
     LOGGER.info(
         "build-lite requested: country=%s admin1=%s admin2=%s codes=%s label=%s env.DALITRAIL_GEONAMES_DB=%s",
-        ctry, a1, a2, ",".join(codes or []) if codes else None, label or "", env_db or "(not set)"
+        ctry, a1, a2, ",".join(codes) if codes else None, label or "", env_db or "(not set)"
     )
 
-    tmp_path = _tempfile_path(".db")
     try:
-        # Let the builder return an info dict if available; if not, accept None.
-        # Suggested keys: {"rows": int, "source": Path, "elapsed_sec": float, ...}
-        info: Optional[dict[str, Any]] = build_lite_dataset(
-            tmp_path,
-            country=ctry,
-            admin1=a1,
-            admin2=a2,
-            feature_codes=codes,
-            label=label or "",
+        if if_none_match:
+            # The ETag is the artifact key (filter + master version): revalidate without scheduling a build.
+            key = await QUERY_EXECUTOR.run(lite_artifact_key, lite_filter)
+            encoding = _negotiate_encoding(accept_encoding, dict.fromkeys(available_encodings()))
+            etag = f'"{key}-{encoding}"' if encoding else f'"{key}"'
+            if _etag_matches(if_none_match, etag):
+                headers = {"ETag": etag, "Cache-Control": "public, no-cache", "Vary": "Accept-Encoding"}
+                return Response(status_code=304, headers=headers)
+
+        # Identical concurrent requests share one build (no stampede on the master DB).
+        artifact = await LITE_BUILDS.run(
+            lite_filter, lambda: BUILD_EXECUTOR.run(get_or_build_lite_dataset, lite_filter)
         )
 
         # Log builder summary
         try:
-            size = tmp_path.stat().st_size if tmp_path.exists() else 0
-            rows = (info or {}).get("rows")
             LOGGER.info(
-                "build-lite success -> file=%s size=%s rows=%s",
-                tmp_path.name, _fmt_bytes(size), rows if rows is not None else "(n/a)"
+                "build-lite %s -> file=%s size=%s",
+                "cache hit" if artifact.cached else "built",
+                artifact.path.name, _fmt_bytes(artifact.path.stat().st_size),
             )
         except Exception:
-            LOGGER.debug("build-lite: unable to stat temp file for logging", exc_info=True)
+            LOGGER.debug("build-lite: unable to stat artifact for logging", exc_info=True)
 
-        # Schedule deletion after response is sent
-        background_tasks.add_task(lambda p=tmp_path: p.unlink(missing_ok=True))
-
-        return FileResponse(
-            tmp_path,
-            media_type="application/octet-stream",
-            filename=filename,
-        )
+        return _artifact_response(artifact, filename, accept_encoding, if_none_match)
 
     except GeoNamesDatasetNotFound as exc:
         # Most common cause of 500s: master DB not set; surface as 503 + log detail.
@@ -271,23 +800,106 @@ async def build_geonames_lite(
             LOGGER.error(
                 "DALITRAIL_GEONAMES_DB is not set. Set it to the FULL GeoNames DB (e.g., geonames-all_countries_latest.db)."
             )
-        try:
-            tmp_path.unlink(missing_ok=True)
-        except Exception:
-            pass
         raise HTTPException(status_code=503, detail=str(exc)) from exc
 
     except Exception as exc:
         # Log full traceback for diagnosis
         LOGGER.error("build-lite unexpected error: %s", exc)
         LOGGER.error("traceback:\n%s", traceback.format_exc())
-        try:
-            tmp_path.unlink(missing_ok=True)
-        except Exception:
-            pass
         raise HTTPException(status_code=500, detail=f"Lite dataset build failed: {exc}") from exc
 
 
+# ---- Row-level delta between the client's lite version and the current one ----
+@app.get("/api/geonames/lite/delta")
+async def lite_delta(
+    country: str = Query(..., min_length=2, max_length=3, description="ISO country code, e.g. US"),
+    admin1: str | None = Query(None, min_length=1, max_length=32),
+    admin2: str | None = Query(None, min_length=1, max_length=64),
+    feature_codes: str | None = Query(None, description="Same filter as the original /api/geonames/lite call."),
+    label: str | None = Query(None, max_length=120),
+    content_hash: str = Query(
+        ..., min_length=64, max_length=64, description="X-Lite-Content-Hash of the client's copy (sha256 of the file)."
+    ),
+    lite_generated_at: str | None = Query(None, description="lite_generated_at metadata of the client's copy."),
+    accept_encoding: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+):
+    """
+    Changeset from the client's lite version to the current build of the same region:
+    {"from", "to", "columns", "inserted", "updated", "deleted", "metadata"} where rows are
+    arrays in ``columns`` order keyed by geoname_id. Apply deletes, then upserts, then
+    replace metadata, and remember ``to.content_hash`` as the new version.
+
+    204 when the client is current; 410 when its version is no longer retained
+    (fall back to a full /api/geonames/lite download).
+    """
+    lite_filter = LiteFilter.normalize(country, admin1, admin2, _split_codes(feature_codes), label or "")
+    try:
+        current, delta = await LITE_BUILDS.run(
+            ("delta", lite_filter, content_hash.lower(), lite_generated_at),
+            lambda: BUILD_EXECUTOR.run(get_lite_delta, lite_filter, content_hash.lower(), lite_generated_at),
+        )
+    except GeoNamesDatasetNotFound as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except LiteSnapshotUnavailable as exc:
+        raise HTTPException(status_code=410, detail=str(exc)) from exc
+
+    if delta is None:
+        return Response(
+            status_code=204,
+            headers={"X-Lite-Content-Hash": current.content_hash, "X-Lite-Generated-At": current.generated_at or ""},
+        )
+    response = _artifact_response(delta, None, accept_encoding, if_none_match, media_type="application/json")
+    response.headers["X-Lite-Content-Hash"] = current.content_hash
+    response.headers["X-Lite-Generated-At"] = current.generated_at or ""
+    return response
+
+
+# ---- Asynchronous lite builds: submit, poll, download ----
+@app.post("/api/geonames/lite/jobs", response_model=LiteJobStatus, status_code=202)
+async def submit_lite_job(request: LiteJobRequest, accept_encoding: str | None = Header(None)):
+    """
+    Queue a lite build on the job process pool and return immediately.
+    Poll status_url for rows_copied/bytes_written; download_url appears once done.
+    Submitting a filter that is already queued or running returns the existing job.
+    """
+    lite_filter = LiteFilter.normalize(
+        request.country, request.admin1, request.admin2, request.feature_codes, request.label or ""
+    )
+    try:
+        job = await QUERY_EXECUTOR.run(LITE_JOBS.submit, lite_filter, search_indexes=request.search_indexes)
+    except GeoNamesDatasetNotFound as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    LOGGER.info("lite job %s %s for %s", job.id, job.state, _lite_filename(lite_filter))
+    return _lite_job_status(job, accept_encoding)
+
+
+@app.get("/api/geonames/lite/jobs/{job_id}", response_model=LiteJobStatus)
+async def lite_job_status(job_id: str, accept_encoding: str | None = Header(None)):
+    job = await QUERY_EXECUTOR.run(LITE_JOBS.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job.")
+    return _lite_job_status(job, accept_encoding)
+
+
+@app.get("/api/geonames/lite/jobs/{job_id}/download", response_class=FileResponse)
+async def lite_job_download(
+    job_id: str,
+    accept_encoding: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+):
+    job = await QUERY_EXECUTOR.run(LITE_JOBS.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job.")
+    if job.state == "failed":
+        raise HTTPException(status_code=500, detail=f"Lite dataset build failed: {job.error}")
+    if job.state != "done" or job.path is None:
+        raise HTTPException(status_code=409, detail=f"Job is {job.state}; poll the status URL until it is done.")
+    if not job.path.exists():
+        raise HTTPException(status_code=410, detail="Job artifact is no longer available.")
+    return _artifact_response(job.artifact(), _lite_filename(job.lite_filter), accept_encoding, if_none_match)
+
+
 # ---- Nearby search API (uses the active/lite DB) ----
 @app.get("/api/places/nearby", response_model=NearbyResponse)
 async def nearby_places(
@@ -299,60 +911,239 @@ async def nearby_places(
         None,
         description="Optional comma-separated feature codes (e.g., H.LK,T.TRL).",
     ),
+    mode: str = Query(
+        "radius",
+        pattern="^(radius|knn)$",
+        description="'radius' (features within radius_km) or 'knn' (the k closest, no radius needed).",
+    ),
+    k: int | None = Query(None, ge=1, le=200, description="Number of neighbours for mode=knn (defaults to limit)."),
+    max_distance_km: float | None = Query(
+        None, gt=0.0, description="Optional distance cap for mode=knn."
+    ),
 ):
     dataset_path = _get_dataset_path()
     codes: list[str] | None = None
     if feature_codes:
         codes = [item.strip() for item in feature_codes.split(",") if item.strip()]
 
-    LOGGER.info(
-        "nearby: lat=%.6f lng=%.6f radius_km=%.2f limit=%d codes=%s dataset=%s",
-        lat, lng, radius_km, limit, ",".join(codes or []) if codes else None, dataset_path.name
+    if mode == "knn":
+        LOGGER.info(
+            "nearby(knn): lat=%.6f lng=%.6f k=%d max_distance_km=%s codes=%s dataset=%s",
+            lat, lng, k or limit, max_distance_km, ",".join(codes or []) if codes else None, dataset_path.name
+        )
+        features = await QUERY_EXECUTOR.run(
+            fetch_nearest_features,
+            lat,
+            lng,
+            k=k or limit,
+            max_distance_km=max_distance_km,
+            feature_codes=codes,
+            db_path=dataset_path,
+        )
+    else:
+        LOGGER.info(
+            "nearby: lat=%.6f lng=%.6f radius_km=%.2f limit=%d codes=%s dataset=%s",
+            lat, lng, radius_km, limit, ",".join(codes or []) if codes else None, dataset_path.name
+        )
+        features = await QUERY_EXECUTOR.run(
+            fetch_nearby_features_cached,
+            lat,
+            lng,
+            radius_km=radius_km,
+            limit=limit,
+            feature_codes=codes,
+            db_path=dataset_path,
+        )
+
+    response_features = [_feature_model(feature) for feature in features]
+
+    metadata = await QUERY_EXECUTOR.run(dataset_metadata, dataset_path)
+    return NearbyResponse(
+        dataset=dataset_path.name,
+        metadata=metadata,
+        features=response_features,
     )
 
-    features = fetch_nearby_features(
-        lat,
-        lng,
-        radius_km=radius_km,
-        limit=limit,
-        feature_codes=codes,
-        db_path=dataset_path,
+
+@app.get("/api/places/search", response_model=PlaceSearchResponse)
+async def search_places_by_name(
+    q: str = Query(..., min_length=1, max_length=100, description="Name or name prefix (autocomplete)."),
+    lat: float | None = Query(None, ge=-90.0, le=90.0, description="Optional anchor latitude for distance ranking."),
+    lng: float | None = Query(None, ge=-180.0, le=180.0, description="Optional anchor longitude for distance ranking."),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of matches to return."),
+    feature_codes: str | None = Query(
+        None,
+        description="Optional comma-separated feature codes (e.g., H.LK,T.MT).",
+    ),
+    mode: str = Query(
+        "prefix",
+        pattern="^(prefix|fuzzy)$",
+        description="'prefix' (autocomplete) or 'fuzzy' (typo-tolerant, trigram index + edit distance).",
+    ),
+    max_edits: int | None = Query(None, ge=0, le=3, description="Edit budget for mode=fuzzy (default by length)."),
+):
+    """
+    Prefix name search over names and alternate names, ranked by how well the
+    primary name matches, population and (with lat/lng) distance from the anchor
+    point. mode=fuzzy
+    tolerates misspellings ("Rainer" finds Mount Rainier).
+    """
+    if (lat is None) != (lng is None):
+        raise HTTPException(status_code=422, detail="lat and lng must be given together")
+    dataset_path = _get_dataset_path()
+    codes = _split_codes(feature_codes)
+    LOGGER.info(
+        "search(%s): q=%r lat=%s lng=%s limit=%d codes=%s dataset=%s",
+        mode, q, lat, lng, limit, ",".join(codes) if codes else None, dataset_path.name
     )
+    if mode == "fuzzy":
+        matches: list[PlaceMatch] = await QUERY_EXECUTOR.run(
+            fuzzy_search_places, q, lat=lat, lng=lng, limit=limit, feature_codes=codes, max_edits=max_edits,
+            db_path=dataset_path,
+        )
+    else:
+        matches = await QUERY_EXECUTOR.run(
+            search_places, q, lat=lat, lng=lng, limit=limit, feature_codes=codes, db_path=dataset_path
+        )
+    return PlaceSearchResponse(
+        dataset=dataset_path.name,
+        query=q,
+        features=[_place_match_model(match) for match in matches],
+    )
+
 
-    response_features = [
-        FeatureModel(
-            geoname_id=feature.geoname_id,
-            name=feature.name,
-            latitude=feature.latitude,
-            longitude=feature.longitude,
-            feature_class=feature.feature_class,
-            feature_code=feature.feature_code,
-            country=feature.country,
-            admin1=feature.admin1,
-            admin2=feature.admin2,
-            population=feature.population,
-            elevation=feature.elevation,
-            timezone=feature.timezone,
-            distance_km=round(feature.distance_km, 3),
+@app.post("/api/places/nearby/batch", response_model=NearbyBatchResponse)
+async def nearby_places_batch(request: NearbyBatchRequest):
+    """
+    Nearby search for many points in one request (e.g., annotating a track).
+    Results are returned in the same order as the input queries.
+    """
+    dataset_path = _get_dataset_path()
+    queries = [
+        NearbyQuery(
+            lat=q.lat,
+            lng=q.lng,
+            radius_km=q.radius_km,
+            limit=q.limit,
+            feature_codes=([c.strip() for c in q.codes if c.strip()] or None) if q.codes else None,
         )
-        for feature in features
+        for q in request.queries
     ]
+    LOGGER.info("nearby(batch): %d queries dataset=%s", len(queries), dataset_path.name)
 
-    metadata = dataset_metadata(dataset_path)
-    return NearbyResponse(
+    results = await QUERY_EXECUTOR.run(fetch_nearby_features_batch, queries, db_path=dataset_path)
+    return NearbyBatchResponse(
         dataset=dataset_path.name,
-        metadata=metadata,
-        features=response_features,
+        metadata=await QUERY_EXECUTOR.run(dataset_metadata, dataset_path),
+        results=[
+            NearbyBatchResult(features=[_feature_model(feature) for feature in features])
+            for features in results
+        ],
     )
 
 
+@app.post("/api/places/corridor")
+async def corridor_places(request: CorridorRequest):
+    """
+    Stream every feature within buffer_km of a polyline as NDJSON, one feature
+    per line, ordered by distance along the route (along_km).
+    """
+    dataset_path = _get_dataset_path()
+    for lat, lng in request.points:
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+            raise HTTPException(status_code=422, detail=f"Invalid point: [{lat}, {lng}]")
+    codes = [c.strip() for c in request.codes or [] if c.strip()] or None
+
+    LOGGER.info(
+        "corridor: points=%d buffer_km=%.2f codes=%s dataset=%s",
+        len(request.points), request.buffer_km, ",".join(codes or []) if codes else None, dataset_path.name
+    )
+
+    def _stream():
+        for feature in iter_corridor_features(
+            list(request.points),
+            buffer_km=request.buffer_km,
+            feature_codes=codes,
+            simplify_km=request.simplify_km,
+            limit=request.limit,
+            db_path=dataset_path,
+        ):
+            payload = _feature_model(feature).model_dump()
+            payload["along_km"] = round(feature.along_km, 3)
+            yield json.dumps(payload) + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
 @app.get("/api/geonames/datasets", response_model=GeoNamesDatasetList)
-async def geonames_datasets():
+async def geonames_datasets(
+    country: str | None = Query(None, min_length=2, max_length=3, description="Only entries of this ISO country code"),
+    q: str | None = Query(
+        None, max_length=100, description="Words matched (case-insensitive) against ids, labels and region names"
+    ),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int | None = Query(None, ge=1, le=CATALOG_PAGE_MAX, description="Page size (default: all matches)"),
+    facets: bool = Query(False, description="Include the countries/regions facet (for the picker's dropdowns)"),
+    accept_encoding: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+):
+    """
+    Download catalog. Without parameters the whole list is served pre-serialized and
+    precompressed; filtered pages carry ``total`` and ``next_cursor`` (pass it back as
+    ``cursor``; 410 once the catalog has changed). Every response has an ETag.
+    """
     try:
-        datasets = load_geonames_dataset_catalog()
+        snapshot = await QUERY_EXECUTOR.run(DATASET_CATALOG.get)
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
-    return GeoNamesDatasetList(datasets=[GeoNamesDatasetModel(**item) for item in datasets])
+
+    if not (country or q or cursor or limit or facets):
+        return _bytes_response(snapshot.body, snapshot.variants, snapshot.version, accept_encoding, if_none_match)
+
+    offset = _decode_catalog_cursor(cursor, snapshot.version) if cursor else 0
+    # The ETag depends only on the catalog version, the query and the encoding: answer 304 before rendering
+    query_key = f"{(country or '').upper()}|{q or ''}|{offset}|{limit or ''}|{int(facets)}"
+    tag = f"{snapshot.version}-{hashlib.sha256(query_key.encode()).hexdigest()[:12]}"
+    encoding = _negotiate_encoding(accept_encoding, dict.fromkeys(available_encodings()))
+    headers = _tagged_headers(tag, encoding)
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    def _render() -> bytes:
+        selected = snapshot.select(country, q)
+        end = len(selected) if limit is None else offset + limit
+        payload: dict[str, Any] = {
+            "datasets": [snapshot.datasets[i] for i in selected[offset:end]],
+            "total": len(selected),
+            "next_cursor": _encode_catalog_cursor(snapshot.version, end) if end < len(selected) else None,
+        }
+        if facets:
+            payload["countries"] = snapshot.countries
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    content = await QUERY_EXECUTOR.run(snapshot.page, query_key, encoding, _render)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+# ---- Runtime metrics (connection pools, caches, executors) ----
+@app.get("/api/metrics")
+async def runtime_metrics():
+    return {
+        "sqlite_pools": connection_pool_stats(),
+        "nearby_cache": nearby_cache_stats(),
+        "datasets": dataset_registry_stats(),
+        "lite_cache": lite_cache_stats(),
+        "lite_builds": LITE_BUILDS.stats(),
+        "lite_jobs": LITE_JOBS.stats(),
+        "lite_snapshots": lite_snapshot_stats(),
+        "dataset_catalog": DATASET_CATALOG.stats(),
+        "executors": {
+            "query": QUERY_EXECUTOR.stats(),
+            "build": BUILD_EXECUTOR.stats(),
+        },
+    }
 
 
 if __name__ == "__main__":
@@ -6,7 +6,12 @@ import argparse
 import datetime as dt
 import pathlib
 import sqlite3
-from typing import Iterable, List, Sequence, Tuple
+import sys
+from typing import List, Sequence, Tuple
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from geodata import create_name_index  # noqa: E402
 
 FEATURE_COLUMNS: Sequence[str] = (
     "geoname_id",
@@ -53,6 +58,11 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
     parser.add_argument("--grid-lng-max", type=int, help="Maximum integer grid longitude")
     parser.add_argument("--where", help="Additional SQL WHERE clause applied to the features table")
     parser.add_argument("--limit", type=int, help="Optional row limit (sampling)")
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="Also build the FTS5 name index (only needed when the server searches this file)",
+    )
     return parser.parse_args(argv)
 
 
@@ -62,7 +72,8 @@ def split_csv(value: str | None) -> List[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
-def build_filters(args: argparse.Namespace) -> Tuple[str, List[object], str]:
+def build_filters(args: argparse.Namespace, sargable: bool = False) -> Tuple[str, List[object], str]:
+    """WHERE clause for the master; ``sargable`` uses the fcode column of optimized masters."""
     clauses: List[str] = []
     params: List[object] = []
     descriptors: List[str] = []
@@ -77,7 +88,10 @@ def build_filters(args: argparse.Namespace) -> Tuple[str, List[object], str]:
     feature_codes = split_csv(args.feature_codes)
     if feature_codes:
         placeholders = ",".join("?" for _ in feature_codes)
-        clauses.append(f"(feature_class || '.' || feature_code) IN ({placeholders})")
+        if sargable:
+            clauses.append(f"fcode IN ({placeholders})")
+        else:
+            clauses.append(f"(feature_class || '.' || feature_code) IN ({placeholders})")
         params.extend(feature_codes)
         descriptors.append(f"feature_codes={','.join(feature_codes)}")
 
@@ -124,6 +138,7 @@ def ensure_output(path: pathlib.Path, overwrite: bool) -> None:
 
 
 def create_schema(conn: sqlite3.Connection) -> None:
+    """Tables only; indexes are created by create_indexes() once the data is loaded."""
     conn.executescript(
         """
         PRAGMA journal_mode=WAL;
@@ -163,6 +178,19 @@ def create_schema(conn: sqlite3.Connection) -> None:
             FOREIGN KEY(geoname_id) REFERENCES features(geoname_id)
         );
 
+        CREATE VIRTUAL TABLE IF NOT EXISTS features_rtree USING rtree(
+            geoname_id,
+            min_lat, max_lat,
+            min_lng, max_lng
+        );
+        """
+    )
+
+
+def create_indexes(conn: sqlite3.Connection) -> None:
+    """Secondary indexes, built in one pass after the bulk load (cheaper than maintaining them per insert)."""
+    conn.executescript(
+        """
         CREATE INDEX IF NOT EXISTS idx_features_grid ON features(grid_lat, grid_lng);
         CREATE INDEX IF NOT EXISTS idx_features_feature ON features(feature_code);
         CREATE INDEX IF NOT EXISTS idx_features_country ON features(country);
@@ -171,68 +199,69 @@ def create_schema(conn: sqlite3.Connection) -> None:
     )
 
 
+def populate_spatial_index(conn: sqlite3.Connection) -> None:
+    """Fill the R*Tree (features_rtree) from the copied features."""
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO features_rtree (geoname_id, min_lat, max_lat, min_lng, max_lng)
+        SELECT geoname_id, latitude, latitude, longitude, longitude
+        FROM features
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+        """
+    )
+    conn.commit()
+
+
+def attach_source(dest: sqlite3.Connection, source_path: pathlib.Path) -> None:
+    """ATTACH the master read-only as ``src`` so rows are copied inside SQLite."""
+    dest.execute("ATTACH DATABASE ? AS src", (source_path.resolve().as_uri() + "?mode=ro",))
+
+
+def source_is_optimized(dest: sqlite3.Connection) -> bool:
+    """True when the attached master has the indexed fcode column (tools/optimize_master.py)."""
+    return any(row[1] == "fcode" for row in dest.execute("PRAGMA src.table_xinfo(features)"))
+
+
 def copy_features(
-    src: sqlite3.Connection,
     dest: sqlite3.Connection,
     filter_sql: str,
     params: Sequence[object],
     limit: int | None,
-) -> list[int]:
-    placeholders = ", ".join(FEATURE_COLUMNS)
-    query = f"SELECT {placeholders} FROM features WHERE {filter_sql}"
+) -> int:
+    columns = ", ".join(FEATURE_COLUMNS)
+    query = f"INSERT INTO main.features ({columns}) SELECT {columns} FROM src.features WHERE {filter_sql}"
     bind_params: list[object] = list(params)
     if limit is not None and limit > 0:
         query += " LIMIT ?"
         bind_params.append(limit)
-
-    insert_sql = (
-        "INSERT INTO features ("
-        + ", ".join(FEATURE_COLUMNS)
-        + ") VALUES ("
-        + ", ".join("?" for _ in FEATURE_COLUMNS)
-        + ")"
-    )
-
-    selected_ids: list[int] = []
-    cur_src = src.cursor()
-    cur_dest = dest.cursor()
-    for row in cur_src.execute(query, bind_params):
-        cur_dest.execute(insert_sql, row)
-        selected_ids.append(row[0])
+    copied = dest.execute(query, bind_params).rowcount
     dest.commit()
-    cur_src.close()
-    cur_dest.close()
-    return selected_ids
-
-
-def copy_alternate_names(src: sqlite3.Connection, dest: sqlite3.Connection, geoname_ids: Iterable[int]) -> None:
-    ids = list(geoname_ids)
-    if not ids:
-        return
-    chunk_size = 800
-    insert_sql = "INSERT INTO alternate_names (geoname_id, name, name_ascii, is_preferred) VALUES (?, ?, ?, ?)"
-    cur_src = src.cursor()
-    cur_dest = dest.cursor()
-    for start in range(0, len(ids), chunk_size):
-        chunk = ids[start : start + chunk_size]
-        placeholders = ",".join("?" for _ in chunk)
-        query = f"SELECT {', '.join(ALT_COLUMNS)} FROM alternate_names WHERE geoname_id IN ({placeholders})"
-        for row in cur_src.execute(query, chunk):
-            cur_dest.execute(insert_sql, row)
+    return copied
+
+
+def copy_alternate_names(dest: sqlite3.Connection) -> int:
+    """Alternate names of the copied features, via a join against the lite ``features`` table."""
+    columns = ", ".join(f"a.{col}" for col in ALT_COLUMNS)
+    copied = dest.execute(
+        f"""
+        INSERT INTO main.alternate_names ({', '.join(ALT_COLUMNS)})
+        SELECT {columns}
+        FROM main.features AS f
+        JOIN src.alternate_names AS a ON a.geoname_id = f.geoname_id
+        """
+    ).rowcount
     dest.commit()
-    cur_src.close()
-    cur_dest.close()
+    return copied
 
 
-def copy_metadata(src: sqlite3.Connection, dest: sqlite3.Connection, filter_description: str, source_path: pathlib.Path) -> None:
-    src_rows = dict(src.execute("SELECT key, value FROM metadata"))
+def copy_metadata(dest: sqlite3.Connection, filter_description: str, source_path: pathlib.Path) -> None:
+    dest.execute("INSERT OR REPLACE INTO main.metadata (key, value) SELECT key, value FROM src.metadata")
     additions = {
         "lite_generated_at": dt.datetime.utcnow().isoformat(timespec="seconds") + "Z",
         "lite_filter": filter_description,
         "lite_source_db": str(source_path),
     }
-    src_rows.update(additions)
-    dest.executemany("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", src_rows.items())
+    dest.executemany("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", additions.items())
     dest.commit()
 
 
@@ -243,15 +272,22 @@ def main(argv: List[str] | None = None) -> int:
         raise FileNotFoundError(f"Source database not found: {args.source}")
     ensure_output(args.output, args.overwrite)
 
-    filter_sql, params, description = build_filters(args)
-
-    with sqlite3.connect(args.source) as src_conn, sqlite3.connect(args.output) as dest_conn:
+    dest_conn = sqlite3.connect(args.output.resolve().as_uri() + "?mode=rwc", uri=True)
+    try:
         create_schema(dest_conn)
-        ids = copy_features(src_conn, dest_conn, filter_sql, params, args.limit)
-        copy_alternate_names(src_conn, dest_conn, ids)
-        copy_metadata(src_conn, dest_conn, description, args.source)
-
-    print(f"Generated lite database with {len(ids)} features at {args.output}")
+        attach_source(dest_conn, args.source)
+        filter_sql, params, description = build_filters(args, sargable=source_is_optimized(dest_conn))
+        count = copy_features(dest_conn, filter_sql, params, args.limit)
+        copy_alternate_names(dest_conn)
+        create_indexes(dest_conn)
+        populate_spatial_index(dest_conn)
+        if args.search_index:
+            create_name_index(dest_conn)
+        copy_metadata(dest_conn, description, args.source)
+    finally:
+        dest_conn.close()
+
+    print(f"Generated lite database with {count} features at {args.output}")
     return 0
 
 
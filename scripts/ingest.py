@@ -1,16 +1,85 @@
 """Entry point for the DaliTrail GeoNames ingestion pipeline.
 
-This script downloads the raw GeoNames datasets, filters them to the feature
-codes we care about, and writes the curated SQLite bundle consumed by the
-DaliTrail PWA. The initial scaffold only defines the command-line interface;
-fill in the TODOs when implementing the actual pipeline.
+Streams the GeoNames dump (allCountries.zip, ~12M rows) straight out of the
+archive, keeps the feature codes listed in configs/feature-whitelist.yml and
+writes the master SQLite bundle (``features``, ``alternate_names``,
+``countries``, ``admin1_codes``, ``metadata``) consumed by the server's lite
+builders. Memory stays bounded: the decompressed stream is cut into line-aligned chunks
+that are parsed (in-process, or on a pool of --jobs processes) into column
+batches, which this process alone writes with ``executemany`` in chunk order,
+so every --jobs value produces the same database. Indexes / the R*Tree are
+built once after the load.
+The database is assembled under --workdir and moved over --output at the end,
+so a running server keeps reading the previous master until then.
+
+``--incremental`` instead patches the existing --output in place from the daily
+``modifications-YYYY-MM-DD.txt`` / ``deletes-YYYY-MM-DD.txt`` files: upserts and
+deletes keyed by geoname_id, one transaction per day, with the last applied day
+recorded as the ``updates_applied_through`` metadata watermark.
+
+Alternate names come from the dump's ``alternatenames`` column
+(``is_preferred`` is always 0; the flag only exists in alternateNamesV2).
 """
 
 from __future__ import annotations
 
 import argparse
+import json
+import math
+import os
 import pathlib
+import shutil
+import sqlite3
 import sys
+import time
+import unicodedata
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Sequence
+
+try:  # peak RSS; not available on Windows
+    import resource
+except ImportError:  # pragma: no cover - platform dependent
+    resource = None  # type: ignore[assignment]
+
+import yaml
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generate_lite_db import (  # noqa: E402
+    FEATURE_COLUMNS,
+    create_indexes,
+    create_schema,
+    populate_spatial_index,
+)
+from geodata import (  # noqa: E402
+    create_name_index,
+    create_trigram_index,
+    delete_from_name_index,
+    optimize_dataset,
+    populate_name_index,
+    populate_trigram_index,
+    refresh_region_stats,
+)
+
+DUMP_URL = "https://download.geonames.org/export/dump/"
+FULL_ARCHIVE = "allCountries.zip"
+SAMPLE_ARCHIVE = "AD.zip"  # Andorra, a few thousand rows: quick end-to-end runs
+REFERENCE_FILES = ("countryInfo.txt", "admin1CodesASCII.txt")
+
+# geoname table columns (https://download.geonames.org/export/dump/readme.txt)
+(
+    COL_ID, COL_NAME, COL_ASCII, COL_ALTERNATES, COL_LAT, COL_LNG, COL_CLASS, COL_CODE, COL_COUNTRY,
+    COL_CC2, COL_ADMIN1, COL_ADMIN2, COL_ADMIN3, COL_ADMIN4, COL_POPULATION, COL_ELEVATION, COL_DEM,
+    COL_TIMEZONE, COL_MODIFIED,
+) = range(19)
+DEM_NO_DATA = -9999
+COMMIT_EVERY_BATCHES = 20  # one transaction per 20 chunks (~1M dump lines at the default batch size)
+DUMP_LINE_BYTES = 128  # average allCountries.txt line; sizes chunks from --batch-size
 
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
@@ -23,6 +92,21 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default=pathlib.Path("configs/feature-whitelist.yml"),
         help="Path to the feature whitelist configuration.",
     )
+    parser.add_argument(
+        "--source",
+        help="GeoNames dump to read: a local .zip/.txt path or an URL (default: allCountries.zip from geonames.org).",
+    )
+    parser.add_argument(
+        "--use-sample",
+        action="store_true",
+        help=f"Use the small {SAMPLE_ARCHIVE} country extract instead of {FULL_ARCHIVE}.",
+    )
+    parser.add_argument(
+        "--download-dir",
+        type=pathlib.Path,
+        default=pathlib.Path("data/downloads"),
+        help="Where downloaded archives are kept and reused (default: data/downloads/).",
+    )
     parser.add_argument(
         "--workdir",
         type=pathlib.Path,
@@ -35,25 +119,675 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default=pathlib.Path("data/geonames_all_countries_latest.db"),
         help="Where to write the final SQLite file.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50_000,
+        help="Approximate dump lines per parse chunk / insert batch (default: 50000).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parser processes; 0 = one per CPU (default: 1, parse in-process). The output does not depend on it.",
+    )
     parser.add_argument(
         "--overwrite",
         action="store_true",
         help="Allow the script to overwrite existing artefacts.",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Apply the GeoNames daily modifications/deletes newer than the watermark of the existing --output, in place.",
+    )
+    parser.add_argument(
+        "--updates-dir",
+        type=pathlib.Path,
+        help="With --incremental: read modifications-*.txt / deletes-*.txt from this directory instead of downloading.",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary.")
     return parser.parse_args(argv)
 
 
+# ---------------------------------------------------------------------------
+# Inputs: whitelist, downloads, streamed dump
+# ---------------------------------------------------------------------------
+def load_whitelist(path: pathlib.Path) -> set[str]:
+    """Flatten the category -> [CLASS.CODE, ...] mapping of feature-whitelist.yml."""
+    raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    groups = raw.values() if isinstance(raw, dict) else [raw]
+    codes = {str(code).strip().upper() for group in groups for code in (group or [])}
+    invalid = sorted(code for code in codes if code.count(".") != 1)
+    if invalid:
+        raise ValueError(f"{path}: feature codes must look like CLASS.CODE, got {', '.join(invalid)}")
+    if not codes:
+        raise ValueError(f"{path}: no feature codes configured")
+    return codes
+
+
+def download(url: str, dest_dir: pathlib.Path, *, quiet: bool = False) -> pathlib.Path:
+    """Fetch ``url`` into ``dest_dir`` once (streamed to a .part file, then renamed)."""
+    dest = dest_dir / url.rstrip("/").rsplit("/", 1)[-1]
+    if dest.exists():
+        return dest
+    import requests  # only needed when something has to be downloaded
+
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    part = dest.with_name(dest.name + ".part")
+    if not quiet:
+        print(f" • downloading {url}")
+    with requests.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with open(part, "wb") as fh:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                fh.write(chunk)
+    part.replace(dest)
+    return dest
+
+
+def resolve_source(args: argparse.Namespace) -> pathlib.Path:
+    source = args.source or DUMP_URL + (SAMPLE_ARCHIVE if args.use_sample else FULL_ARCHIVE)
+    if source.startswith(("http://", "https://")):
+        return download(source, args.download_dir, quiet=args.quiet)
+    path = pathlib.Path(source)
+    if not path.exists():
+        raise FileNotFoundError(f"GeoNames source not found: {path}")
+    return path
+
+
+@contextmanager
+def open_dump(path: pathlib.Path) -> Iterator[BinaryIO]:
+    """Binary stream of the dump; .zip members are decompressed on the fly, never extracted."""
+    if path.suffix.lower() != ".zip":
+        with open(path, "rb") as fh:
+            yield fh
+        return
+    with zipfile.ZipFile(path) as archive:
+        members = [m for m in archive.namelist() if m.endswith(".txt") and not m.lower().startswith("readme")]
+        if len(members) != 1:
+            raise ValueError(f"{path}: expected one GeoNames .txt member, found {members}")
+        with archive.open(members[0]) as stream:
+            yield stream
+
+
+def iter_chunks(stream: BinaryIO, chunk_bytes: int) -> Iterator[bytes]:
+    """Line-aligned blocks of roughly ``chunk_bytes`` (UTF-8 safe: cuts only after b"\\n")."""
+    while True:
+        block = stream.read(chunk_bytes)
+        if not block:
+            return
+        if not block.endswith(b"\n"):
+            block += stream.readline()
+        yield block
+
+
+def iter_dump(block: bytes) -> Iterator[list[str]]:
+    """Split dump lines into their 19 columns (short lines are padded)."""
+    for line in block.decode("utf-8").split("\n"):
+        fields = line.rstrip("\r").split("\t")
+        if len(fields) < 19:
+            if not fields[0]:
+                continue
+            fields += [""] * (19 - len(fields))
+        yield fields
+
+
+# ---------------------------------------------------------------------------
+# Row shaping
+# ---------------------------------------------------------------------------
+def ascii_fold(value: str) -> str:
+    """Drop diacritics and any remaining non-ASCII characters."""
+    return unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+
+
+def search_tokens(names: Iterable[str]) -> str:
+    """Sorted, de-duplicated lower-case ASCII words of every name (what the client's search matches)."""
+    tokens: set[str] = set()
+    for name in names:
+        tokens.update(token for token in ascii_fold(name).lower().split() if any(ch.isalnum() for ch in token))
+    return " ".join(sorted(tokens))
+
+
+def _int_or_none(value: str) -> int | None:
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def shape_row(fields: Sequence[str]) -> tuple[tuple, list[tuple]]:
+    """One features row (FEATURE_COLUMNS order) and its alternate_names rows."""
+    geoname_id = int(fields[COL_ID])
+    name, ascii_name = fields[COL_NAME], fields[COL_ASCII] or ascii_fold(fields[COL_NAME])
+    latitude, longitude = float(fields[COL_LAT]), float(fields[COL_LNG])
+
+    elevation = _int_or_none(fields[COL_ELEVATION])
+    if elevation is None:
+        dem = _int_or_none(fields[COL_DEM])
+        elevation = dem if dem is not None and dem != DEM_NO_DATA else None
+
+    alternates: list[tuple] = []
+    seen = {name}
+    for alt in fields[COL_ALTERNATES].split(","):
+        alt = alt.strip()
+        if alt and alt not in seen:
+            seen.add(alt)
+            alternates.append((geoname_id, alt, ascii_fold(alt), 0))
+
+    feature = (
+        geoname_id,
+        name,
+        ascii_name,
+        fields[COL_CLASS] or None,
+        fields[COL_CODE] or None,
+        latitude,
+        longitude,
+        fields[COL_COUNTRY] or None,
+        fields[COL_ADMIN1] or None,
+        fields[COL_ADMIN2] or None,
+        _int_or_none(fields[COL_POPULATION]) or 0,
+        float(elevation) if elevation is not None else None,
+        fields[COL_TIMEZONE] or None,
+        fields[COL_MODIFIED] or None,
+        search_tokens([name, ascii_name, *(alt[2] for alt in alternates)]),
+        math.floor(latitude),
+        math.floor(longitude),
+    )
+    return feature, alternates
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+class _Progress:
+    def __init__(self, quiet: bool, every: int = 500_000) -> None:
+        self.quiet = quiet
+        self.every = every
+        self.started = time.perf_counter()
+        self.scanned = 0
+        self.kept = 0
+        self.alternates = 0
+        self._next = every
+
+    def tick(self) -> None:
+        if self.quiet or self.scanned < self._next:
+            return
+        self._next = (self.scanned // self.every + 1) * self.every  # chunks can step past several marks
+        elapsed = time.perf_counter() - self.started
+        print(
+            f"   {self.scanned:>12,} scanned  {self.kept:>11,} kept  "
+            f"{self.scanned / elapsed:>9,.0f} rows/s  writer peak RSS {format_rss(peak_rss_bytes())}",
+            flush=True,
+        )
+
+
+class ParsedChunk(NamedTuple):
+    """Column batches of one chunk: ``features[i]`` is the i-th FEATURE_COLUMNS column."""
+
+    scanned: int
+    features: tuple[tuple, ...]
+    alternates: tuple[tuple, ...]
+
+
+def parse_chunk(block: bytes, whitelist: frozenset[str]) -> ParsedChunk:
+    """Filter and shape one chunk; runs in the parser processes with --jobs."""
+    features: list[tuple] = []
+    alternates: list[tuple] = []
+    scanned = 0
+    for fields in iter_dump(block):
+        scanned += 1
+        if f"{fields[COL_CLASS]}.{fields[COL_CODE]}" in whitelist:
+            try:
+                feature, alts = shape_row(fields)
+            except ValueError:  # malformed id/coordinates
+                continue
+            features.append(feature)
+            alternates.extend(alts)
+    # Columns pickle smaller than row tuples on the way back to the writer
+    return ParsedChunk(scanned, tuple(zip(*features)), tuple(zip(*alternates)))
+
+
+_WORKER_WHITELIST: frozenset[str] = frozenset()
+
+
+def _init_parser(whitelist: frozenset[str]) -> None:
+    global _WORKER_WHITELIST
+    _WORKER_WHITELIST = whitelist
+
+
+def _parse_in_worker(block: bytes) -> ParsedChunk:
+    return parse_chunk(block, _WORKER_WHITELIST)
+
+
+def parse_chunks(blocks: Iterable[bytes], whitelist: frozenset[str], jobs: int) -> Iterator[ParsedChunk]:
+    """Parsed chunks in input order; with ``jobs`` > 1 at most 2 * jobs chunks are in flight."""
+    if jobs <= 1:
+        for block in blocks:
+            yield parse_chunk(block, whitelist)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_parser, initargs=(whitelist,)) as pool:
+        pending: deque[Future] = deque()
+        for block in blocks:
+            pending.append(pool.submit(_parse_in_worker, block))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_features(conn: sqlite3.Connection, chunks: Iterable[ParsedChunk], progress: _Progress) -> None:
+    """Single writer: insert each chunk's features + alternate names; commits every COMMIT_EVERY_BATCHES."""
+    feature_sql = f"INSERT OR REPLACE INTO features ({', '.join(FEATURE_COLUMNS)}) VALUES ({', '.join('?' * len(FEATURE_COLUMNS))})"
+    alt_sql = "INSERT INTO alternate_names (geoname_id, name, name_ascii, is_preferred) VALUES (?, ?, ?, ?)"
+    for batches, chunk in enumerate(chunks, 1):
+        if chunk.features:
+            conn.executemany(feature_sql, zip(*chunk.features))
+            progress.kept += len(chunk.features[0])
+        if chunk.alternates:
+            conn.executemany(alt_sql, zip(*chunk.alternates))
+            progress.alternates += len(chunk.alternates[0])
+        progress.scanned += chunk.scanned
+        if batches % COMMIT_EVERY_BATCHES == 0:
+            conn.commit()
+        progress.tick()
+    conn.commit()
+
+
+def load_reference_tables(conn: sqlite3.Connection, directory: pathlib.Path) -> list[str]:
+    """countries / admin1_codes (used for catalog labels) from countryInfo.txt and admin1CodesASCII.txt."""
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS countries (
+            iso_code TEXT PRIMARY KEY,
+            iso3 TEXT,
+            name TEXT NOT NULL,
+            continent TEXT,
+            population INTEGER,
+            geoname_id INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS admin1_codes (
+            country_code TEXT NOT NULL,
+            admin1_code TEXT NOT NULL,
+            name TEXT NOT NULL,
+            name_ascii TEXT,
+            geoname_id INTEGER,
+            PRIMARY KEY (country_code, admin1_code)
+        );
+        """
+    )
+    loaded = []
+    country_info = directory / "countryInfo.txt"
+    if country_info.exists():
+        with open(country_info, encoding="utf-8") as fh:
+            rows = (
+                (f[0], f[1], f[4], f[8], _int_or_none(f[7]), _int_or_none(f[16]))
+                for f in (line.rstrip("\n").split("\t") for line in fh if not line.startswith("#"))
+                if len(f) > 16
+            )
+            conn.executemany("INSERT OR REPLACE INTO countries VALUES (?, ?, ?, ?, ?, ?)", rows)
+        loaded.append(country_info.name)
+    admin1 = directory / "admin1CodesASCII.txt"
+    if admin1.exists():
+        with open(admin1, encoding="utf-8") as fh:
+            rows = (
+                (*f[0].split(".", 1), f[1], f[2], _int_or_none(f[3]))
+                for f in (line.rstrip("\n").split("\t") for line in fh)
+                if len(f) > 3 and "." in f[0]
+            )
+            conn.executemany("INSERT OR REPLACE INTO admin1_codes VALUES (?, ?, ?, ?, ?)", rows)
+        loaded.append(admin1.name)
+    conn.commit()
+    return loaded
+
+
+def write_metadata(conn: sqlite3.Connection, source: pathlib.Path, whitelist: Iterable[str]) -> None:
+    stats = conn.execute(
+        """
+        SELECT COUNT(*), MIN(modification_date), MAX(modification_date),
+               MIN(latitude), MAX(latitude), MIN(longitude), MAX(longitude)
+        FROM features
+        """
+    ).fetchone()
+    alt_count = conn.execute("SELECT COUNT(*) FROM alternate_names").fetchone()[0]
+    metadata = {
+        "build_created_at": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "source_reference": str(source),
+        "feature_whitelist": ",".join(sorted(whitelist)),
+        "feature_count": str(stats[0]),
+        "alternate_name_count": str(alt_count),
+        "dataset_mod_min": stats[1] or "",
+        "dataset_mod_max": stats[2] or "",
+        "latitude_range": f"{stats[3]:.6f},{stats[4]:.6f}" if stats[0] else "",
+        "longitude_range": f"{stats[5]:.6f},{stats[6]:.6f}" if stats[0] else "",
+        "generator": "scripts/ingest.py",
+    }
+    conn.executemany("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", metadata.items())
+    conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Incremental updates: daily modifications / deletes files
+# ---------------------------------------------------------------------------
+WATERMARK_KEY = "updates_applied_through"
+UPDATE_KINDS = ("modifications", "deletes")
+
+
+def read_watermark(conn: sqlite3.Connection) -> date:
+    """Last applied update day; a fresh build starts from its newest modification_date."""
+    meta = dict(conn.execute("SELECT key, value FROM metadata WHERE key IN (?, 'dataset_mod_max')", (WATERMARK_KEY,)))
+    value = meta.get(WATERMARK_KEY) or meta.get("dataset_mod_max")
+    if not value:
+        raise ValueError("master has no update watermark or dataset_mod_max; run a full ingest first")
+    return date.fromisoformat(value)
+
+
+def collect_updates(args: argparse.Namespace, watermark: date) -> list[tuple[date, dict[str, pathlib.Path]]]:
+    """
+    Update files per day after ``watermark``, oldest first, as {"modifications": path, "deletes": path}.
+    With --updates-dir, raises ValueError at the first day up to the newest one present that
+    lacks either file.
+    """
+    days: dict[date, dict[str, pathlib.Path]] = {}
+    if args.updates_dir:
+        for kind in UPDATE_KINDS:
+            for path in args.updates_dir.glob(f"{kind}-*.txt"):
+                try:
+                    day = date.fromisoformat(path.stem[len(kind) + 1:])
+                except ValueError:
+                    continue
+                if day > watermark:
+                    days.setdefault(day, {})[kind] = path
+        # Days must follow the watermark without a gap: a skipped day's changes would be lost for good
+        expected = watermark + timedelta(days=1)
+        for day, files in sorted(days.items()):
+            missing = [kind for kind in UPDATE_KINDS if day != expected or kind not in files]
+            if missing:
+                raise ValueError(
+                    f"{args.updates_dir} is missing {', '.join(f'{kind}-{expected.isoformat()}.txt' for kind in missing)}; "
+                    f"updates must follow the watermark {watermark.isoformat()} without gaps (nothing was applied)"
+                )
+            expected += timedelta(days=1)
+        return sorted(days.items())
+    # GeoNames publishes a day's files the following morning (UTC)
+    last = datetime.now(timezone.utc).date() - timedelta(days=1)
+    day = watermark + timedelta(days=1)
+    while day <= last:
+        days[day] = {kind: download(f"{DUMP_URL}{kind}-{day.isoformat()}.txt", args.download_dir, quiet=args.quiet)
+                     for kind in UPDATE_KINDS}
+        day += timedelta(days=1)
+    return sorted(days.items())
+
+
+class _UpdateStats:
+    def __init__(self) -> None:
+        self.upserted = 0
+        self.deleted = 0
+        self.stale = 0
+        self.countries: set[str] = set()
+        self.mod_max = ""
+
+
+def _delete_features(conn: sqlite3.Connection, ids: list[int], indexes: tuple[str, ...]) -> int:
+    if not ids:
+        return 0
+    payload = json.dumps(ids)
+    for table in indexes:
+        if table == "features_fts":  # rowids derive from the row and its alternate names: delete those last
+            delete_from_name_index(conn, "WHERE f.geoname_id IN (SELECT value FROM json_each(?))", (payload,))
+        else:
+            conn.execute(f"DELETE FROM {table} WHERE rowid IN (SELECT value FROM json_each(?))", (payload,))
+    conn.execute("DELETE FROM alternate_names WHERE geoname_id IN (SELECT value FROM json_each(?))", (payload,))
+    return conn.execute("DELETE FROM features WHERE geoname_id IN (SELECT value FROM json_each(?))", (payload,)).rowcount
+
+
+def apply_modifications(
+    conn: sqlite3.Connection,
+    path: pathlib.Path,
+    whitelist: frozenset[str],
+    batch_size: int,
+    indexes: tuple[str, ...],
+    stats: _UpdateStats,
+) -> None:
+    """
+    Upsert the whitelisted rows of a modifications file; rows reclassified out of the
+    whitelist are deleted. Rows older than the stored modification_date are skipped.
+    """
+    feature_sql = f"INSERT OR REPLACE INTO features ({', '.join(FEATURE_COLUMNS)}) VALUES ({', '.join('?' * len(FEATURE_COLUMNS))})"
+    alt_sql = "INSERT INTO alternate_names (geoname_id, name, name_ascii, is_preferred) VALUES (?, ?, ?, ?)"
+    rtree_sql = "INSERT OR REPLACE INTO features_rtree (geoname_id, min_lat, max_lat, min_lng, max_lng) VALUES (?, ?, ?, ?, ?)"
+    with open_dump(path) as stream:
+        for block in iter_chunks(stream, batch_size * DUMP_LINE_BYTES):
+            rows = list(iter_dump(block))
+            existing = {
+                gid: (modified or "", country)
+                for gid, modified, country in conn.execute(
+                    "SELECT geoname_id, modification_date, country FROM features "
+                    "WHERE geoname_id IN (SELECT value FROM json_each(?))",
+                    (json.dumps([int(fields[COL_ID]) for fields in rows]),),
+                )
+            }
+            features: list[tuple] = []
+            alternates: list[tuple] = []
+            removed: list[int] = []
+            for fields in rows:
+                gid = int(fields[COL_ID])
+                stored_date, stored_country = existing.get(gid, ("", None))
+                if fields[COL_MODIFIED] and fields[COL_MODIFIED] < stored_date:
+                    stats.stale += 1
+                    continue
+                if f"{fields[COL_CLASS]}.{fields[COL_CODE]}" in whitelist:
+                    try:
+                        feature, alts = shape_row(fields)
+                    except ValueError:
+                        continue
+                    features.append(feature)
+                    alternates.extend(alts)
+                    stats.countries.add(feature[7] or "")
+                    stats.mod_max = max(stats.mod_max, feature[13] or "")
+                elif gid in existing:
+                    removed.append(gid)
+                else:
+                    continue
+                if stored_country is not None:
+                    stats.countries.add(stored_country)
+            stats.deleted += _delete_features(conn, removed, indexes)
+            upserted = json.dumps([feature[0] for feature in features])
+            if "features_fts" in indexes:  # by the stored rows' rowids, before they change
+                delete_from_name_index(conn, "WHERE f.geoname_id IN (SELECT value FROM json_each(?))", (upserted,))
+            conn.execute("DELETE FROM alternate_names WHERE geoname_id IN (SELECT value FROM json_each(?))", (upserted,))
+            conn.executemany(feature_sql, features)
+            conn.executemany(alt_sql, alternates)
+            if "features_rtree" in indexes:
+                conn.executemany(rtree_sql, ((f[0], f[5], f[5], f[6], f[6]) for f in features))
+            if "features_fts" in indexes:
+                populate_name_index(conn, where="WHERE f.geoname_id IN (SELECT value FROM json_each(?))", params=(upserted,))
+            if "features_trigram" in indexes:
+                conn.execute("DELETE FROM features_trigram WHERE rowid IN (SELECT value FROM json_each(?))", (upserted,))
+                populate_trigram_index(conn, where="WHERE f.geoname_id IN (SELECT value FROM json_each(?))", params=(upserted,))
+            stats.upserted += len(features)
+
+
+def apply_deletes(conn: sqlite3.Connection, path: pathlib.Path, indexes: tuple[str, ...], stats: _UpdateStats) -> None:
+    """Delete the geoname ids listed in a deletes file (geonameid, name, comment)."""
+    with open(path, encoding="utf-8") as fh:
+        ids = [int(line.split("\t", 1)[0]) for line in fh if line.strip()]
+    payload = json.dumps(ids)
+    stats.countries.update(
+        country or ""
+        for (country,) in conn.execute(
+            "SELECT DISTINCT country FROM features WHERE geoname_id IN (SELECT value FROM json_each(?))", (payload,)
+        )
+    )
+    stats.deleted += _delete_features(conn, ids, indexes)
+
+
+def run_incremental(args: argparse.Namespace, say) -> int:
+    """--incremental: apply every pending update day to --output in place."""
+    if not args.output.exists():
+        print(f"{args.output} does not exist; run a full ingest before --incremental.", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    stats = _UpdateStats()
+    conn = sqlite3.connect(args.output)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")  # a running server keeps reading while days are applied
+        recorded = conn.execute("SELECT value FROM metadata WHERE key = 'feature_whitelist'").fetchone()
+        # The master's own whitelist: changing it needs a full rebuild, not an update
+        whitelist = frozenset(recorded[0].split(",")) if recorded and recorded[0] else frozenset(load_whitelist(args.config))
+        # Derived indexes present in this master (older masters may lack either)
+        indexes = tuple(
+            name for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE name IN ('features_rtree', 'features_fts', 'features_trigram') ORDER BY name"
+            )
+        )
+        watermark = read_watermark(conn)
+        say(f" • watermark: {watermark.isoformat()}")
+        updates = collect_updates(args, watermark)
+        for day, files in updates:
+            say(f" • applying {day.isoformat()}: {', '.join(path.name for path in files.values())}")
+            if "modifications" in files:
+                apply_modifications(conn, files["modifications"], whitelist, args.batch_size, indexes, stats)
+            if "deletes" in files:
+                apply_deletes(conn, files["deletes"], indexes, stats)
+            conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (WATERMARK_KEY, day.isoformat()))
+            conn.commit()
+            watermark = day
+        if updates:
+            previous = conn.execute("SELECT value FROM metadata WHERE key = 'dataset_mod_max'").fetchone()
+            metadata = {
+                "feature_count": str(conn.execute("SELECT COUNT(*) FROM features").fetchone()[0]),
+                "alternate_name_count": str(conn.execute("SELECT COUNT(*) FROM alternate_names").fetchone()[0]),
+                "dataset_mod_max": max(previous[0] if previous else "", stats.mod_max),
+                "updates_applied_at": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+            }
+            conn.executemany("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", metadata.items())
+            conn.commit()
+            conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    touched = sorted(code for code in stats.countries if code)
+    if touched:
+        refresh_region_stats(args.output, touched)
+    print(
+        f"Applied {len(updates)} update day(s) to {args.output} through {watermark.isoformat()}: "
+        f"{stats.upserted:,} upserted, {stats.deleted:,} deleted, {stats.stale:,} stale skipped, "
+        f"{len(touched)} countries touched in {time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+def peak_rss_bytes(children: bool = False) -> int | None:
+    """Peak RSS of this process (the writer), or with ``children`` of the largest reaped parser worker."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def format_rss(value: int | None) -> str:
+    return f"{value / 1024 / 1024:,.0f} MiB" if value is not None else "n/a"
+
+
 def main(argv: list[str] | None = None) -> int:
     args = parse_args(argv)
-    print("🔧 DaliTrail GeoNames ingestion (scaffold)")
-    print(f" • config:  {args.config}")
-    print(f" • workdir: {args.workdir}")
-    print(f" • output:  {args.output}")
+    if args.batch_size < 1 or args.jobs < 0:
+        print("--batch-size must be positive and --jobs non-negative.", file=sys.stderr)
+        return 2
+    jobs = args.jobs or os.cpu_count() or 1
+    say = (lambda *a, **k: None) if args.quiet else print
+    say("🔧 DaliTrail GeoNames ingestion")
+    say(f" • config:  {args.config}")
+    say(f" • workdir: {args.workdir}")
+    say(f" • output:  {args.output}")
+    if args.incremental:
+        return run_incremental(args, say)
     if not args.overwrite and args.output.exists():
         print("Output already exists. Re-run with --overwrite to rebuild.", file=sys.stderr)
         return 1
 
-    print("TODO: implement download, filtering, SQLite generation.")
+    whitelist = frozenset(load_whitelist(args.config))
+    source = resolve_source(args)
+    reference_dir = source.parent
+    if not (args.source and not args.source.startswith(("http://", "https://"))):
+        for name in REFERENCE_FILES:
+            try:
+                download(DUMP_URL + name, args.download_dir, quiet=args.quiet)
+            except Exception as exc:  # labels only; the features load does not depend on them
+                print(f"Warning: could not download {name}: {exc}", file=sys.stderr)
+        reference_dir = args.download_dir
+    say(f" • source:  {source} ({len(whitelist)} feature codes, {jobs} parser process{'es' if jobs > 1 else ''})")
+
+    staging_dir = args.workdir / "work"
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    staging = staging_dir / f"{args.output.name}.building"
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        pathlib.Path(f"{staging}{suffix}").unlink(missing_ok=True)
+
+    timings: dict[str, float] = {}
+    progress = _Progress(args.quiet)
+    conn = sqlite3.connect(staging)
+    try:
+        create_schema(conn)
+        conn.executescript(
+            """
+            PRAGMA journal_mode=OFF;
+            PRAGMA synchronous=OFF;
+            PRAGMA foreign_keys=OFF;
+            PRAGMA cache_size=-65536;
+            PRAGMA temp_store=FILE;
+            """
+        )
+        started = time.perf_counter()
+        with open_dump(source) as stream:
+            chunks = iter_chunks(stream, args.batch_size * DUMP_LINE_BYTES)
+            load_features(conn, parse_chunks(chunks, whitelist, jobs), progress)
+        timings["load"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        create_indexes(conn)
+        populate_spatial_index(conn)
+        create_name_index(conn)
+        create_trigram_index(conn)
+        timings["indexes"] = time.perf_counter() - started
+
+        loaded = load_reference_tables(conn, reference_dir)
+        if len(loaded) < len(REFERENCE_FILES):
+            print(f"Warning: {', '.join(sorted(set(REFERENCE_FILES) - set(loaded)))} missing in {reference_dir}; "
+                  "catalog labels will fall back to codes.", file=sys.stderr)
+        write_metadata(conn, source, whitelist)
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+
+    # Region statistics and sargable indexes (tools/refresh_region_stats.py, tools/optimize_master.py)
+    started = time.perf_counter()
+    refresh_region_stats(staging)
+    optimize_dataset(staging)
+    timings["stats"] = time.perf_counter() - started
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    for suffix in ("-wal", "-shm"):  # sidecars of the previous file must not be replayed into the new one
+        pathlib.Path(f"{args.output}{suffix}").unlink(missing_ok=True)
+    shutil.move(str(staging), str(args.output))
+
+    total = sum(timings.values())
+    parser_rss = peak_rss_bytes(children=True) if jobs > 1 else None  # workers have exited with the pool
+    print(
+        f"Ingested {progress.kept:,} of {progress.scanned:,} rows ({progress.alternates:,} alternate names) "
+        f"into {args.output} in {total:.1f}s"
+    )
+    print(
+        f"  load {timings['load']:.1f}s ({progress.scanned / max(timings['load'], 1e-9):,.0f} rows/s scanned, "
+        f"{progress.kept / max(timings['load'], 1e-9):,.0f} rows/s inserted), indexes {timings['indexes']:.1f}s, "
+        f"stats {timings['stats']:.1f}s; peak RSS {format_rss(peak_rss_bytes())} writer"
+        + (f", {format_rss(parser_rss)} largest parser" if parser_rss else "")
+    )
     return 0
 
 
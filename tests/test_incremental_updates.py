@@ -0,0 +1,97 @@
+"""
+scripts/ingest.py --incremental against the fixtures in tests/fixtures/updates:
+a five-row dump (dataset_mod_max 2024-01-27) and the update days 2024-01-28/29.
+
+  python -m unittest discover -s tests
+"""
+
+import contextlib
+import io
+import pathlib
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import ingest  # noqa: E402
+from geodata import NAME_FTS_ID_MASK  # noqa: E402
+
+FIXTURES = ROOT / "tests" / "fixtures" / "updates"
+
+
+class IncrementalUpdateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.master = self.tmp / "master.db"
+        self._ingest(
+            "--source", str(FIXTURES / "allCountries.txt"),
+            "--workdir", str(self.tmp),
+            "--overwrite",
+        )
+
+    def _ingest(self, *argv: str) -> int:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return ingest.main([*argv, "--output", str(self.master), "--quiet"])
+
+    def _update(self, updates_dir: pathlib.Path) -> int:
+        return self._ingest("--incremental", "--updates-dir", str(updates_dir))
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with sqlite3.connect(self.master) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _watermark(self) -> str:
+        return self._query("SELECT value FROM metadata WHERE key = ?", (ingest.WATERMARK_KEY,))[0][0]
+
+    def test_applies_days_in_order(self) -> None:
+        self.assertEqual(self._query("SELECT geoname_id FROM features ORDER BY geoname_id"), [(1,), (2,), (3,), (4,)])
+
+        self.assertEqual(self._update(FIXTURES), 0)
+
+        features = dict(self._query("SELECT geoname_id, name FROM features"))
+        self.assertEqual(features, {1: "Lake Uno", 4: "Snow Church", 6: "New Peak"})
+        # upsert: renamed row and its alternate names replaced, new row inserted with the later day's population
+        self.assertEqual(self._query("SELECT name FROM alternate_names WHERE geoname_id = 1"), [("Lago Uno",)])
+        self.assertEqual(self._query("SELECT population FROM features WHERE geoname_id = 6"), [(120,)])
+        # reclassified out of the whitelist (2) and deleted (3): gone from every index too
+        mask = NAME_FTS_ID_MASK  # the name index keeps an importance band above the id
+        for table in ("features_rtree", "features_fts", "features_trigram"):
+            self.assertEqual(self._query(f"SELECT rowid FROM {table} WHERE rowid & {mask} IN (2, 3)"), [], table)
+            self.assertEqual(self._query(f"SELECT COUNT(*) FROM {table}"), [(3,)], table)
+        self.assertEqual(self._query(f"SELECT rowid & {mask} FROM features_fts WHERE features_fts MATCH 'lago'"), [(1,)])
+        # stale: the 2024-01-26 row does not overwrite the stored 2024-01-27 one
+        self.assertEqual(self._query("SELECT modification_date FROM features WHERE geoname_id = 4"), [("2024-01-27",)])
+        self.assertEqual(self._watermark(), "2024-01-29")
+        self.assertEqual(self._query("SELECT value FROM metadata WHERE key = 'feature_count'"), [("3",)])
+
+        # re-running finds nothing newer than the watermark
+        self.assertEqual(self._update(FIXTURES), 0)
+        self.assertEqual(self._watermark(), "2024-01-29")
+
+    def test_gap_stops_before_applying(self) -> None:
+        updates = self.tmp / "updates"
+        updates.mkdir()
+        for name in ("modifications-2024-01-29.txt", "deletes-2024-01-29.txt"):
+            shutil.copy(FIXTURES / name, updates / name)
+
+        with self.assertRaisesRegex(ValueError, "modifications-2024-01-28.txt, deletes-2024-01-28.txt"):
+            self._update(updates)
+        self.assertEqual(self._query("SELECT value FROM metadata WHERE key = ?", (ingest.WATERMARK_KEY,)), [])
+        self.assertEqual(self._query("SELECT COUNT(*) FROM features WHERE geoname_id = 6"), [(0,)])
+
+    def test_day_missing_one_file_is_a_gap(self) -> None:
+        updates = self.tmp / "updates"
+        updates.mkdir()
+        shutil.copy(FIXTURES / "modifications-2024-01-28.txt", updates)
+
+        with self.assertRaisesRegex(ValueError, "deletes-2024-01-28.txt"):
+            self._update(updates)
+
+
+if __name__ == "__main__":
+    unittest.main()
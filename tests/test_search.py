@@ -0,0 +1,72 @@
+"""
+geodata.search_places against a master built by scripts/ingest.py from a small
+generated dump: 20 populated places and two lakes, all named "Rainier".
+
+  python -m unittest discover -s tests
+"""
+
+import contextlib
+import io
+import pathlib
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import ingest  # noqa: E402
+import geodata  # noqa: E402
+
+
+def _dump_line(gid: int, name: str, fclass: str, fcode: str, population: int, alternates: str = "") -> str:
+    return "\t".join((
+        str(gid), name, name, alternates, f"{46 + gid / 100:.4f}", f"{-121 - gid / 100:.4f}", fclass, fcode,
+        "US", "", "WA", "", "", "", str(population), "", "", "America/Los_Angeles", "2024-01-20",
+    )) + "\n"
+
+
+class SearchPlacesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        dump = tmp / "allCountries.txt"
+        with open(dump, "w", encoding="utf-8") as fh:
+            for gid in range(1, 21):
+                fh.write(_dump_line(gid, f"Rainier {gid}", "P", "PPL", 2 ** gid))
+            fh.write(_dump_line(21, "Rainier Lake", "H", "LK", 0))
+            fh.write(_dump_line(22, "Rainier Tarn", "H", "LK", 0, "Lac Rainier,Rainiersee"))
+        self.master = tmp / "master.db"
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            ingest.main(["--source", str(dump), "--workdir", str(tmp), "--output", str(self.master), "--quiet"])
+        self.addCleanup(geodata.close_connection_pool, self.master)
+
+    def _search(self, q: str, **kwargs) -> list[int]:
+        return [match.geoname_id for match in geodata.search_places(q, db_path=self.master, **kwargs)]
+
+    def test_code_filter_applies_before_the_candidate_cap(self) -> None:
+        with mock.patch.object(geodata, "SEARCH_MAX_CANDIDATES", 10):
+            self.assertEqual(sorted(self._search("rain", feature_codes=["H.LK"])), [21, 22])
+            self.assertEqual(len(self._search("rain", limit=50)), 10)
+
+    def test_candidates_follow_importance(self) -> None:
+        with mock.patch.object(geodata, "SEARCH_MAX_CANDIDATES", 3):
+            # the most populous places, not the lowest ids
+            self.assertEqual(sorted(self._search("rainier", limit=10)), [18, 19, 20])
+            # among unpopulated features, the one with alternate names comes first
+            with mock.patch.object(geodata, "SEARCH_MAX_CANDIDATES", 1):
+                self.assertEqual(self._search("rainier", feature_codes=["H.LK"]), [22])
+
+    def test_old_name_index_is_rebuilt(self) -> None:
+        with sqlite3.connect(self.master) as conn:
+            conn.execute(f"DROP TABLE {geodata.NAME_FTS_TABLE}")
+            conn.executescript(geodata.NAME_FTS_SCHEMA_SQL.format(schema="main"))
+            conn.execute(f"INSERT INTO {geodata.NAME_FTS_TABLE} (rowid, name) SELECT geoname_id, name FROM features")
+        self.assertTrue(geodata.ensure_name_index(self.master))
+        self.assertFalse(geodata.ensure_name_index(self.master))
+        with sqlite3.connect(self.master) as conn:
+            (low,) = conn.execute(f"SELECT min(rowid) FROM {geodata.NAME_FTS_TABLE}").fetchone()
+        self.assertGreater(low, geodata.NAME_FTS_ID_MASK)
@@ -0,0 +1,37 @@
+"""
+Add the name search indexes to existing GeoNames databases (master or lite): the
+features_fts FTS5 index (names + alternate names, prefix search) and the
+features_trigram index (folded names, fuzzy search). A name index from before
+importance-ordered rowids is rebuilt.
+
+Usage:
+  python tools/add_name_index.py data/geonames-all_countries_latest.db [more.db ...]
+"""
+
+import argparse
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+from geodata import ensure_name_index, ensure_trigram_index  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Create the FTS5 name and trigram indexes on GeoNames databases.")
+    parser.add_argument("databases", nargs="+", type=pathlib.Path, help="SQLite files to upgrade in place.")
+    args = parser.parse_args()
+
+    status = 0
+    for db_path in args.databases:
+        if not db_path.exists():
+            print(f"Error: database not found: {db_path}", file=sys.stderr)
+            status = 1
+            continue
+        for label, ensure in (("name index", ensure_name_index), ("trigram index", ensure_trigram_index)):
+            print(f"{db_path}: {label} {'built' if ensure(db_path) else 'already present'}")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
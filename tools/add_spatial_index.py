@@ -0,0 +1,34 @@
+"""
+Add the features_rtree R*Tree index to existing GeoNames databases (master or lite).
+
+Usage:
+  python tools/add_spatial_index.py data/geonames-all_countries_latest.db [more.db ...]
+"""
+
+import argparse
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+from geodata import ensure_spatial_index  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Create the R*Tree spatial index on GeoNames databases.")
+    parser.add_argument("databases", nargs="+", type=pathlib.Path, help="SQLite files to upgrade in place.")
+    args = parser.parse_args()
+
+    status = 0
+    for db_path in args.databases:
+        if not db_path.exists():
+            print(f"Error: database not found: {db_path}", file=sys.stderr)
+            status = 1
+            continue
+        created = ensure_spatial_index(db_path)
+        print(f"{db_path}: {'spatial index created' if created else 'spatial index already present'}")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+"""
+Report download savings of the precompressed (gzip/zstd) variants of GeoNames DBs.
+
+For each database: compressed size and ratio, one-time compression cost,
+client-side decompression time and the estimated transfer time over a few
+typical mobile links.
+
+Usage:
+  python tools/bench_compression.py assets/data/geonames-lite-us-wa.db
+  python tools/bench_compression.py --gzip-level 6 --zstd-level 12 data/*.db
+"""
+
+import argparse
+import gzip
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+import geodata  # noqa: E402
+
+# Sustained downlink throughput in megabits per second
+LINKS = {"3G (1.5 Mbit/s)": 1.5, "LTE weak (5 Mbit/s)": 5.0, "LTE (20 Mbit/s)": 20.0}
+
+
+def _compress_seconds(encoding: str, src: pathlib.Path, dest: pathlib.Path) -> float:
+    """Time one encoding alone, with the same streaming calls and levels as geodata.write_compressed_variants()."""
+    start = time.perf_counter()
+    with open(src, "rb") as fh, open(dest, "wb") as raw:
+        if encoding == "zstd":
+            geodata.zstandard.ZstdCompressor(level=geodata.ZSTD_LEVEL).copy_stream(fh, raw, size=src.stat().st_size)
+        else:
+            with gzip.GzipFile(filename="", mode="wb", compresslevel=geodata.GZIP_LEVEL, fileobj=raw, mtime=0) as gz:
+                shutil.copyfileobj(fh, gz, 1024 * 1024)
+    return time.perf_counter() - start
+
+
+def _decompress_seconds(encoding: str, path: pathlib.Path) -> float:
+    start = time.perf_counter()
+    if encoding == "zstd":
+        with open(path, "rb") as fh:
+            reader = geodata.zstandard.ZstdDecompressor().stream_reader(fh)
+            while reader.read(1024 * 1024):
+                pass
+    else:
+        with gzip.open(path, "rb") as fh:
+            while fh.read(1024 * 1024):
+                pass
+    return time.perf_counter() - start
+
+
+def _transfer(size: int) -> str:
+    return "  ".join(f"{name}: {size * 8 / (mbps * 1e6):6.2f}s" for name, mbps in LINKS.items())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure precompressed download variants of GeoNames DBs.")
+    parser.add_argument("databases", nargs="+", type=pathlib.Path, help="SQLite files to compress.")
+    parser.add_argument("--gzip-level", type=int, default=geodata.GZIP_LEVEL)
+    parser.add_argument("--zstd-level", type=int, default=geodata.ZSTD_LEVEL)
+    args = parser.parse_args()
+
+    geodata.GZIP_LEVEL = args.gzip_level
+    geodata.ZSTD_LEVEL = args.zstd_level
+    if geodata.zstandard is None:
+        print("zstandard is not installed; reporting gzip only.")
+
+    status = 0
+    for db_path in args.databases:
+        if not db_path.exists():
+            print(f"Error: database not found: {db_path}", file=sys.stderr)
+            status = 1
+            continue
+        raw = db_path.stat().st_size
+        print(f"\n{db_path} ({geodata._format_size_bytes(raw)})")
+        print(f"  {'identity':8s} {raw:>12,d} B  100.0%{'':32s}{_transfer(raw)}")
+        with tempfile.TemporaryDirectory() as tmp:
+            for encoding in geodata.available_encodings():
+                variant = pathlib.Path(tmp) / (db_path.name + geodata.COMPRESSED_SUFFIXES[encoding])
+                compress_s = _compress_seconds(encoding, db_path, variant)
+                size = variant.stat().st_size
+                print(
+                    f"  {encoding:8s} {size:>12,d} B  {100.0 * size / raw:5.1f}%"
+                    f"  compress {compress_s:6.2f}s  decompress {_decompress_seconds(encoding, variant):5.3f}s"
+                    f"  {_transfer(size)}"
+                )
+                variant.unlink()
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""
+Benchmark the load phase of scripts/ingest.py across --jobs values.
+
+Parses a GeoNames dump (or a synthetic allCountries-format file) with 1, 2,
+4 and 8 parser processes feeding the single SQLite writer, and reports
+seconds, rows/sec and speedup over --jobs 1. Every run's features and
+alternate_names tables are hashed and must match the --jobs 1 result.
+
+Usage:
+  python tools/bench_ingest.py --synthetic 2000000
+  python tools/bench_ingest.py --source data/downloads/allCountries.zip --jobs 1,4,8
+"""
+
+import argparse
+import hashlib
+import pathlib
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import ingest  # noqa: E402
+
+SYNTHETIC_CODES = ["P.PPL", "H.LK", "T.MT", "T.PK", "S.CAMP", "H.STM", "T.TRL", "S.SCH", "L.PRK", "T.HLL"]
+COUNTRIES = ["US", "CA", "MX", "FR", "DE", "IT", "ES", "GB", "NO", "SE"]
+
+
+def _write_synthetic(path: pathlib.Path, count: int) -> None:
+    """allCountries.txt-shaped dump with ``count`` lines, accents and 0-3 alternate names each."""
+    rng = random.Random(7)
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        for gid in range(1, count + 1):
+            fclass, fcode = rng.choice(SYNTHETIC_CODES).split(".")
+            name = f"Lac Élan {gid}" if gid % 5 == 0 else f"Place {gid}"
+            alternates = ",".join(f"Alt Ñame {gid}-{i}" for i in range(rng.choice((0, 0, 1, 3))))
+            fh.write(
+                "\t".join((
+                    str(gid), name, "", alternates, f"{rng.uniform(-60, 70):.5f}", f"{rng.uniform(-180, 180):.5f}",
+                    fclass, fcode, rng.choice(COUNTRIES), "", f"{rng.randrange(20):02d}", f"A2-{rng.randrange(30)}",
+                    "", "", str(rng.randrange(100000)), "", str(rng.randrange(-50, 4000)), "UTC", "2024-01-01",
+                ))
+                + "\n"
+            )
+
+
+def _load(source: pathlib.Path, out: pathlib.Path, whitelist: frozenset[str], jobs: int, batch_size: int):
+    """Run the ingest load phase into a fresh ``out``; returns (seconds, progress)."""
+    out.unlink(missing_ok=True)
+    conn = sqlite3.connect(out)
+    ingest.create_schema(conn)
+    conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF; PRAGMA cache_size=-65536;")
+    progress = ingest._Progress(quiet=True)
+    start = time.perf_counter()
+    with ingest.open_dump(source) as stream:
+        chunks = ingest.iter_chunks(stream, batch_size * ingest.DUMP_LINE_BYTES)
+        ingest.load_features(conn, ingest.parse_chunks(chunks, whitelist, jobs), progress)
+    seconds = time.perf_counter() - start
+    conn.close()
+    return seconds, progress
+
+
+def _digest(path: pathlib.Path) -> str:
+    digest = hashlib.sha256()
+    with sqlite3.connect(path) as conn:
+        for sql in (
+            "SELECT * FROM features ORDER BY geoname_id",
+            "SELECT * FROM alternate_names ORDER BY geoname_id, name",
+        ):
+            for row in conn.execute(sql):
+                digest.update(repr(row).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark multi-process GeoNames ingestion.")
+    parser.add_argument("--source", type=pathlib.Path, help="GeoNames dump (.zip or .txt) to parse.")
+    parser.add_argument("--synthetic", type=int, help="Generate a dump with N lines instead.")
+    parser.add_argument("--config", type=pathlib.Path, default=ROOT / "configs" / "feature-whitelist.yml")
+    parser.add_argument("--jobs", default="1,2,4,8", help="Comma-separated --jobs values (default: 1,2,4,8).")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    whitelist = frozenset(ingest.load_whitelist(args.config))
+    if args.synthetic:
+        whitelist |= set(SYNTHETIC_CODES)
+    job_counts = sorted({int(value) for value in args.jobs.split(",")} | {1})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmpdir = pathlib.Path(tmp)
+        source = args.source
+        if args.synthetic:
+            source = tmpdir / "allCountries.txt"
+            start = time.perf_counter()
+            _write_synthetic(source, args.synthetic)
+            print(f"synthetic dump: {args.synthetic:,} lines in {time.perf_counter() - start:.1f}s")
+        if source is None or not source.exists():
+            parser.error("pass --source or --synthetic")
+
+        out = tmpdir / "master.db"
+        baseline_seconds = baseline_digest = None
+        status = 0
+        print(f"\n{'jobs':>4s} {'scanned':>12s} {'kept':>12s} {'seconds':>9s} {'rows/sec':>12s} {'speedup':>8s}  output")
+        for jobs in job_counts:
+            seconds, progress = _load(source, out, whitelist, jobs, args.batch_size)
+            digest = _digest(out)
+            if baseline_seconds is None:
+                baseline_seconds, baseline_digest = seconds, digest
+            same = digest == baseline_digest
+            status |= not same
+            print(
+                f"{jobs:>4d} {progress.scanned:>12,d} {progress.kept:>12,d} {seconds:>9.2f} "
+                f"{progress.scanned / seconds:>12,.0f} {baseline_seconds / seconds:>7.2f}x  "
+                f"{'identical' if same else 'DIFFERS from --jobs 1'}"
+            )
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
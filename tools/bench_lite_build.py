@@ -0,0 +1,173 @@
+"""
+Benchmark lite dataset builds (rows copied per second).
+
+First isolates the copy phase: rows streamed through Python (cursor into
+executemany, the previous approach) versus one INSERT ... SELECT against the
+ATTACHed master. Then runs geodata.build_lite_dataset (server builder) and
+scripts/generate_lite_db.py (CLI builder, which also copies alternate names)
+end to end for the same filters, reporting rows, seconds and rows/sec.
+
+Usage:
+  python tools/bench_lite_build.py --master data/geonames-all_countries_latest.db
+  python tools/bench_lite_build.py --synthetic 2000000
+"""
+
+import argparse
+import pathlib
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import generate_lite_db  # noqa: E402
+from geodata import LITE_FEATURE_COLUMNS, build_lite_dataset  # noqa: E402
+
+SYNTHETIC_CODES = ["P.PPL", "H.LK", "T.MT", "T.PK", "S.CAMP", "H.STM", "T.TRL", "S.SCH"]
+COUNTRIES = ["US", "CA", "MX", "FR", "DE", "IT", "ES", "GB", "NO", "SE"]
+
+
+def _build_synthetic(path: pathlib.Path, count: int) -> None:
+    """Master-schema DB with ``count`` features over 10 countries x 20 admin1, ~0.6 alt names each."""
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    generate_lite_db.create_schema(conn)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    def _features():
+        for gid in range(1, count + 1):
+            lat, lng = rng.uniform(-60, 70), rng.uniform(-180, 180)
+            fclass, fcode = rng.choice(SYNTHETIC_CODES).split(".")
+            name = f"Place {gid}"
+            yield (
+                gid, name, name.lower(), fclass, fcode, lat, lng, rng.choice(COUNTRIES), f"{rng.randrange(20):02d}",
+                f"A2-{rng.randrange(30)}", rng.randrange(100000), None, "UTC", "2024-01-01", name.lower(),
+                int(lat // 1), int(lng // 1),
+            )
+
+    def _alt_names():
+        for gid in range(1, count + 1):
+            for i in range(rng.choice((0, 0, 1, 2))):
+                yield gid, f"Alt {gid}-{i}", f"alt {gid}-{i}", int(i == 0)
+
+    conn.executemany(f"INSERT INTO features VALUES ({','.join('?' * 17)})", _features())
+    conn.executemany("INSERT INTO alternate_names VALUES (?, ?, ?, ?)", _alt_names())
+    conn.execute("INSERT INTO metadata VALUES ('build_created_at', 'synthetic')")
+    generate_lite_db.create_indexes(conn)
+    conn.commit()
+    conn.close()
+
+
+def _count(path: pathlib.Path) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+
+
+def _copy_phase(master: pathlib.Path, out: pathlib.Path, where: str, params: list, *, in_sqlite: bool) -> int:
+    """Copy the filtered features into an index-free table; returns rows copied."""
+    out.unlink(missing_ok=True)
+    cols = ", ".join(LITE_FEATURE_COLUMNS)
+    lite = sqlite3.connect(out.as_uri() + "?mode=rwc", uri=True, isolation_level=None)
+    lite.execute("PRAGMA journal_mode=OFF")
+    lite.execute("PRAGMA synchronous=OFF")
+    lite.execute(f"CREATE TABLE features ({cols.replace('geoname_id', 'geoname_id INTEGER PRIMARY KEY', 1)})")
+    if in_sqlite:
+        lite.execute("ATTACH DATABASE ? AS master", (master.resolve().as_uri() + "?mode=ro",))
+        rows = lite.execute(f"INSERT INTO features SELECT {cols} FROM master.features WHERE {where}", params).rowcount
+    else:
+        src = sqlite3.connect(master)
+        lite.execute("BEGIN")
+        lite.executemany(
+            f"INSERT INTO features VALUES ({', '.join('?' * len(LITE_FEATURE_COLUMNS))})",
+            src.execute(f"SELECT {cols} FROM features WHERE {where}", params),
+        )
+        lite.execute("COMMIT")
+        rows = lite.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+        src.close()
+    lite.close()
+    return rows
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark lite dataset builders.")
+    parser.add_argument("--master", type=pathlib.Path, help="Master DB to read.")
+    parser.add_argument("--synthetic", type=int, help="Generate a master with N features instead.")
+    parser.add_argument("--country", default=None, help="Country for the filtered runs (default: first found).")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmpdir = pathlib.Path(tmp)
+        master = args.master
+        if args.synthetic:
+            master = tmpdir / "master.db"
+            start = time.perf_counter()
+            _build_synthetic(master, args.synthetic)
+            print(f"synthetic master: {args.synthetic:,} features in {time.perf_counter() - start:.1f}s")
+        if master is None or not master.exists():
+            parser.error("pass --master or --synthetic")
+
+        with sqlite3.connect(master) as conn:
+            country = args.country or conn.execute("SELECT country FROM features LIMIT 1").fetchone()[0]
+            admin1 = conn.execute("SELECT admin1 FROM features WHERE country = ? LIMIT 1", (country,)).fetchone()[0]
+
+        cases = [
+            ("all", {}),
+            (f"country={country}", {"country": country}),
+            (f"country={country} admin1={admin1}", {"country": country, "admin1": admin1}),
+            (f"country={country} codes=H.LK,T.MT", {"country": country, "feature_codes": ["H.LK", "T.MT"]}),
+        ]
+        out = tmpdir / "lite.db"
+        print(f"\n{'copy phase':22s} {'filter':34s} {'rows':>10s} {'seconds':>9s} {'rows/sec':>12s}")
+        for name, kwargs in cases:
+            clauses, params = ["1=1"], []
+            for column in ("country", "admin1"):
+                if column in kwargs:
+                    clauses.append(f"{column} = ?")
+                    params.append(kwargs[column])
+            if "feature_codes" in kwargs:
+                clauses.append(f"(feature_class || '.' || feature_code) IN ({','.join('?' * len(kwargs['feature_codes']))})")
+                params.extend(kwargs["feature_codes"])
+            for label, in_sqlite in (("python stream", False), ("INSERT ... SELECT", True)):
+                seconds = _time(
+                    lambda: _copy_phase(master, out, " AND ".join(clauses), params, in_sqlite=in_sqlite), args.repeat
+                )
+                rows = _count(out)
+                print(f"{label:22s} {name:34s} {rows:>10,d} {seconds:>9.3f} {rows / seconds:>12,.0f}")
+
+        print(f"\n{'builder':22s} {'filter':34s} {'rows':>10s} {'seconds':>9s} {'rows/sec':>12s}")
+        for name, kwargs in cases:
+            seconds = _time(lambda: build_lite_dataset(out, master_db=master, **kwargs), args.repeat)
+            rows = _count(out)
+            print(f"{'build_lite_dataset':22s} {name:34s} {rows:>10,d} {seconds:>9.3f} {rows / seconds:>12,.0f}")
+
+            argv = ["--source", str(master), "--output", str(out), "--overwrite"]
+            if "country" in kwargs:
+                argv += ["--countries", kwargs["country"]]
+            if "feature_codes" in kwargs:
+                argv += ["--feature-codes", ",".join(kwargs["feature_codes"])]
+            if "admin1" in kwargs:
+                argv += ["--where", f"admin1 = '{kwargs['admin1']}'"]
+            seconds = _time(lambda: generate_lite_db.main(argv), args.repeat)
+            rows = _count(out)
+            print(f"{'generate_lite_db':22s} {name:34s} {rows:>10,d} {seconds:>9.3f} {rows / seconds:>12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
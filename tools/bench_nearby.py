@@ -0,0 +1,178 @@
+"""
+Benchmark nearby candidate selection strategies on a GeoNames dataset.
+
+Compares the latitude/longitude BETWEEN scan against the features_rtree R*Tree
+index (candidate rows read and query latency for a set of dense query points),
+then end-to-end fetch_nearby_features latency per engine (sqlite, grid, numpy).
+
+Usage:
+  python tools/bench_nearby.py --db assets/data/geonames-lite-us-wa.db
+  python tools/bench_nearby.py --db data/geonames-all_countries_latest.db \
+      --point 47.6062,-122.3321 --point 40.7128,-74.0060 --radius-km 25
+  python tools/bench_nearby.py --synthetic 1000000 --radius-km 25
+"""
+
+import argparse
+import math
+import pathlib
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+from geodata import (  # noqa: E402
+    RTREE_TABLE,
+    _bounding_box,
+    _ColumnarDataset,
+    _nearby_candidates_sql,
+    ensure_spatial_index,
+    fetch_nearby_features,
+    has_optimized_schema,
+    np,
+)
+
+# Dense default points (Seattle, Tacoma, Spokane)
+DEFAULT_POINTS = ["47.6062,-122.3321", "47.2529,-122.4443", "47.6588,-117.4260"]
+
+
+def _parse_point(raw: str) -> tuple[float, float]:
+    lat, lng = (float(part) for part in raw.split(","))
+    return lat, lng
+
+
+SYNTHETIC_CODES = ["P.PPL", "H.LK", "T.MT", "T.PK", "S.CAMP", "H.STM", "T.TRL", "S.SCH"]
+
+
+def _build_synthetic(path: pathlib.Path, count: int, points: list[tuple[float, float]]) -> None:
+    """Write a lite-schema DB with ``count`` features, half clustered around ``points``."""
+    rng = random.Random(42)
+
+    def _rows():
+        for geoname_id in range(1, count + 1):
+            if geoname_id % 2 and points:
+                lat0, lng0 = points[geoname_id % len(points)]
+                lat, lng = rng.gauss(lat0, 0.5), rng.gauss(lng0, 0.7)
+            else:
+                lat, lng = rng.uniform(25.0, 49.0), rng.uniform(-125.0, -67.0)
+            fclass, fcode = rng.choice(SYNTHETIC_CODES).split(".")
+            yield (geoname_id, f"Place {geoname_id}", lat, lng, fclass, fcode, "US", "WA", None,
+                   0, None, "America/Los_Angeles", math.floor(lat), math.floor(lng))
+
+    with sqlite3.connect(str(path)) as conn:
+        conn.executescript("""
+            CREATE TABLE features (
+              geoname_id INTEGER PRIMARY KEY, name TEXT, latitude REAL, longitude REAL,
+              feature_class TEXT, feature_code TEXT, country TEXT, admin1 TEXT, admin2 TEXT,
+              population INTEGER, elevation REAL, timezone TEXT,
+              grid_lat INTEGER, grid_lng INTEGER
+            );
+            CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        conn.executemany("INSERT INTO features VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)", _rows())
+        conn.execute("CREATE INDEX idx_features_lat_lng ON features(latitude, longitude)")
+        conn.execute("CREATE INDEX idx_features_grid ON features(grid_lat, grid_lng)")
+
+
+def _time_query(conn: sqlite3.Connection, sql: str, params: list, repeat: int) -> tuple[int, float]:
+    rows = 0
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(conn.execute(sql, params).fetchall())
+        samples.append(time.perf_counter() - started)
+    return rows, statistics.median(samples) * 1000.0
+
+
+def _vm_steps(conn: sqlite3.Connection, sql: str, params: list) -> int:
+    """Approximate work done (rows visited) as SQLite VM instructions, in thousands."""
+    counter = [0]
+
+    def _tick() -> int:
+        counter[0] += 1
+        return 0
+
+    conn.set_progress_handler(_tick, 1000)
+    try:
+        conn.execute(sql, params).fetchall()
+    finally:
+        conn.set_progress_handler(None, 0)
+    return counter[0]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark nearby candidate queries (BETWEEN vs R*Tree).")
+    parser.add_argument("--db", type=pathlib.Path, help="Dataset to benchmark.")
+    parser.add_argument("--synthetic", type=int, help="Benchmark a generated dataset with N features instead.")
+    parser.add_argument("--point", action="append", help="lat,lng query point (repeatable).")
+    parser.add_argument("--radius-km", type=float, default=10.0)
+    parser.add_argument("--codes", help="Optional comma-separated feature codes (e.g., P.PPL,H.LK).")
+    parser.add_argument("--limit", type=int, default=25, help="Result limit for the engine comparison.")
+    parser.add_argument("--repeat", type=int, default=25)
+    args = parser.parse_args()
+
+    if not args.synthetic and not (args.db and args.db.exists()):
+        print(f"Error: database not found: {args.db}", file=sys.stderr)
+        return 1
+
+    points = [_parse_point(p) for p in (args.point or DEFAULT_POINTS)]
+    codes = [c.strip() for c in args.codes.split(",") if c.strip()] if args.codes else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic:
+            args.db = pathlib.Path(tmp) / f"synthetic-{args.synthetic}.db"
+            started = time.perf_counter()
+            _build_synthetic(args.db, args.synthetic, points)
+            print(f"(generated {args.synthetic} synthetic features in {time.perf_counter() - started:.1f}s)")
+        db_path = args.db
+        with sqlite3.connect(str(db_path)) as probe:
+            has_rtree = probe.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (RTREE_TABLE,)
+            ).fetchone()
+        if not has_rtree:
+            # Never modify the input; index a scratch copy instead.
+            db_path = pathlib.Path(tmp) / f"indexed-{args.db.name}"
+            shutil.copyfile(args.db, db_path)
+            ensure_spatial_index(db_path)
+            print(f"(indexed a temporary copy of {args.db.name})")
+
+        conn = sqlite3.connect(str(db_path))
+        sargable = has_optimized_schema(conn)
+        print(f"{'point':>24} {'strategy':>8} {'rows':>8} {'vm kops':>8} {'median ms':>10}")
+        for lat, lng in points:
+            bbox = _bounding_box(lat, lng, args.radius_km)
+            for label, use_rtree in (("between", False), ("rtree", True)):
+                sql, params = _nearby_candidates_sql(bbox, codes, use_rtree=use_rtree, sargable=sargable)
+                rows, ms = _time_query(conn, sql, params, args.repeat)
+                steps = _vm_steps(conn, sql, params)
+                print(f"{lat:>11.4f},{lng:>12.4f} {label:>8} {rows:>8} {steps:>8} {ms:>10.3f}")
+        conn.close()
+
+        engines = ["sqlite", "grid"]
+        if np is not None:
+            started = time.perf_counter()
+            _ColumnarDataset.load(db_path)
+            print(f"\n(numpy engine loaded in {time.perf_counter() - started:.2f}s)")
+            engines.append("numpy")
+        print(f"\n{'point':>24} {'engine':>8} {'results':>8} {'median ms':>10}")
+        for lat, lng in points:
+            for engine in engines:
+                samples = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    results = fetch_nearby_features(
+                        lat, lng, radius_km=args.radius_km, limit=args.limit,
+                        feature_codes=codes, db_path=db_path, engine=engine,
+                    )
+                    samples.append(time.perf_counter() - started)
+                ms = statistics.median(samples) * 1000.0
+                print(f"{lat:>11.4f},{lng:>12.4f} {engine:>8} {len(results):>8} {ms:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+"""
+Benchmark /api/places/search (geodata.search_places) latency on a GeoNames DB.
+
+Autocomplete keystrokes are simulated by taking random feature names from the
+dataset and querying every prefix of 2..8 characters, with and without an
+anchor point. Reports p50/p95/max milliseconds per prefix length.
+
+--fuzzy times geodata.fuzzy_search_places on the same names with one random
+typo each (and reports how often the original feature is found); --threads N
+replays those queries from N threads at once, as concurrent requests would
+on the server's query executor, and reports throughput.
+
+Usage:
+  python tools/bench_search.py data/geonames-all_countries_latest.db
+  python tools/bench_search.py --names 200 --anchor 47.6,-122.3 assets/data/geonames-lite-us-wa.db
+  python tools/bench_search.py --fuzzy --threads 8 data/geonames-all_countries_latest.db
+"""
+
+import argparse
+import string
+import pathlib
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+from geodata import NAME_FTS_TABLE, TRIGRAM_TABLE, fuzzy_search_places, search_places  # noqa: E402
+
+
+def _sample_names(db_path: pathlib.Path, count: int) -> list[str]:
+    with sqlite3.connect(db_path) as conn:
+        rng = random.Random(7)
+        conn.create_function("seeded_random", 1, lambda _: rng.random())  # repeatable sample
+        rows = conn.execute(
+            "SELECT geoname_id, name FROM features WHERE length(name) >= 2 ORDER BY seeded_random(geoname_id) LIMIT ?",
+            (count,),
+        ).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    """``name`` with one random substitution, insertion, deletion or transposition."""
+    i = rng.randrange(1, len(name) - 1) if len(name) > 2 else 0
+    kind = rng.choice(("sub", "ins", "del", "swap"))
+    if kind == "sub":
+        return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1 :]
+    if kind == "ins":
+        return name[:i] + rng.choice(string.ascii_lowercase) + name[i:]
+    if kind == "del" and len(name) > 3:
+        return name[:i] + name[i + 1 :]
+    return name[:i] + name[i + 1 : i + 2] + name[i : i + 1] + name[i + 2 :]
+
+
+def _bench_fuzzy(db_path: pathlib.Path, names: list[tuple[int, str]], threads: int, limit: int) -> None:
+    rng = random.Random(11)
+    queries = [(gid, _typo(name, rng)) for gid, name in names if len(name) >= 4]
+
+    def _run(item: tuple[int, str]) -> tuple[float, bool]:
+        gid, query = item
+        start = time.perf_counter()
+        matches = fuzzy_search_places(query, limit=limit, db_path=db_path)
+        return (time.perf_counter() - start) * 1000, any(match.geoname_id == gid for match in matches)
+
+    print(f"\n{'fuzzy':10s} {'threads':>7s} {'queries':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'max ms':>9s} {'qps':>8s} {'found':>6s}")
+    for workers in sorted({1, threads}):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run, queries))
+        wall = time.perf_counter() - started
+        ms = sorted(elapsed for elapsed, _ in results)
+        found = sum(hit for _, hit in results) / max(len(results), 1)
+        print(
+            f"{'typo':10s} {workers:>7d} {len(ms):>8d} {statistics.median(ms):>9.2f} "
+            f"{ms[min(len(ms) - 1, int(len(ms) * 0.95))]:>9.2f} {ms[-1]:>9.2f} {len(ms) / wall:>8.0f} {found:>6.0%}"
+        )
+
+
+def _report(label: str, samples: dict[int, list[float]]) -> None:
+    for length in sorted(samples):
+        ms = sorted(samples[length])
+        p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+        print(
+            f"{label:10s} {length:>6d} {len(ms):>8d} {statistics.median(ms):>9.2f} {p95:>9.2f} {ms[-1]:>9.2f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure name search latency per prefix length.")
+    parser.add_argument("database", type=pathlib.Path, help="SQLite file with the features_fts index.")
+    parser.add_argument("--names", type=int, default=100, help="Feature names to type (default: 100).")
+    parser.add_argument("--anchor", default="47.6,-122.3", help="lat,lng for the anchored runs.")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--fuzzy", action="store_true", help="Also time typo-tolerant (trigram) search.")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent searchers for --fuzzy (default: 8).")
+    args = parser.parse_args()
+
+    if not args.database.exists():
+        print(f"Error: database not found: {args.database}", file=sys.stderr)
+        return 1
+    with sqlite3.connect(args.database) as conn:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (NAME_FTS_TABLE,)).fetchone():
+            print("No name index; run tools/add_name_index.py first (timing the LIKE fallback).")
+        if args.fuzzy and not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (TRIGRAM_TABLE,)).fetchone():
+            print("No trigram index; run tools/add_name_index.py first (fuzzy falls back to prefix search).")
+    lat, lng = (float(value) for value in args.anchor.split(","))
+    sampled = _sample_names(args.database, args.names)
+    names = [name for _, name in sampled]
+    search_places(names[0][:3], db_path=args.database)  # open the pool, warm the page cache
+
+    print(f"{'mode':10s} {'prefix':>6s} {'queries':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'max ms':>9s}")
+    for label, anchor in (("plain", {}), ("anchored", {"lat": lat, "lng": lng})):
+        samples: dict[int, list[float]] = {}
+        for name in names:
+            for length in range(2, min(len(name), 8) + 1):
+                start = time.perf_counter()
+                search_places(name[:length], limit=args.limit, db_path=args.database, **anchor)
+                samples.setdefault(length, []).append((time.perf_counter() - start) * 1000)
+        _report(label, samples)
+    if args.fuzzy:
+        _bench_fuzzy(args.database, sampled, args.threads, args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,53 @@
+"""
+Upgrade GeoNames databases (master or lite) to the optimized schema in place.
+
+Adds the indexed ``fcode`` column (feature_class || '.' || feature_code) so
+feature-code filters can seek instead of scanning, the (country, admin1,
+admin2, fcode) index used by lite builds, refreshes planner statistics
+(ANALYZE, PRAGMA optimize) and records metadata.schema_version. Query
+builders detect the column and switch to ``fcode IN (...)`` automatically.
+Safe to re-run, e.g. after every ingest.
+
+Usage:
+  python tools/optimize_master.py data/geonames-all_countries_latest.db [more.db ...]
+"""
+
+import argparse
+import pathlib
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+from geodata import optimize_dataset  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Add sargable feature-code and region indexes, then ANALYZE.")
+    parser.add_argument("databases", nargs="+", type=pathlib.Path, help="SQLite files to upgrade in place.")
+    args = parser.parse_args()
+
+    status = 0
+    for db_path in args.databases:
+        if not db_path.exists():
+            print(f"Error: database not found: {db_path}", file=sys.stderr)
+            status = 1
+            continue
+        start = time.perf_counter()
+        try:
+            result = optimize_dataset(db_path)
+        except (ValueError, sqlite3.Error) as exc:
+            print(f"Error: {db_path}: {exc}", file=sys.stderr)
+            status = 1
+            continue
+        added = ", ".join(result["added"]) or "schema already current"
+        print(
+            f"{db_path}: schema_version {result['schema_version']} ({added}; analyzed) "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+"""
+Pre-build every `generated` catalog entry into the lite artifact cache.
+
+Reads configs/geonames-datasets.json, skips entries whose artifact for the
+current master version already exists, and builds the rest on a process pool.
+Each worker keeps one read-only master connection for all of its builds.
+Artifacts are stored atomically, so an interrupted run resumes where it
+stopped; the timing report is rewritten after every finished entry.
+
+Usage:
+  python tools/prewarm_lite.py --workers 8
+  python tools/prewarm_lite.py --master data/geonames-all_countries_latest.db \
+      --country US --report prewarm-us.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import pathlib
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+import geodata  # noqa: E402
+
+_WORKER_MASTER: sqlite3.Connection | None = None
+
+
+def _init_worker(master_path: str) -> None:
+    global _WORKER_MASTER
+    _WORKER_MASTER = sqlite3.connect(pathlib.Path(master_path).as_uri() + "?mode=ro", uri=True)
+    _WORKER_MASTER.execute(f"PRAGMA mmap_size={geodata.POOL_MMAP_BYTES}")
+
+
+def _build(entry_id: str, lite_filter: geodata.LiteFilter, master_path: str) -> dict:
+    start = time.perf_counter()
+    artifact = geodata.get_or_build_lite_dataset(
+        lite_filter, master_db=pathlib.Path(master_path), master_conn=_WORKER_MASTER
+    )
+    return {
+        "id": entry_id,
+        "key": artifact.key,
+        "status": "skipped" if artifact.cached else "built",
+        "seconds": round(time.perf_counter() - start, 3),
+        "bytes": artifact.path.stat().st_size,
+        "pid": os.getpid(),
+    }
+
+
+def _expected_features(entry: dict) -> int:
+    match = re.search(r"\d+", entry.get("description", ""))
+    return int(match.group()) if match else 0
+
+
+def _write_report(path: pathlib.Path, report: dict) -> None:
+    results = report["entries"].values()
+    built = [r["seconds"] for r in results if r["status"] == "built"]
+    report["summary"] = {
+        "total": report["total"],
+        "built": len(built),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "pending": report["total"] - len(report["entries"]),
+        "wall_seconds": round(time.time() - report["started_at"], 1),
+        "build_seconds_sum": round(sum(built), 1),
+        "build_seconds_p50": round(statistics.median(built), 3) if built else None,
+        "build_seconds_max": max(built) if built else None,
+        "bytes_built": sum(r.get("bytes", 0) for r in results if r["status"] == "built"),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-build generated GeoNames lite datasets.")
+    parser.add_argument("--catalog", type=pathlib.Path, default=geodata.DATASET_CATALOG_PATH)
+    parser.add_argument("--master", type=pathlib.Path, help="Master DB (defaults to the server's resolution).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Concurrent builds.")
+    parser.add_argument("--country", help="Only entries of this ISO country code.")
+    parser.add_argument("--limit", type=int, help="Only the first N matching entries.")
+    parser.add_argument(
+        "--cache-bytes",
+        type=int,
+        help="Disk budget for this run (DALITRAIL_LITE_CACHE_BYTES); keep it large enough for the whole catalog.",
+    )
+    parser.add_argument(
+        "--report", type=pathlib.Path, default=geodata.GENERATED_DIR / "prewarm-report.json", help="Timing report."
+    )
+    args = parser.parse_args()
+
+    if args.cache_bytes:
+        os.environ["DALITRAIL_LITE_CACHE_BYTES"] = str(args.cache_bytes)  # read by each spawned worker on import
+        geodata.LITE_CACHE.max_bytes = args.cache_bytes
+    master = (args.master or geodata.resolve_master_dataset_path()).resolve()
+    version = geodata.master_dataset_version(master)
+
+    entries = json.loads(args.catalog.read_text(encoding="utf-8")).get("datasets", [])
+    entries = [e for e in entries if e.get("source") == "generated"]
+    if args.country:
+        entries = [e for e in entries if (e.get("country") or "").upper() == args.country.upper()]
+    if args.limit:
+        entries = entries[: args.limit]
+
+    report = {"master": str(master), "master_version": version, "started_at": time.time(), "total": len(entries)}
+    previous = {}
+    if args.report.exists():
+        try:
+            old = json.loads(args.report.read_text(encoding="utf-8"))
+        except ValueError:
+            old = {}
+        if old.get("master_version") == version:  # resuming: keep earlier timings
+            previous = old.get("entries", {})
+    report["entries"] = {}
+
+    todo = []
+    for entry in entries:
+        lite_filter = geodata.LiteFilter.from_catalog_entry(entry)
+        key = geodata.LITE_CACHE.key_for(lite_filter, version)
+        if geodata.LITE_CACHE.path_for(key).exists():
+            report["entries"][entry["id"]] = previous.get(entry["id"]) or {
+                "id": entry["id"], "key": key, "status": "skipped", "seconds": 0.0,
+            }
+        else:
+            todo.append((entry, lite_filter))
+    # Largest regions first so the tail of the run is not one long build
+    todo.sort(key=lambda item: _expected_features(item[0]), reverse=True)
+    print(f"{len(entries)} generated entries: {len(entries) - len(todo)} current, {len(todo)} to build "
+          f"with {args.workers} worker(s)")
+    _write_report(args.report, report)
+
+    status = 0
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),  # fresh interpreters, like the lite job pool
+        initializer=_init_worker,
+        initargs=(str(master),),
+    ) as pool:
+        futures = {pool.submit(_build, entry["id"], lite_filter, str(master)): entry for entry, lite_filter in todo}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                entry = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    result = {"id": entry["id"], "status": "failed", "seconds": 0.0, "error": str(exc)}
+                    status = 1
+                report["entries"][entry["id"]] = result
+                _write_report(args.report, report)
+                print(f"[{done}/{len(todo)}] {entry['id']}: {result['status']} in {result['seconds']:.2f}s")
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            _write_report(args.report, report)
+            print("Interrupted; rerun to resume.", file=sys.stderr)
+            return 130
+
+    _write_report(args.report, report)
+    summary = report["summary"]
+    print(
+        f"built {summary['built']}, skipped {summary['skipped']}, failed {summary['failed']} "
+        f"in {summary['wall_seconds']}s wall ({summary['build_seconds_sum']}s of builds); report: {args.report}"
+    )
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,43 @@
+"""
+Rebuild the region_stats table of the master GeoNames DB.
+
+region_stats holds per admin1/admin2 feature counts, bounding boxes and
+per-feature-class counts; scan_regions() and generate_dynamic_catalog() read
+it instead of grouping every feature (and fall back to that scan while the
+table is missing). scripts/ingest.py refreshes it at the end of every build;
+run this after other edits of the master;
+--countries limits the refresh to the countries an update touched.
+
+Usage:
+  python tools/refresh_region_stats.py
+  python tools/refresh_region_stats.py --master data/geonames-all_countries_latest.db --countries US,CA
+"""
+
+import argparse
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+
+from geodata import refresh_region_stats, resolve_master_dataset_path  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Refresh the materialized region statistics.")
+    parser.add_argument("--master", type=pathlib.Path, help="Master DB (defaults to the server's resolution).")
+    parser.add_argument("--countries", help="Comma-separated ISO codes to refresh (default: all).")
+    args = parser.parse_args()
+
+    master = args.master or resolve_master_dataset_path()
+    if not master.exists():
+        print(f"Error: database not found: {master}", file=sys.stderr)
+        return 1
+    countries = [c.strip() for c in (args.countries or "").split(",") if c.strip()]
+    result = refresh_region_stats(master, countries or None)
+    scope = ", ".join(result["countries"]) if countries else "all countries"
+    print(f"{master}: {result['rows']} region rows for {scope} in {result['seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())